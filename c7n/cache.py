@@ -3,19 +3,24 @@
 """Provide basic caching services to avoid extraneous queries over
 multiple policies on the same resource type.
 """
+from collections import Counter, OrderedDict
+import atexit
+import copy
 import pickle  # nosec nosemgrep
 
 from datetime import datetime, timedelta
 import os
 import logging
 import sqlite3
+import threading
+import zlib
 
 log = logging.getLogger('custodian.cache')
 
 CACHE_NOTIFY = False
 
 
-def factory(config):
+def factory(config, resource_type=None):
 
     global CACHE_NOTIFY
 
@@ -32,7 +37,22 @@ def factory(config):
             log.debug("Using in-memory cache")
             CACHE_NOTIFY = True
         return InMemoryCache(config)
-    return SqlKvCache(config)
+    return SqlKvCache(config, resource_type)
+
+
+def get_cache_ttls(config):
+    """Parse per resource type cache periods, from TYPE=MINUTES values."""
+    ttls = {}
+    values = getattr(config, 'cache_ttl', None) or ()
+    if isinstance(values, dict):
+        values = ["%s=%s" % (k, v) for k, v in values.items()]
+    for v in values:
+        rtype, sep, minutes = v.partition('=')
+        if not sep or not minutes.strip().isdigit():
+            raise ValueError("invalid cache ttl %r, expected TYPE=MINUTES" % v)
+        # provider prefixes are optional, ie. aws.ec2 or ec2
+        ttls[rtype.strip().split('.', 1)[-1]] = int(minutes)
+    return ttls
 
 
 class Cache:
@@ -49,6 +69,18 @@ class Cache:
     def save(self, key, data):
         pass
 
+    def save_many(self, items, timestamp=None):
+        """Save a sequence of (key, data) pairs."""
+        for key, data in items:
+            self.save(key, data)
+
+    def delete_many(self, keys):
+        """Remove a sequence of keys."""
+
+    def peek(self, key):
+        """Get a value without side effects on shared state."""
+        return self.get(key)
+
     def size(self):
         return 0
 
@@ -85,6 +117,10 @@ class InMemoryCache(Cache):
     def save(self, key, data):
         self.data[encode(key)] = data
 
+    def delete_many(self, keys):
+        for key in keys:
+            self.data.pop(encode(key), None)
+
     def size(self):
         return sum(map(len, self.data.values()))
 
@@ -99,7 +135,47 @@ def resolve_path(path):
             os.path.expandvars(path)))
 
 
+class MemoryLRU:
+    """An in process cache of serialized values bounded by size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is not None:
+                self.data.move_to_end(key)
+            return entry
+
+    def put(self, key, create_date, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            self.pop(key)
+            self.data[key] = (create_date, value)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.data.popitem(last=False)
+                self.size -= len(evicted)
+
+    def pop(self, key):
+        entry = self.data.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
 class SqlKvCache(Cache):
+    """Cache resources in a sqlite file, fronted by an in process lru.
+
+    Caches of a process using the same file share a single connection
+    (in wal mode) and lru. Values are stored compressed. The cache
+    period may be overridden per resource type via the cache_ttl option,
+    and hits, misses and bytes read are tracked in stats.
+    """
 
     create_table = """
     create table if not exists c7n_cache (
@@ -109,13 +185,35 @@ class SqlKvCache(Cache):
     )
     """
 
-    def __init__(self, config):
+    # bound on the lru in front of each cache file
+    memory_bytes = 64 * 1024 * 1024
+
+    # process wide state per cache file path
+    connections = {}
+    memory = {}
+    lock = threading.RLock()
+
+    def __init__(self, config, resource_type=None):
         super().__init__(config)
-        self.cache_period = config.cache_period
+        ttls = get_cache_ttls(config)
+        self.cache_period = ttls.get(resource_type, config.cache_period)
+        # entries are only garbage collected beyond the longest period
+        self.max_period = max([config.cache_period] + list(ttls.values()))
         self.cache_path = resolve_path(config.cache)
         self.conn = None
+        self.stats = Counter()
 
     def init(self):
+        with self.lock:
+            pid, conn = self.connections.get(self.cache_path, (None, None))
+            # connections aren't usable across a fork
+            if pid != os.getpid():
+                conn = self.connect()
+                self.connections[self.cache_path] = (os.getpid(), conn)
+                self.memory[self.cache_path] = MemoryLRU(self.memory_bytes)
+            self.conn = conn
+
+    def connect(self):
         # migration from pickle cache file
         if os.path.exists(self.cache_path):
             with open(self.cache_path, 'rb') as fh:
@@ -126,14 +224,16 @@ class SqlKvCache(Cache):
         elif not os.path.exists(os.path.dirname(self.cache_path)):
             # parent directory creation
             os.makedirs(os.path.dirname(self.cache_path))
-        self.conn = sqlite3.connect(self.cache_path)
-        self.conn.execute(self.create_table)
-        with self.conn as cursor:
+        conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        conn.execute('pragma journal_mode=wal')
+        conn.execute(self.create_table)
+        with conn as cursor:
             result = cursor.execute(
                 'delete from c7n_cache where create_date < ?',
-                [datetime.utcnow() - timedelta(minutes=self.cache_period)])
+                [datetime.utcnow() - timedelta(minutes=self.max_period)])
             if result.rowcount:
                 log.debug('expired %d stale cache entries', result.rowcount)
+        return conn
 
     def load(self):
         if not self.conn:
@@ -141,31 +241,318 @@ class SqlKvCache(Cache):
         return True
 
     def get(self, key):
-        with self.conn as cursor:
-            r = cursor.execute(
-                'select value, create_date from c7n_cache where key = ?',
-                [sqlite3.Binary(encode(key))]
-            )
-            row = r.fetchone()
+        ekey = encode(key)
+        memory = self.memory.get(self.cache_path)
+        entry = memory and memory.get(ekey)
+        if entry is not None:
+            self.stats['memory_hits'] += 1
+        else:
+            with self.lock, self.conn as cursor:
+                r = cursor.execute(
+                    'select value, create_date from c7n_cache where key = ?',
+                    [sqlite3.Binary(ekey)]
+                )
+                row = r.fetchone()
             if row is None:
+                self.stats['misses'] += 1
                 return None
             value, create_date = row
             create_date = sqlite3.converters['TIMESTAMP'](create_date.encode('utf8'))
-            if (datetime.utcnow() - create_date).total_seconds() / 60.0 > self.cache_period:
-                return None
-            return pickle.loads(value)  # nosec nosemgrep
+            entry = (create_date, decompress(value))
+            if memory:
+                memory.put(ekey, *entry)
+        create_date, value = entry
+        if (datetime.utcnow() - create_date).total_seconds() / 60.0 > self.cache_period:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self.stats['bytes'] += len(value)
+        return pickle.loads(value)  # nosec nosemgrep
 
     def save(self, key, data, timestamp=None):
-        with self.conn as cursor:
-            timestamp = timestamp or datetime.utcnow()
-            cursor.execute(
+        self.save_many([(key, data)], timestamp)
+
+    def save_many(self, items, timestamp=None):
+        """Save a sequence of (key, data) pairs in a single transaction."""
+        timestamp = timestamp or datetime.utcnow()
+        entries = [(encode(key), encode(data)) for key, data in items]
+        with self.lock, self.conn as cursor:
+            cursor.executemany(
                 'replace into c7n_cache (key, value, create_date) values (?, ?, ?)',
-                (sqlite3.Binary(encode(key)), sqlite3.Binary(encode(data)), timestamp))
+                [(sqlite3.Binary(ekey), sqlite3.Binary(zlib.compress(value, 1)), timestamp)
+                 for ekey, value in entries])
+        memory = self.memory.get(self.cache_path)
+        if memory:
+            for ekey, value in entries:
+                memory.put(ekey, timestamp, value)
+
+    def delete_many(self, keys):
+        ekeys = [encode(key) for key in keys]
+        with self.lock, self.conn as cursor:
+            cursor.executemany(
+                'delete from c7n_cache where key = ?',
+                [(sqlite3.Binary(ekey),) for ekey in ekeys])
+        memory = self.memory.get(self.cache_path)
+        if memory:
+            with memory.lock:
+                for ekey in ekeys:
+                    memory.pop(ekey)
 
     def size(self):
         return os.path.exists(self.cache_path) and os.path.getsize(self.cache_path) or 0
 
     def close(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        # the connection is shared across the process, and left open.
+        self.conn = None
+
+    @classmethod
+    def close_all(cls):
+        """Close the process's shared connections and drop their lrus."""
+        with cls.lock:
+            for pid, conn in cls.connections.values():
+                if pid == os.getpid():
+                    conn.close()
+            cls.connections.clear()
+            cls.memory.clear()
+
+
+atexit.register(SqlKvCache.close_all)
+
+
+def decompress(value):
+    # values written prior to compression are plain pickles
+    try:
+        return zlib.decompress(value)
+    except zlib.error:
+        return value
+
+
+class CacheIndex:
+    """Values derived from resources, stored in a manager's resource cache.
+
+    Entries are scoped to the manager's account and region and named by
+    the kind of index, ie. the references found by usage scans or per
+    resource permission attributes. Each entry is kept under its own key,
+    and so expires on its own.
+
+    The cache is only entered for the duration of each operation, so
+    values may be computed between a lookup and a save, ie. by scans
+    which consult indexes of their own on the same cache.
+    """
+
+    def __init__(self, manager, resource):
+        self.cache = manager._cache
+        self.account_id = manager.config.account_id
+        self.region = manager.config.region
+        self.resource = resource
+
+    def get_key(self, q):
+        return {
+            'account': self.account_id,
+            'region': self.region,
+            'resource': self.resource,
+            'q': q}
+
+    def get(self, q):
+        with self.cache:
+            return self.cache.get(self.get_key(q))
+
+    def get_many(self, qs):
+        """Return a mapping of the entries found of the given names."""
+        found = {}
+        with self.cache:
+            for q in qs:
+                value = self.cache.get(self.get_key(q))
+                if value is not None:
+                    found[q] = value
+        return found
+
+    def save(self, q, value):
+        self.save_many({q: value})
+
+    def save_many(self, values):
+        with self.cache:
+            self.cache.save_many(
+                [(self.get_key(q), v) for q, v in values.items()])
+
+    def delete_many(self, qs):
+        with self.cache:
+            self.cache.delete_many([self.get_key(q) for q in qs])
+
+
+class ResourceFetchPlanner:
+    """Share resource fetches across the policies of a single run.
+
+    Policies are grouped by the population they query, ie. their
+    resource manager cache key (account, region, resource type, source
+    and query). Populations with more than one consuming policy are
+    fetched and augmented once and retained in memory, each consumer
+    receives its own deep copy to filter and annotate. The retained
+    copy is released once the last consumer has been served, or has
+    been released without fetching, ie. when skipped by its conditions.
+    """
+
+    def __init__(self):
+        self.consumers = {}
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def plan(self, policies):
+        planned = []
+        for p in policies:
+            key = self.get_policy_key(p)
+            if key is None:
+                continue
+            self.consumers[key] = self.consumers.get(key, 0) + 1
+            planned.append((key, p))
+
+        # only shared populations are worth retaining
+        for key, p in planned:
+            if self.consumers[key] < 2:
+                self.consumers.pop(key)
+                continue
+            manager = p.resource_manager
+            if not isinstance(manager._cache, PlannedCache):
+                manager._cache = PlannedCache(
+                    self, manager._cache, p.provider_name, key)
+
+        if self.consumers:
+            log.debug(
+                "fetch plan %d policies sharing %d resource populations",
+                sum(self.consumers.values()), len(self.consumers))
+        return self
+
+    @staticmethod
+    def get_policy_key(policy):
+        # serverless policies are provisioned not pulled on a run
+        if policy.execution_mode != 'pull' and not policy.options.dryrun:
+            return None
+        manager = policy.resource_manager
+        source = getattr(manager, 'source', None)
+        if source is None or not hasattr(manager, 'get_cache_key'):
+            return None
+        query = source.get_query_params(None)
+        return encode((
+            policy.provider_name, manager.get_cache_key(query)))
+
+    def consume(self, key):
+        """Count a consumer of a population as served.
+
+        Returns the retained copy if this was the last consumer.
+        """
+        with self.lock:
+            if key not in self.consumers:
+                return None
+            self.consumers[key] -= 1
+            if self.consumers[key] > 0:
+                return None
+            self.consumers.pop(key)
+            return self.results.pop(key, None)
+
+    def release(self, policy):
+        """Release a policy's share of a population it did not consume."""
+        cache = getattr(policy.resource_manager, '_cache', None)
+        if isinstance(cache, PlannedCache) and cache.planner is self:
+            cache.release()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.results:
+                return None
+            self.consumers[key] -= 1
+            if self.consumers[key] < 1:
+                self.consumers.pop(key)
+                # the last consumer takes the retained copy
+                return self.results.pop(key)
+            return copy.deepcopy(self.results[key])
+
+    def peek(self, key):
+        """Get a retained population without consuming it."""
+        with self.lock:
+            return self.results.get(key)
+
+    def save(self, key, resources):
+        """Retain a fetched population for the remaining consumers.
+
+        Returns whether the fetching policy was counted as a consumer.
+        """
+        with self.lock:
+            if key not in self.consumers or key in self.results:
+                return False
+            # the fetching policy is itself a consumer
+            self.consumers[key] -= 1
+            if self.consumers[key] < 1:
+                self.consumers.pop(key)
+                return True
+            # filters annotate resources in place, retain a pristine copy.
+            self.results[key] = copy.deepcopy(resources)
+            return True
+
+    def size(self):
+        return len(self.results)
+
+
+class PlannedCache(Cache):
+    """Consult a run's fetch planner ahead of the configured cache.
+
+    Only the policy's planned population is served by the planner, and
+    only once, later lookups are passed through to the configured cache.
+    """
+
+    def __init__(self, planner, cache, provider_name, key=None):
+        super().__init__(cache.config)
+        self.planner = planner
+        self.cache = cache
+        self.provider_name = provider_name
+        self.key = key
+        self.consumed = False
+
+    def planner_key(self, key):
+        return encode((self.provider_name, key))
+
+    def is_planned(self, key):
+        return not self.consumed and self.planner_key(key) == self.key
+
+    def load(self):
+        return self.cache.load()
+
+    def get(self, key):
+        if self.is_planned(key):
+            resources = self.planner.get(self.key)
+            if resources is not None:
+                self.consumed = True
+                return resources
+        return self.cache.get(key)
+
+    def peek(self, key):
+        resources = self.planner.peek(self.planner_key(key))
+        if resources is not None:
+            return resources
+        return self.cache.get(key)
+
+    def save(self, key, data):
+        if self.is_planned(key) and self.planner.save(self.key, data):
+            self.consumed = True
+        self.cache.save(key, data)
+
+    def save_many(self, items, timestamp=None):
+        # per resource entries aren't planned populations
+        self.cache.save_many(items, timestamp)
+
+    def delete_many(self, keys):
+        self.cache.delete_many(keys)
+
+    def release(self):
+        if not self.consumed and self.key is not None:
+            self.consumed = True
+            self.planner.consume(self.key)
+
+    def size(self):
+        return self.cache.size()
+
+    def close(self):
+        self.cache.close()
+
+    @property
+    def stats(self):
+        return getattr(self.cache, 'stats', None)
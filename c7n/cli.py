@@ -96,6 +96,10 @@ def _default_options(p, exclude=[]):
         p.add_argument(
             "--cache-period", default=15, type=int,
             help="Cache validity in minutes (default %(default)i)")
+        p.add_argument(
+            "--cache-ttl", action="append", default=[], metavar="TYPE=MINUTES",
+            help="Cache validity in minutes for a resource type, ie. iam-role=60 "
+                 "(may be specified multiple times)")
     else:
         p.add_argument("--cache", default=None, help=argparse.SUPPRESS)
 
@@ -226,6 +230,12 @@ def setup_parser():
         "--skip-validation",
         action="store_true",
         help="Skips validation of policies (assumes you've run the validate command seperately).")
+    run.add_argument(
+        "--stream", action="store_true",
+        help="Filter resources a page at a time as they are retrieved, bounding memory usage")
+    run.add_argument(
+        "--policy-concurrency", type=int, default=1, metavar="N",
+        help="Number of policies to execute concurrently (default %(default)i)")
 
     metrics_help = ("Emit metrics to provider metrics. Specify 'aws', 'gcp', or 'azure'. "
             "For more details on aws metrics options, see: "
@@ -238,7 +248,7 @@ def setup_parser():
     run.add_argument(
         "--trace",
         dest="tracer",
-        help="Tracing integration",
+        help="Tracing integration (xray, or profile for a local execution profile)",
         default=None, nargs="?", const="default")
 
     schema_desc = ("Browse the available vocabularies (resources, filters, modes, and "
@@ -290,6 +300,13 @@ def setup_parser():
     validate.add_argument("-v", "--verbose", action="count", help="Verbose Logging")
     validate.add_argument("-q", "--quiet", action="count", help="Less logging (repeatable)")
     validate.add_argument("--debug", default=False, help=argparse.SUPPRESS)
+    validate.add_argument(
+        "-f", "--cache", default=None,
+        help="Validation cache file, unchanged files which previously passed "
+             "validation are skipped")
+    validate.add_argument(
+        "-j", "--jobs", default=1, type=int,
+        help="Number of processes to validate files with (default %(default)i)")
     deprecations = validate.add_mutually_exclusive_group(required=False)
     deprecations.add_argument("--no-deps", dest="check_deprecations",
                               action='store_const', const=deprecated.SKIP,
@@ -2,20 +2,24 @@
 # SPDX-License-Identifier: Apache-2.0
 from collections import Counter, defaultdict
 from datetime import timedelta, datetime
+import functools
 from functools import wraps
 import json
 import itertools
 import logging
 import os
 import sys
+import time
 from typing import List
 
 import yaml
 from yaml.constructor import ConstructorError
 
 from c7n import deprecated
+from c7n.cache import ResourceFetchPlanner
 from c7n.exceptions import ClientError, PolicyValidationError
-from c7n.loader import SourceLocator
+from c7n.executor import MainThreadExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from c7n.loader import SchemaValidator, SourceLocator, ValidationCache
 from c7n.provider import clouds
 from c7n.policy import Policy, PolicyCollection, load as policy_load
 from c7n.schema import ElementSchema, StructureParser, generate
@@ -187,49 +191,54 @@ class DuplicateKeyCheckLoader(SafeLoader):
 
 
 def validate(options):
-    from c7n import schema
-
     if len(options.configs) < 1:
         log.error('no config files specified')
         sys.exit(1)
 
-    used_policy_names = set()
-    structure = StructureParser()
-    all_errors = {}
-    found_deprecations = False
-    footnotes = deprecated.Footnotes()
-
+    options.dryrun = True
+    config_files = []
     for config_file in options.configs:
-        errors = []
-
         config_file = os.path.expanduser(config_file)
         if not os.path.exists(config_file):
             raise ValueError("Invalid path for config %r" % config_file)
+        config_files.append(config_file)
+
+    # files which previously passed validation only contribute their
+    # policy names for the duplicate check.
+    validation_cache = None
+    if getattr(options, 'cache', None):
+        validation_cache = ValidationCache(options.cache)
+
+    results, cache_keys, pending = {}, {}, []
+    for config_file in config_files:
+        if validation_cache:
+            key = cache_keys[config_file] = validation_cache.get_key(
+                config_file, options.check_deprecations)
+            policy_names = validation_cache.get(key)
+            if policy_names is not None:
+                results[config_file] = (set(policy_names), [], [])
+                continue
+        pending.append(config_file)
+
+    jobs = getattr(options, 'jobs', 1) or 1
+    executor, batches = MainThreadExecutor, [pending]
+    if jobs > 1 and len(pending) > 1:
+        executor = ProcessPoolExecutor
+        batches = [b for b in (pending[i::jobs] for i in range(jobs)) if b]
+    with executor(max_workers=jobs) as w:
+        for batch, batch_results in zip(batches, w.map(
+                functools.partial(
+                    _validate_files, check_deprecations=options.check_deprecations),
+                batches)):
+            results.update(zip(batch, batch_results))
 
-        options.dryrun = True
-        fmt = config_file.rsplit('.', 1)[-1]
-
-        with open(config_file) as fh:
-            if fmt in ('yml', 'yaml', 'json'):
-                # our loader is safe loader derived.
-                data = yaml.load(fh.read(), Loader=DuplicateKeyCheckLoader)  # nosec nosemgrep
-            else:
-                log.error("The config file must end in .json, .yml or .yaml.")
-                raise ValueError("The config file must end in .json, .yml or .yaml.")
-
-        try:
-            structure.validate(data)
-        except PolicyValidationError as e:
-            log.error("Configuration invalid: {}".format(config_file))
-            log.error("%s" % e)
-            all_errors[config_file] = e
-            continue
+    used_policy_names = set()
+    all_errors = {}
+    found_deprecations = False
+    footnotes = deprecated.Footnotes()
 
-        load_resources(structure.get_resource_types(data))
-        schm = schema.generate()
-        errors += schema.validate(data, schm)
-        conf_policy_names = {
-            p.get('name', 'unknown') for p in data.get('policies', ())}
+    for config_file in config_files:
+        conf_policy_names, errors, reports = results[config_file]
         dupes = conf_policy_names.intersection(used_policy_names)
         if len(dupes) >= 1:
             errors.append(ValueError(
@@ -238,37 +247,24 @@ def validate(options):
                 )
             ))
         used_policy_names = used_policy_names.union(conf_policy_names)
-        source_locator = None
-        if fmt in ('yml', 'yaml'):
-            # For yaml files there is at least the expectation that the policy
-            # name is on a line by itself. With JSON, the file could be one big
-            # line. At this stage we are only attempting to find line number for
-            # policies in yaml files.
-            source_locator = SourceLocator(config_file)
-        if not errors:
-            null_config = Config.empty(dryrun=True, account_id='na', region='na')
-            for p in data.get('policies', ()):
-                try:
-                    policy = Policy(p, null_config, Bag())
-                    policy.validate()
-                    # If the policy is invalid, there isn't much point checking
-                    # for deprecated usage as there is no guarantee as to the
-                    # state of the policy.
-                    if options.check_deprecations != deprecated.SKIP:
-                        report = deprecated.report(policy)
-                        if report:
-                            found_deprecations = True
-                            log.warning("deprecated usage found in policy\n" +
-                                        report.format(
-                                            source_locator=source_locator,
-                                            footnotes=footnotes))
-
-                except Exception as e:
-                    msg = "Policy: %s is invalid: %s" % (
-                        p.get('name', 'unknown'), e)
-                    errors.append(msg)
+        if reports:
+            found_deprecations = True
+            source_locator = None
+            if config_file.rsplit('.', 1)[-1] in ('yml', 'yaml'):
+                # For yaml files there is at least the expectation that the policy
+                # name is on a line by itself. With JSON, the file could be one big
+                # line. At this stage we are only attempting to find line number for
+                # policies in yaml files.
+                source_locator = SourceLocator(config_file)
+            for report in reports:
+                log.warning("deprecated usage found in policy\n" +
+                            report.format(
+                                source_locator=source_locator,
+                                footnotes=footnotes))
         if not errors:
             log.info("Configuration valid: {}".format(config_file))
+            if config_file in cache_keys and not reports:
+                validation_cache.save(cache_keys[config_file], conf_policy_names)
             continue
 
         all_errors[config_file] = errors
@@ -285,6 +281,67 @@ def validate(options):
         sys.exit(1)
 
 
+def _validate_files(config_files, check_deprecations):
+    """Validate a batch of policy files.
+
+    Compiled schemas are cached per resource type set by the validator,
+    so they are shared by the files of the batch.
+    """
+    validator = SchemaValidator()
+    return [
+        _validate_file(config_file, check_deprecations, validator)
+        for config_file in config_files]
+
+
+def _validate_file(config_file, check_deprecations, validator):
+    """Validate a policy file.
+
+    Returns the file's policy names, its errors and deprecation reports, errors
+    are stringified so results can be returned from a process pool.
+    """
+    fmt = config_file.rsplit('.', 1)[-1]
+    with open(config_file) as fh:
+        if fmt in ('yml', 'yaml', 'json'):
+            # our loader is safe loader derived.
+            data = yaml.load(fh.read(), Loader=DuplicateKeyCheckLoader)  # nosec nosemgrep
+        else:
+            log.error("The config file must end in .json, .yml or .yaml.")
+            raise ValueError("The config file must end in .json, .yml or .yaml.")
+
+    structure = StructureParser()
+    try:
+        structure.validate(data)
+    except PolicyValidationError as e:
+        return set(), [str(e)], []
+
+    rtypes = structure.get_resource_types(data)
+    load_resources(rtypes)
+    errors = [str(e) for e in validator.validate(data, rtypes)]
+    conf_policy_names = {
+        p.get('name', 'unknown') for p in data.get('policies', ())}
+    reports = []
+    if errors:
+        return conf_policy_names, errors, reports
+
+    null_config = Config.empty(dryrun=True, account_id='na', region='na')
+    for p in data.get('policies', ()):
+        try:
+            policy = Policy(p, null_config, Bag())
+            policy.validate()
+            # If the policy is invalid, there isn't much point checking
+            # for deprecated usage as there is no guarantee as to the
+            # state of the policy.
+            if check_deprecations != deprecated.SKIP:
+                report = deprecated.report(policy)
+                if report:
+                    reports.append(report)
+        except Exception as e:
+            msg = "Policy: %s is invalid: %s" % (
+                p.get('name', 'unknown'), e)
+            errors.append(msg)
+    return conf_policy_names, errors, reports
+
+
 @policy_command
 def run(options, policies: List[Policy]) -> None:
     exit_code = 0
@@ -301,24 +358,93 @@ def run(options, policies: List[Policy]) -> None:
             log.exception("Unable to assume role %s", options.assume_role)
             sys.exit(1)
 
-    errored_policies: List[str] = []
-    for policy in policies:
-        try:
-            policy()
-        except Exception:
-            exit_code = 2
-            errored_policies.append(policy.name)
-            if options.debug:
-                raise
-            log.exception(
-                "Error while executing policy %s, continuing" % (
-                    policy.name))
+    # fetch each resource population shared by policies only once.
+    planner = ResourceFetchPlanner().plan(policies)
+
+    errors = {}
+    if getattr(options, 'policy_concurrency', 1) > 1:
+        errors = _run_concurrent(options, policies, planner)
+    else:
+        for policy in policies:
+            error = _run_policy(options, policy, planner)
+            if error:
+                errors[policy] = error
+
+    errored_policies: List[str] = [p.name for p in policies if p in errors]
+    if errored_policies:
+        exit_code = 2
     if exit_code != 0:
         log.error("The following policies had errors while executing\n - %s" % (
             "\n - ".join(errored_policies)))
         sys.exit(exit_code)
 
 
+def _run_policy(options, policy, planner=None):
+    try:
+        policy()
+    except Exception as e:
+        if options.debug:
+            raise
+        log.exception(
+            "Error while executing policy %s, continuing" % (
+                policy.name))
+        return e
+    finally:
+        # policies skipped or failing before a fetch release their share
+        if planner is not None:
+            planner.release(policy)
+
+
+def _run_concurrent(options, policies, planner):
+    """Execute policies on a thread pool.
+
+    Policies sharing a planned resource population are chained to run
+    serially in a single worker, so the population is only fetched once.
+    """
+    chains = {}
+    for p in policies:
+        key = planner.get_policy_key(p)
+        if key is None or key not in planner.consumers:
+            key = id(p)
+        chains.setdefault(key, []).append(p)
+
+    errors, results = {}, {}
+
+    def run_chain(chain):
+        for p in chain:
+            s = time.time()
+            try:
+                resources = p()
+            except Exception as e:
+                errors[p] = e
+                if options.debug:
+                    return
+                log.exception(
+                    "Error while executing policy %s, continuing" % (p.name))
+                resources = None
+            finally:
+                planner.release(p)
+            results[p] = (resources, time.time() - s)
+
+    log.info("Running %d policies with concurrency %d",
+             len(policies), options.policy_concurrency)
+    with ThreadPoolExecutor(max_workers=options.policy_concurrency) as w:
+        list(w.map(run_chain, chains.values()))
+
+    if options.debug and errors:
+        raise next(errors[p] for p in policies if p in errors)
+
+    # summarize in policy order, as execution logs are interleaved.
+    for p in policies:
+        resources, duration = results.get(p, (None, 0))
+        log.info("policy:%s region:%s status:%s count:%s time:%0.2f",
+                 p.name, p.options.region,
+                 p in errors and 'error' or 'ok',
+                 isinstance(resources, list) and len(resources) or 0,
+                 duration)
+    return errors
+
+
 @policy_command
 def report(options, policies):
     from c7n.reports import report as do_report
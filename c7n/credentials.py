@@ -4,6 +4,7 @@
 Authentication utilities
 """
 import os
+import threading
 
 from botocore.credentials import RefreshableCredentials
 from botocore.session import get_session
@@ -41,9 +42,16 @@ class SessionFactory:
     def __call__(self, assume=True, region=None):
         if self.assume_role and assume:
             session = Session(profile_name=self.profile)
-            session = assumed_session(
-                self.assume_role, self.session_name, session,
-                region or self.region, self.external_id)
+            region = region or self.region
+            base_credentials = session.get_credentials()
+            credentials = assumed_credentials.get(
+                (self.assume_role, self.session_name, self.external_id,
+                 base_credentials and base_credentials.access_key),
+                region,
+                lambda: get_assumed_credentials(
+                    self.assume_role, self.session_name, session,
+                    region, self.external_id))
+            session = credential_session(credentials, region)
         else:
             session = Session(
                 region_name=region or self.region, profile_name=self.profile)
@@ -65,6 +73,37 @@ class SessionFactory:
         self._subscribers = subscribers
 
 
+class AssumedCredentials:
+    """Process wide cache of assumed role credentials.
+
+    The credentials are refreshable, so a role only needs to be assumed
+    once per process, and is then shared by sessions across regions and
+    policies.
+    """
+
+    def __init__(self):
+        self.credentials = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, region, assume):
+        # regional sts credentials are scoped to their endpoint's region
+        # for opt-in regions, global endpoint ones are usable everywhere.
+        key = (key, USE_STS_REGIONAL and region or None)
+        credentials = self.credentials.get(key)
+        if credentials is None:
+            credentials = assume()
+            with self.lock:
+                credentials = self.credentials.setdefault(key, credentials)
+        return credentials
+
+    def reset(self):
+        with self.lock:
+            self.credentials.clear()
+
+
+assumed_credentials = AssumedCredentials()
+
+
 def assumed_session(role_arn, session_name, session=None, region=None, external_id=None):
     """STS Role assume a boto3.Session
 
@@ -82,7 +121,13 @@ def assumed_session(role_arn, session_name, session=None, region=None, external_
     """
     if session is None:
         session = Session()
+    return credential_session(
+        get_assumed_credentials(role_arn, session_name, session, region, external_id),
+        region)
 
+
+def get_assumed_credentials(role_arn, session_name, session, region=None, external_id=None):
+    """STS Role assume refreshable credentials."""
     retry = get_retry(('Throttling',))
 
     def refresh():
@@ -102,11 +147,14 @@ def assumed_session(role_arn, session_name, session=None, region=None, external_
             # Silly that we basically stringify so it can be parsed again
             expiry_time=credentials['Expiration'].isoformat())
 
-    session_credentials = RefreshableCredentials.create_from_metadata(
+    return RefreshableCredentials.create_from_metadata(
         metadata=refresh(),
         refresh_using=refresh,
         method='sts-assume-role')
 
+
+def credential_session(credentials, region=None):
+    """A boto3.Session using the given botocore credentials."""
     # so dirty.. it hurts, no clean way to set this outside of the
     # internals poke. There's some work upstream on making this nicer
     # but its pretty baroque as well with upstream support.
@@ -114,7 +162,7 @@ def assumed_session(role_arn, session_name, session=None, region=None, external_
     # https://github.com/boto/botocore/issues/761
 
     s = get_session()
-    s._credentials = session_credentials
+    s._credentials = credentials
     if region is None:
         region = s.get_config_variable('region') or 'us-east-1'
     s.set_config_variable('region', region)
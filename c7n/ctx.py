@@ -14,7 +14,7 @@ from c7n.output import (
     tracer_outputs,
 )
 
-from c7n.utils import reset_session_cache, dumps, local_session
+from c7n.utils import TagIndex, api_account, reset_session_cache, dumps, local_session
 from c7n.version import version
 
 
@@ -34,6 +34,8 @@ class ExecutionContext:
         self.logs = None
         self.api_stats = None
         self.sys_stats = None
+        self.account_token = None
+        self.tag_index = None
 
         # A few tests patch on metrics flush
         # For backward compatibility, accept both 'metrics' and 'metrics_enabled' params (PR #4361)
@@ -73,6 +75,10 @@ class ExecutionContext:
     def __enter__(self):
         self.initialize()
         self.session_factory.policy_name = self.policy.name
+        # api rate limits are tracked per account
+        self.account_token = api_account.set(getattr(self.options, 'account_id', None))
+        # tag lookups by filters and actions share an index
+        self.tag_index = TagIndex().__enter__()
         self.sys_stats.__enter__()
         self.output.__enter__()
         self.logs.__enter__()
@@ -93,6 +99,9 @@ class ExecutionContext:
         if exc_type is not None and self.metrics:
             self.metrics.put_metric('PolicyException', 1, "Count")
         self.output.write_file('metadata.json', dumps(self.get_metadata(), indent=2))
+        write_trace = getattr(self.tracer, 'write_output', None)
+        if write_trace:
+            write_trace(self.output)
         self.api_stats.__exit__(exc_type, exc_value, exc_traceback)
 
         with self.tracer.subsegment('output'):
@@ -105,6 +114,12 @@ class ExecutionContext:
         self.tracer.__exit__()
 
         self.session_factory.policy_name = None
+        if self.account_token is not None:
+            api_account.reset(self.account_token)
+            self.account_token = None
+        if self.tag_index is not None:
+            self.tag_index.__exit__()
+            self.tag_index = None
         # IMPORTANT: multi-account execution (c7n-org and others) need
         # to manually reset this.  Why: Not doing this means we get
         # excessive memory usage from client reconstruction for dynamic-gen
@@ -1,10 +1,23 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
-from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor)  # noqa
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor  # noqa
 
+import contextvars
 import threading
 
 
+class ThreadPoolExecutor(futures.ThreadPoolExecutor):
+    """Thread pool running work in a copy of the submitting thread's context.
+
+    Context variables, ie. the log context of the executing policy, are
+    thus carried into worker threads.
+    """
+
+    def submit(self, fn, /, *args, **kw):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kw)
+
+
 class MainThreadExecutor:
     """ For running tests.
 
@@ -68,3 +81,35 @@ class MainThreadFuture:
 
     def add_done_callback(self, fn):
         return fn(self)
+
+
+class ServiceLimiter:
+    """Bound the number of in-flight api requests per service across
+    all threads in the process.
+
+    Augment pools can then be sized for network wait, with requests
+    queueing on the service limit rather than on any one pool.
+    """
+
+    default_limit = 64
+
+    def __init__(self, limits=None):
+        self.limits = dict(limits or {})
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def set_limit(self, service, limit):
+        with self.lock:
+            self.limits[service] = limit
+            self.semaphores.pop(service, None)
+
+    def __call__(self, service):
+        with self.lock:
+            semaphore = self.semaphores.get(service)
+            if semaphore is None:
+                semaphore = self.semaphores[service] = threading.BoundedSemaphore(
+                    self.limits.get(service, self.default_limit))
+            return semaphore
+
+
+service_limits = ServiceLimiter()
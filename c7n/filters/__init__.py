@@ -19,7 +19,7 @@ from .core import (
 from .config import ConfigCompliance
 from .costhub import CostHubRecommendation
 from .health import HealthEventFilter
-from .iamaccess import CrossAccountAccessFilter, PolicyChecker
+from .iamaccess import CrossAccountAccessFilter, CrossAccountAttributeFilter, PolicyChecker
 from .iamanalyzer import AccessAnalyzer
 from .metrics import MetricsFilter, ShieldMetrics
 # from .vpc import DefaultVpcBase
@@ -3,10 +3,12 @@
 """
 Resource Filtering Logic
 """
+import contextlib
 import copy
 import datetime
 from datetime import timedelta
 import fnmatch
+import functools
 import ipaddress
 import logging
 import operator
@@ -14,6 +16,7 @@ import re
 
 from dateutil.tz import tzutc
 from dateutil.parser import parse
+from jmespath.exceptions import JMESPathError
 from c7n.vendored.distutils import version
 from random import sample
 
@@ -23,6 +26,7 @@ from c7n.manager import ResourceManager
 from c7n.registry import PluginRegistry
 from c7n.resolver import ValuesFrom
 from c7n.utils import (
+    get_tag_map,
     set_annotation,
     type_schema,
     parse_cidr,
@@ -30,7 +34,7 @@ from c7n.utils import (
     jmespath_search,
     jmespath_compile
 )
-from c7n.manager import iter_filters
+from c7n.manager import iter_filters, order_by_cost
 
 
 class FilterValidationError(Exception):
@@ -182,6 +186,37 @@ def trim_runtime(filters):
             remove_filter(f)
 
 
+# Filter evaluation cost classes
+COST_MEMORY = 0  # evaluated against resource data
+COST_API = 1  # api calls per resource set
+COST_RESOURCE_API = 2  # api calls per resource
+
+
+# Annotations set by filters are keyed with a c7n prefix, ie. c7n:MatchedFilters
+ANNOTATION_PREFIXES = ('c7n:', 'c7n.')
+
+
+def get_key_fields(key):
+    """Get the field names a value filter key refers to."""
+    try:
+        nodes = [jmespath_compile(key).parsed]
+    except JMESPathError:
+        # ie. tag:Name and other keys resolved outside of jmespath
+        return [key]
+    fields = []
+    while nodes:
+        node = nodes.pop()
+        if node['type'] == 'field':
+            fields.append(node['value'])
+        nodes.extend(c for c in node.get('children', ()) if isinstance(c, dict))
+    return fields
+
+
+def overrides(instance, base, *methods):
+    """Whether an instance's class overrides any of the given methods of base."""
+    return any(getattr(type(instance), m) is not getattr(base, m) for m in methods)
+
+
 # Really should be an abstract base class (abc) or
 # zope.interface
 
@@ -189,6 +224,14 @@ class Filter(Element):
 
     log = logging.getLogger('custodian.filters')
 
+    # Whether matching a resource is independent of the rest of the
+    # resource set, allowing the filter to be applied to pages of
+    # resources as they are retrieved.
+    streamable = False
+
+    # Relative cost of evaluation, used to order evaluation of filters.
+    cost = COST_API
+
     def __init__(self, data, manager=None):
         self.data = data
         self.manager = manager
@@ -197,6 +240,13 @@ class Filter(Element):
         """ Bulk process resources and return filtered set."""
         return list(filter(self, resources))
 
+    def reads_annotations(self):
+        """Whether the filter matches on annotations set by other filters."""
+        key = self.data.get('key') if isinstance(self.data, dict) else None
+        if not isinstance(key, str):
+            return False
+        return any(f.startswith(ANNOTATION_PREFIXES) for f in get_key_fields(key))
+
     def get_block_operator(self):
         """Determine the immediate parent boolean operator for a filter"""
         # Top level operator is `and`
@@ -238,20 +288,7 @@ class BaseValueFilter(Filter):
     def get_resource_value(self, k, i, regex=None):
         r = None
         if k.startswith('tag:'):
-            tk = k.split(':', 1)[1]
-            if 'Tags' in i:
-                for t in i.get("Tags", []):
-                    if t.get('Key') == tk:
-                        r = t.get('Value')
-                        break
-            # GCP schema: 'labels': {'key': 'value'}
-            elif 'labels' in i:
-                r = i.get('labels', {}).get(tk, None)
-            # GCP has a secondary form of labels called tags
-            # as labels without values.
-            # Azure schema: 'tags': {'key': 'value'}
-            elif 'tags' in i:
-                r = i.get('tags', {}).get(tk, None)
+            r = get_tag_value(k.split(':', 1)[1], i)
         elif k in i:
             r = i.get(k)
         elif k not in self.expr:
@@ -285,6 +322,19 @@ class BaseValueFilter(Filter):
         return self
 
 
+def get_tag_value(tk, i):
+    if 'Tags' in i:
+        return get_tag_map(i).get(tk)
+    # GCP schema: 'labels': {'key': 'value'}
+    elif 'labels' in i:
+        return i.get('labels', {}).get(tk, None)
+    # GCP has a secondary form of labels called tags
+    # as labels without values.
+    # Azure schema: 'tags': {'key': 'value'}
+    elif 'tags' in i:
+        return i.get('tags', {}).get(tk, None)
+
+
 def intersect_list(a, b):
     if b is None:
         return a
@@ -324,12 +374,30 @@ class BooleanGroupFilter(Filter):
         resource_type = self.manager.get_model()
         return resource_type.id
 
+    def trace(self, f):
+        """Trace processing by a nested filter."""
+        ctx = getattr(self.manager, 'ctx', None)
+        if ctx is None:
+            return contextlib.nullcontext()
+        return ctx.tracer.subsegment("filter:%s" % f.type)
+
     def __len__(self):
         return len(self.filters)
 
     def __bool__(self):
         return True
 
+    @property
+    def streamable(self):
+        return all(getattr(f, 'streamable', False) for f in self.filters)
+
+    @property
+    def cost(self):
+        return max([f.cost for f in self.filters], default=COST_MEMORY)
+
+    def reads_annotations(self):
+        return any(f.reads_annotations() for f in self.filters)
+
     def get_deprecations(self):
         """Return any matching deprecations for the nested filters."""
         deprecations = []
@@ -361,13 +429,25 @@ class Or(BooleanGroupFilter):
         else:
             resource_map = {r[rtype_id]: r for r in resources}
         results = set()
-        for f in self.filters:
+        for f in order_by_cost(self.filters):
+            candidates = resources
+            # costly per resource filters only need to evaluate resources
+            # not already matched by another branch.
+            if results and getattr(f, 'streamable', False) and f.cost > COST_MEMORY:
+                if compiled:
+                    candidates = [r for r in resources if compiled.search(r) not in results]
+                else:
+                    candidates = [r for r in resources if r[rtype_id] not in results]
+                if not candidates:
+                    continue
+            with self.trace(f):
+                matched = f.process(candidates, event)
             if compiled:
                 results = results.union([
-                    compiled.search(r) for r in f.process(resources, event)])
+                    compiled.search(r) for r in matched])
             else:
                 results = results.union([
-                    r[rtype_id] for r in f.process(resources, event)])
+                    r[rtype_id] for r in matched])
         return [resource_map[r_id] for r_id in results]
 
 
@@ -377,8 +457,9 @@ class And(BooleanGroupFilter):
         if self.manager:
             sweeper = AnnotationSweeper(self.get_resource_type_id(), resources)
 
-        for f in self.filters:
-            resources = f.process(resources, events)
+        for f in order_by_cost(self.filters):
+            with self.trace(f):
+                resources = f.process(resources, events)
             if not resources:
                 break
 
@@ -415,8 +496,9 @@ class Not(BooleanGroupFilter):
             resource_map = {r[rtype_id]: r for r in resources}
         sweeper = AnnotationSweeper(rtype_id, resources)
 
-        for f in self.filters:
-            resources = f.process(resources, event)
+        for f in order_by_cost(self.filters):
+            with self.trace(f):
+                resources = f.process(resources, event)
             if not resources:
                 break
 
@@ -484,6 +566,7 @@ class ValueFilter(BaseValueFilter):
     """Generic value filter using jmespath
     """
     op = v = vtype = None
+    plan = None
 
     schema = {
         'type': 'object',
@@ -507,6 +590,19 @@ class ValueFilter(BaseValueFilter):
     annotate = True
     required_keys = {'value', 'key'}
 
+    @property
+    def streamable(self):
+        # subclasses overriding process may operate on the resource set.
+        return (type(self).process is ValueFilter.process and
+                self.data.get('value_type') != 'resource_count')
+
+    @property
+    def cost(self):
+        # subclasses overriding matching may call apis.
+        if overrides(self, ValueFilter, 'process', '__call__'):
+            return COST_API
+        return 'value_from' in self.data and COST_API or COST_MEMORY
+
     def _validate_resource_count(self):
         """ Specific validation for `resource_count` type
 
@@ -640,36 +736,115 @@ class ValueFilter(BaseValueFilter):
         if i is None:
             return False
 
-        # value extract
-        r = self.get_resource_value(self.k, i)
-        if self.op in ('in', 'not-in') and r is None:
-            r = ()
+        if self.plan is None:
+            self.plan = self.compile_plan()
+        return self.plan(i)
 
-        # value type conversion
-        if self.vtype is not None:
-            v, r = self.process_value_type(self.v, r, i)
-        else:
-            v = self.v
+    def compile_plan(self):
+        """Compile the filter into a per resource match function.
 
-        # Value match
-        if r is None and v == 'absent':
-            return True
-        elif r is not None and v == 'present':
-            return True
-        elif v == 'not-null' and r:
-            return True
-        elif v == 'empty' and not r:
-            return True
-        elif self.op:
-            op = OPERATORS[self.op]
+        The operator, key accessor and constant value conversions are
+        resolved once, leaving only the resource specific work per match.
+        """
+        get_value = self.compile_value_accessor()
+        convert = self.compile_value_type()
+        op = self.op and OPERATORS[self.op] or None
+        none_as_empty = self.op in ('in', 'not-in')
+        sentinel = self.v
+
+        def match(i):
+            # value extract
+            r = get_value(i)
+            if none_as_empty and r is None:
+                r = ()
+
+            # value type conversion
+            if convert is not None:
+                v, r = convert(r, i)
+            else:
+                v = sentinel
+
+            # Value match
+            if r is None and v == 'absent':
+                return True
+            elif r is not None and v == 'present':
+                return True
+            elif v == 'not-null' and r:
+                return True
+            elif v == 'empty' and not r:
+                return True
+            elif op:
+                try:
+                    return op(r, v)
+                except TypeError:
+                    return False
+            elif r == v:
+                return True
+
+            return False
+
+        return match
+
+    def compile_value_accessor(self):
+        k = self.k
+        if (type(self).get_resource_value is not ValueFilter.get_resource_value or
+                not isinstance(k, str)):
+            return functools.partial(self.get_resource_value, k)
+
+        if k.startswith('tag:'):
+            get_value = functools.partial(get_tag_value, k.split(':', 1)[1])
+        else:
             try:
-                return op(r, v)
-            except TypeError:
-                return False
-        elif r == v:
-            return True
+                expr = jmespath_compile(k)
+            except JMESPathError:
+                return functools.partial(self.get_resource_value, k)
+
+            def get_value(i):
+                if k in i:
+                    return i.get(k)
+                return expr.search(i)
+
+        if self.data.get('value_regex'):
+            regex = ValueRegex(self.data['value_regex'])
+            return lambda i: regex.get_resource_value(get_value(i))
+        return get_value
+
+    def compile_value_type(self):
+        """Pre-parse constant values for the filter's value type.
+
+        Returns a function of (resource value, resource) returning the
+        (value, resource value) pair to compare, or None when no
+        conversion is needed.
+        """
+        vtype, sentinel = self.vtype, self.v
+        if vtype is None:
+            return None
+        if type(self).process_value_type is not ValueFilter.process_value_type or vtype in (
+                'expr', 'integer', 'float', 'age', 'expiration'):
+            return lambda r, i: self.process_value_type(sentinel, r, i)
+
+        if vtype == 'normalize':
+            return lambda r, i: (
+                sentinel, r.strip().lower() if isinstance(r, str) else r)
+        elif vtype == 'swap':
+            return lambda r, i: (r, sentinel)
+        elif vtype == 'date':
+            sentinel = parse_date(sentinel)
+            return lambda r, i: (sentinel, parse_date(r))
+        elif vtype == 'cidr':
+            s = parse_cidr(sentinel)
 
-        return False
+            def convert(r, i):
+                v = parse_cidr(r)
+                if (isinstance(s, ipaddress._BaseAddress) and
+                        isinstance(v, ipaddress._BaseNetwork)):
+                    return v, s
+                return s, v
+            return convert
+        elif vtype == 'version':
+            s = ComparableVersion(sentinel)
+            return lambda r, i: (s, ComparableVersion(r))
+        return lambda r, i: self.process_value_type(sentinel, r, i)
 
     def process_value_type(self, sentinel, value, resource):
         if self.vtype == 'normalize' and isinstance(value, str):
@@ -758,6 +933,18 @@ class AgeFilter(Filter):
 
     schema = None
 
+    @property
+    def streamable(self):
+        # subclasses overriding process may operate on the resource set.
+        return not overrides(self, AgeFilter, 'process')
+
+    @property
+    def cost(self):
+        # subclasses overriding matching may call apis, ie. for image dates.
+        if overrides(self, AgeFilter, 'process', '__call__'):
+            return COST_API
+        return COST_MEMORY
+
     def validate(self):
         if not self.date_attribute:
             raise NotImplementedError(
@@ -29,10 +29,12 @@ References
 import fnmatch
 import logging
 import json
+from concurrent.futures import as_completed
 
+from c7n.cache import CacheIndex
 from c7n.filters import Filter
 from c7n.resolver import ValuesFrom
-from c7n.utils import type_schema
+from c7n.utils import chunks, local_session, type_schema
 
 log = logging.getLogger('custodian.iamaccess')
 
@@ -331,3 +333,77 @@ class CrossAccountAccessFilter(Filter):
         if violations:
             r[self.annotation_key] = violations
             return True
+
+
+class CrossAccountAttributeFilter(CrossAccountAccessFilter):
+    """Base class for cross account filters on an ec2 permission attribute.
+
+    Permission attributes can only be described per resource, so the
+    lookups are made concurrently, paced by the manager's retry and its
+    adaptive rate limit on the describe api, and
+    each resource's attribute is indexed in the resource cache to be
+    shared by policies in a run. Actions changing a resource's
+    permissions invalidate its entry.
+    """
+
+    attribute = None
+    # concurrency of attribute lookups, throttling is left to the rate limit
+    max_workers = 16
+    chunk_size = 50
+
+    def get_resource_attribute(self, client, resource):
+        raise NotImplementedError("subclass responsibility")
+
+    @classmethod
+    def get_attribute_index(cls, manager):
+        return CacheIndex(manager, 'attributes')
+
+    @classmethod
+    def get_attribute_name(cls, manager, resource_id):
+        return '%s:%s:%s' % (manager.type, cls.attribute, resource_id)
+
+    @classmethod
+    def invalidate_attributes(cls, manager, resources):
+        """Drop the indexed attributes of resources whose permissions changed."""
+        id_key = manager.resource_type.id
+        cls.get_attribute_index(manager).delete_many(
+            [cls.get_attribute_name(manager, r[id_key]) for r in resources])
+
+    def get_attributes(self, resources):
+        """Return a mapping of resource id to its attribute value."""
+        id_key = self.manager.resource_type.id
+        index = self.get_attribute_index(self.manager)
+        names = {
+            self.get_attribute_name(self.manager, r[id_key]): r[id_key]
+            for r in resources}
+        attributes = {
+            names[name]: value for name, value in index.get_many(names).items()}
+        missing = [r for r in resources if r[id_key] not in attributes]
+        if not missing:
+            return attributes
+
+        fetched = {}
+        client = local_session(self.manager.session_factory).client('ec2')
+        with self.executor_factory(max_workers=self.max_workers) as w:
+            futures = [
+                w.submit(self.process_attribute_set, client, resource_set)
+                for resource_set in chunks(missing, self.chunk_size)]
+            for f in as_completed(futures):
+                if f.exception():
+                    self.log.error(
+                        "Exception checking cross account access \n %s" % (
+                            f.exception()))
+                    continue
+                fetched.update(f.result())
+
+        index.save_many({
+            self.get_attribute_name(self.manager, rid): value
+            for rid, value in fetched.items()})
+        attributes.update(fetched)
+        return attributes
+
+    def process_attribute_set(self, client, resource_set):
+        id_key = self.manager.resource_type.id
+        return {
+            r[id_key]: self.get_resource_attribute(client, r)
+            for r in resource_set}
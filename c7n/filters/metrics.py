@@ -3,6 +3,7 @@
 """
 CloudWatch Metrics suppport for resources
 """
+import functools
 import re
 
 from collections import namedtuple
@@ -10,7 +11,8 @@ from concurrent.futures import as_completed
 from datetime import datetime, timedelta
 
 from c7n.exceptions import PolicyValidationError
-from c7n.filters.core import Filter, OPERATORS
+from c7n.filters.core import (
+    Filter, OPERATORS, COST_API, COST_RESOURCE_API, overrides)
 from c7n.utils import local_session, type_schema, chunks
 
 
@@ -67,6 +69,25 @@ class MetricsFilter(Filter):
     policy to treat their request counts as 0.
 
     Note the default statistic for metrics is Average.
+
+    The "batch" key retrieves metrics with GetMetricData, packing
+    queries for many resources into each api call. Results are
+    annotated with a key qualified by period, dimensions and window,
+    which lets multiple metrics filters in a policy share retrieved
+    metrics:
+
+    .. code-block:: yaml
+
+      - name: ec2-idle
+        resource: ec2
+        filters:
+          - type: metrics
+            name: CPUUtilization
+            days: 14
+            period: 86400
+            value: 5
+            op: less-than
+            batch: true
     """
 
     schema = type_schema(
@@ -86,6 +107,7 @@ class MetricsFilter(Filter):
            'attr-multiplier': {'type': 'number'},
            'percent-attr': {'type': 'string'},
            'missing-value': {'type': 'number'},
+           'batch': {'type': 'boolean'},
            'required': ('value', 'name')})
     schema_alias = True
     permissions = ("cloudwatch:GetMetricStatistics",)
@@ -93,6 +115,10 @@ class MetricsFilter(Filter):
     MAX_QUERY_POINTS = 50850
     MAX_RESULT_POINTS = 1440
 
+    # GetMetricData limits per api call
+    MAX_DATA_QUERIES = 500
+    MAX_DATA_POINTS = 100800
+
     # Default per service, for overloaded services like ec2
     # we do type specific default namespace annotation
     # specifically AWS/EBS and AWS/EC2Spot
@@ -133,6 +159,20 @@ class MetricsFilter(Filter):
         super(MetricsFilter, self).__init__(data, manager)
         self.days = self.data.get('days', 14)
 
+    @property
+    def streamable(self):
+        # subclasses overriding process may operate on the resource set.
+        return not overrides(self, MetricsFilter, 'process')
+
+    @property
+    def cost(self):
+        return self.data.get('batch') and COST_API or COST_RESOURCE_API
+
+    def get_permissions(self):
+        if self.data.get('batch'):
+            return ("cloudwatch:GetMetricData",)
+        return self.permissions
+
     def validate(self):
         stats = self.data.get('statistics', 'Average')
         if stats not in self.standard_stats and not self.extended_stats_re.match(stats):
@@ -143,6 +183,10 @@ class MetricsFilter(Filter):
             raise PolicyValidationError(
                 "metrics filter days value (%s) cannot exceed 455" % self.days)
 
+        if self.data.get('batch') and overrides(self, MetricsFilter, 'process'):
+            raise PolicyValidationError(
+                "%s filter does not support batch" % self.type)
+
     def get_metric_window(self):
         """Determine start and end times for the CloudWatch metric window
 
@@ -193,6 +237,9 @@ class MetricsFilter(Filter):
         self.namespace = ns
 
         self.log.debug("Querying metrics for %d", len(resources))
+        if self.data.get('batch'):
+            return self.process_batched(resources)
+
         matched = []
         with self.executor_factory(max_workers=3) as w:
             futures = []
@@ -264,34 +311,134 @@ class MetricsFilter(Filter):
             if len(collected_metrics[key]) == 0:
                 if 'missing-value' not in self.data:
                     continue
-                collected_metrics[key].append({
-                    'Timestamp': self.start,
-                    self.statistics: self.data['missing-value'],
-                    'c7n:detail': 'Fill value for missing data'
-                })
-
-            if self.data.get('percent-attr'):
-                rvalue = r[self.data.get('percent-attr')]
-                if self.data.get('attr-multiplier'):
-                    rvalue = rvalue * self.data['attr-multiplier']
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    percent = (data_point[self.statistics] / rvalue * 100)
-                    if not self.op(percent, self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
-            else:
-                all_meet_condition = True
-                for data_point in collected_metrics[key]:
-                    if not self.op(data_point[self.statistics], self.value):
-                        all_meet_condition = False
-                        break
-                if all_meet_condition:
-                    matched.append(r)
+                collected_metrics[key].append(self.get_missing_datapoint())
+
+            if self.match_datapoints(r, collected_metrics[key]):
+                matched.append(r)
+        return matched
+
+    def get_missing_datapoint(self):
+        return {
+            'Timestamp': self.start,
+            self.statistics: self.data['missing-value'],
+            'c7n:detail': 'Fill value for missing data'
+        }
+
+    def match_datapoints(self, resource, datapoints):
+        if self.data.get('percent-attr'):
+            rvalue = resource[self.data.get('percent-attr')]
+            if self.data.get('attr-multiplier'):
+                rvalue = rvalue * self.data['attr-multiplier']
+            for data_point in datapoints:
+                percent = (data_point[self.statistics] / rvalue * 100)
+                if not self.op(percent, self.value):
+                    return False
+            return True
+        for data_point in datapoints:
+            if not self.op(data_point[self.statistics], self.value):
+                return False
+        return True
+
+    def get_batch_key(self, dimensions):
+        return "%s.%s.%s.%s.%s.%s.%s" % (
+            self.namespace, self.metric, self.statistics, self.period,
+            ",".join("%s=%s" % (d['Name'], d['Value']) for d in dimensions),
+            self.start.isoformat(), self.end.isoformat())
+
+    def process_batched(self, resources):
+        resource_keys = []
+        queries = {}
+        for r in resources:
+            dimensions = self.get_dimensions(r)
+            dimensions.extend(self.get_user_dimensions())
+            key = self.get_batch_key(dimensions)
+            resource_keys.append((r, key))
+            # metrics already retrieved by another filter are reused.
+            if key not in r.get('c7n.metrics', {}):
+                queries[key] = dimensions
+
+        results = self.get_metric_data(queries)
+
+        matched = []
+        for r, key in resource_keys:
+            collected_metrics = r.setdefault('c7n.metrics', {})
+            if key not in collected_metrics:
+                if key not in results:
+                    # retrieval error
+                    continue
+                collected_metrics[key] = results[key]
+            datapoints = collected_metrics[key]
+            if not datapoints:
+                if 'missing-value' not in self.data:
+                    continue
+                datapoints = [self.get_missing_datapoint()]
+            if self.match_datapoints(r, datapoints):
+                matched.append(r)
         return matched
 
+    def get_metric_data(self, queries):
+        """Retrieve datapoints for a mapping of keys to dimensions.
+
+        Queries are packed up to the api's per call limits on queries
+        and returned datapoints.
+        """
+        points = max(1, int((self.end - self.start).total_seconds() // self.period))
+        batch_size = max(1, min(self.MAX_DATA_QUERIES, self.MAX_DATA_POINTS // points))
+
+        results = {}
+        with self.executor_factory(max_workers=3) as w:
+            futures = [
+                w.submit(self.process_query_set, query_set)
+                for query_set in chunks(list(queries.items()), batch_size)]
+            for f in as_completed(futures):
+                if f.exception():
+                    self.log.warning(
+                        "CW Retrieval error: %s" % f.exception())
+                    continue
+                results.update(f.result())
+        return results
+
+    def process_query_set(self, query_set):
+        client = local_session(
+            self.manager.session_factory).client('cloudwatch')
+        op = client.get_metric_data
+        retry = getattr(self.manager, 'retry', None)
+        if retry:
+            op = functools.partial(retry, op)
+
+        query_keys = {}
+        queries = []
+        for idx, (key, dimensions) in enumerate(query_set):
+            query_id = "m%d" % idx
+            query_keys[query_id] = key
+            queries.append({
+                'Id': query_id,
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': self.namespace,
+                        'MetricName': self.metric,
+                        'Dimensions': dimensions},
+                    'Period': self.period,
+                    'Stat': self.statistics},
+                'ReturnData': True})
+
+        results = {key: [] for key in query_keys.values()}
+        params = dict(
+            MetricDataQueries=queries,
+            StartTime=self.start,
+            EndTime=self.end,
+            ScanBy='TimestampAscending')
+        while True:
+            response = op(**params)
+            for result in response.get('MetricDataResults', ()):
+                results[query_keys[result['Id']]].extend([
+                    {'Timestamp': t, self.statistics: v}
+                    for t, v in zip(result['Timestamps'], result['Values'])])
+            if not response.get('NextToken'):
+                break
+            params['NextToken'] = response['NextToken']
+        return results
+
 
 class ShieldMetrics(MetricsFilter):
     """Specialized metrics filter for shield
@@ -321,6 +468,10 @@ class ShieldMetrics(MetricsFilter):
         'UDPTraffic',
         'UDPFragment')
 
+    def __init__(self, data, manager=None):
+        super(ShieldMetrics, self).__init__(data, manager)
+        self.data['namespace'] = self.namespace
+
     def validate(self):
         if self.data.get('name') not in self.metrics:
             raise PolicyValidationError(
@@ -333,7 +484,3 @@ class ShieldMetrics(MetricsFilter):
         return [{
             'Name': 'ResourceArn',
             'Value': self.manager.get_arns([resource])[0]}]
-
-    def process(self, resources, event=None):
-        self.data['namespace'] = self.namespace
-        return super(ShieldMetrics, self).process(resources, event)
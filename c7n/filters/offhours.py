@@ -251,13 +251,14 @@ might look like:
 # note we have to module import for our testing mocks
 import datetime
 import logging
+import threading
 from os.path import join
 
 from dateutil import zoneinfo, tz as tzutil
 
 from c7n.exceptions import PolicyValidationError
 from c7n.filters import Filter
-from c7n.utils import type_schema, dumps
+from c7n.utils import type_schema, dumps, get_tag_map
 from c7n.resolver import ValuesFrom
 
 log = logging.getLogger('custodian.offhours')
@@ -271,6 +272,54 @@ def parens_removed(u):
     return u.translate({ord('('): None, ord(')'): None})
 
 
+class TimezoneAliases(dict):
+    """Mapping of timezone aliases to zone names.
+
+    On the first failed lookup it is extended with the lower cased names
+    of zones that aren't title case, loading the zone database is slow so
+    we defer it until an alias isn't found. Loading is serialized, and
+    only marked complete once all the aliases are added, as policies may
+    be evaluated concurrently.
+    """
+
+    loaded = False
+    lock = threading.Lock()
+
+    def load(self):
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            aliases = {}
+            for z in zoneinfo.get_zonefile_instance().zones:
+                if z.title() != z and not dict.__contains__(self, z.lower()):
+                    aliases[z.lower()] = z
+            self.update(aliases)
+            self.loaded = True
+
+    def __missing__(self, key):
+        if not self.loaded:
+            self.load()
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        if self.loaded:
+            return False
+        self.load()
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
 class Time(Filter):
     """
     Schedule offhours for resources see :ref:`offhours <offhours>`
@@ -298,7 +347,7 @@ class Time(Filter):
     DEFAULT_TAG = "maid_offhours"
     DEFAULT_TZ = 'et'
 
-    TZ_ALIASES = {
+    TZ_ALIASES = TimezoneAliases({
         'pdt': 'America/Los_Angeles',
         'pt': 'America/Los_Angeles',
         'pst': 'America/Los_Angeles',
@@ -327,18 +376,11 @@ class Time(Filter):
         'brt': 'America/Sao_Paulo',
         'nzst': 'Pacific/Auckland',
         'utc': 'Etc/UTC',
-    }
+    })
     TAG_RESTRICTIONS = ["(", ")", "[", "]", ",", ";", "=", "/", "-"]
     # mapping to ['u28', 'u29', 'u5b', 'u5d', 'u2c', 'u3b', 'u3d', 'u2f', "u2d"]
     TAG_RESTRICTIONS_ESCAPE = ["u" + hex(ord(c))[2:] for c in TAG_RESTRICTIONS]
 
-    z_names = list(zoneinfo.get_zonefile_instance().zones)
-    non_title_case_zones = (
-        lambda aliases=TZ_ALIASES.keys(), z_names=z_names:
-        {z.lower(): z for z in z_names
-            if z.title() != z and z.lower() not in aliases})()
-    TZ_ALIASES.update(non_title_case_zones)
-
     def __init__(self, data, manager=None):
         super(Time, self).__init__(data, manager)
         self.default_tz = self.data.get('default_tz', self.DEFAULT_TZ)
@@ -360,6 +402,10 @@ class Time(Filter):
         self.opted_out = []
         self.parse_errors = []
         self.enabled_count = 0
+        self.skip_days = None
+        # schedule matches and current times by timezone, within process
+        self.schedule_matches = None
+        self.tz_now = None
 
     def validate(self):
         if self.get_tz(self.default_tz) is None:
@@ -377,7 +423,13 @@ class Time(Filter):
         return self
 
     def process(self, resources, event=None):
-        resources = super(Time, self).process(resources)
+        # resources typically share a few distinct schedules, evaluate
+        # each schedule once against the current time.
+        self.schedule_matches, self.tz_now = {}, {}
+        try:
+            resources = super(Time, self).process(resources)
+        finally:
+            self.schedule_matches = self.tz_now = None
         if self.parse_errors and self.manager and self.manager.ctx.log_dir:
             self.log.warning("parse errors %d", len(self.parse_errors))
             with open(join(
@@ -429,40 +481,64 @@ class Time(Filter):
         # dateutil.parser.parse to process: value='off=(m-f,1);' properly.
         # before this normalization, some cases would silently fail.
         value = ';'.join(filter(None, value.split(';')))
+        if self.schedule_matches is None:
+            error, matched = self.match_schedule(value, time_type)
+        elif (value, time_type) in self.schedule_matches:
+            error, matched = self.schedule_matches[(value, time_type)]
+        else:
+            error, matched = self.schedule_matches[(value, time_type)] = (
+                self.match_schedule(value, time_type))
+        if error:
+            log.warning("%s on resource:%s value:%s", error, rid, value)
+            self.parse_errors.append((rid, value))
+            return False
+        return matched
+
+    def match_schedule(self, value, time_type):
+        """Match a schedule tag value against the current time.
+
+        Returns a tuple of an error for invalid schedules and the match.
+        """
+        schedule = self.get_schedule(value, time_type)
+        if schedule is None:
+            return "Invalid schedule", False
+        tz = self.get_tz(schedule['tz'])
+        if not tz:
+            return "Could not resolve tz", False
+        now = self.get_now(schedule['tz'], tz)
+        if now.strftime("%Y-%m-%d") in self.get_skip_days():
+            return None, False
+        return None, self.match(now, schedule)
+
+    def get_schedule(self, value, time_type):
         if self.parser.has_resource_schedule(value, time_type):
-            schedule = self.parser.parse(value)
+            return self.parser.parse(value)
         elif self.parser.keys_are_valid(value):
             # respect timezone from tag
             raw_data = self.parser.raw_data(value)
             if 'tz' in raw_data:
                 schedule = dict(self.default_schedule)
                 schedule['tz'] = raw_data['tz']
-            else:
-                schedule = self.default_schedule
-        else:
-            schedule = None
-        if schedule is None:
-            log.warning(
-                "Invalid schedule on resource:%s value:%s", rid, value)
-            self.parse_errors.append((rid, value))
-            return False
-        tz = self.get_tz(schedule['tz'])
-        if not tz:
-            log.warning(
-                "Could not resolve tz on resource:%s value:%s", rid, value)
-            self.parse_errors.append((rid, value))
-            return False
+                return schedule
+            return self.default_schedule
+
+    def get_now(self, tz_name, tz):
+        if self.tz_now is not None and tz_name in self.tz_now:
+            return self.tz_now[tz_name]
         now = datetime.datetime.now(tz).replace(
             minute=0, second=0, microsecond=0)
-        now_str = now.strftime("%Y-%m-%d")
-        if 'skip-days-from' in self.data:
-            values = ValuesFrom(self.data['skip-days-from'], self.manager)
-            self.skip_days = values.get_values()
-        else:
-            self.skip_days = self.data.get('skip-days', [])
-        if now_str in self.skip_days:
-            return False
-        return self.match(now, schedule)
+        if self.tz_now is not None:
+            self.tz_now[tz_name] = now
+        return now
+
+    def get_skip_days(self):
+        if self.skip_days is None:
+            if 'skip-days-from' in self.data:
+                values = ValuesFrom(self.data['skip-days-from'], self.manager)
+                self.skip_days = values.get_values()
+            else:
+                self.skip_days = self.data.get('skip-days', [])
+        return self.skip_days
 
     def match(self, now, schedule):
         time = schedule.get(self.time_type, ())
@@ -475,11 +551,7 @@ class Time(Filter):
     def get_tag_value(self, i):
         """Get the resource's tag value specifying its schedule."""
         # Look for the tag, Normalize tag key and tag value
-        found = self.fallback_schedule
-        for t in i.get('Tags', ()):
-            if t['Key'].lower() == self.tag_key:
-                found = t['Value']
-                break
+        found = get_tag_map(i, lower=True).get(self.tag_key, self.fallback_schedule)
         # NOTE for GCP resources, eg sql-instance
         if found == self.fallback_schedule and 'labels' in i:
             found = i.get('labels', {}).get(self.tag_key) or found
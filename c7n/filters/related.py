@@ -5,7 +5,12 @@ from functools import lru_cache
 
 from .core import ValueFilter, OPERATORS
 from c7n.query import ChildResourceQuery
-from c7n.utils import jmespath_search
+from c7n.utils import jmespath_compile, jmespath_search
+
+
+@lru_cache(maxsize=None)
+def compile_related_ids(expression):
+    return jmespath_compile("[].%s" % expression)
 
 
 class RelatedResourceFilter(ValueFilter):
@@ -16,6 +21,7 @@ class RelatedResourceFilter(ValueFilter):
     RelatedIdsExpression = None
     AnnotationKey = None
     FetchThreshold = 10
+    _related_matches = None
 
     def get_permissions(self):
         return self.get_resource_manager().get_permissions()
@@ -35,8 +41,25 @@ class RelatedResourceFilter(ValueFilter):
         return super(RelatedResourceFilter, self).validate()
 
     def get_related_ids(self, resources):
-        return set(jmespath_search(
-            "[].%s" % self.RelatedIdsExpression, resources))
+        return set(compile_related_ids(self.RelatedIdsExpression).search(resources))
+
+    def match_related(self, rid, robj, match=None):
+        """Match a related resource, once per related id.
+
+        Many resources typically share the same related resources, ie. the
+        security groups or subnets of instances, so the match is memoized
+        while the related resource is unchanged.
+        """
+        match = match or self.match
+        # the match value varies by resource
+        if self.data.get('match-resource') is True:
+            return match(robj)
+        if self._related_matches is None:
+            self._related_matches = {}
+        cached = self._related_matches.get(rid)
+        if cached is None or cached[0] is not robj:
+            cached = self._related_matches[rid] = (robj, match(robj))
+        return cached[1]
 
     def get_related(self, resources):
         resource_manager = self.get_resource_manager()
@@ -92,7 +115,7 @@ class RelatedResourceFilter(ValueFilter):
                         self.RelatedResource.rsplit('.', 1)[-1],
                         rid)
                 continue
-            if self.match(robj):
+            if self.match_related(rid, robj):
                 found.append(rid)
 
         if found:
@@ -111,6 +134,7 @@ class RelatedResourceFilter(ValueFilter):
 
     def process(self, resources, event=None):
         related = self.get_related(resources)
+        self._related_matches = None
         return [r for r in resources if self.process_resource(r, related)]
 
 
@@ -143,6 +167,9 @@ class RelatedResourceByIdFilter(RelatedResourceFilter):
             ids = [ids]
         return set(ids)
 
+    def count_matches(self, robjs):
+        return len([robj for robj in robjs if robj is not None and self.match(robj)])
+
     def process_resource(self, resource, related):
         related_ids = self.get_related_ids([resource])
         op = self.data.get('operator', 'or')
@@ -159,12 +186,8 @@ class RelatedResourceByIdFilter(RelatedResourceFilter):
             return count_matches
 
         for rid in related_ids:
-            robjs = related.get(rid, [None])
-            for robj in robjs:
-                if robj is None:
-                    continue
-                if self.match(robj):
-                    found.append(rid)
+            found.extend([rid] * self.match_related(
+                rid, related.get(rid, ()), self.count_matches))
 
         if found:
             self._add_annotations(found, resource)
@@ -0,0 +1,32 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+from .core import Filter
+
+from c7n.cache import CacheIndex
+
+
+class UsageFilter(Filter):
+    """Base class for filters on resources being referenced by others.
+
+    Usage filters scan other resource types for the ids they reference,
+    ie. the security groups of enis or the roles of lambda functions. The
+    references found by each scan are indexed by account and region in
+    the resource cache, so policies and filters in a run needing the same
+    references share a single scan.
+    """
+
+    def get_references(self, name, scanner):
+        """Return the ids referenced in a scan, running it on a cache miss.
+
+        :param name: Unique name of the scan, ie. ``security-group:lambda``
+        :param scanner: Callable returning the referenced ids
+        """
+        index = CacheIndex(self.manager, 'references')
+        references = index.get(name)
+        if references is not None:
+            self.log.debug("Using cached references %s: %d", name, len(references))
+            return references
+        # scans may consult indexes of their own, so the cache isn't held.
+        references = set(scanner())
+        index.save(name, references)
+        return references
@@ -6,10 +6,13 @@ try:
 except ImportError:
     from backports.functools_lru_cache import lru_cache
 
+import hashlib
 import logging
 import re
 import os
 
+from c7n import cache
+from c7n.config import Config
 from c7n.exceptions import PolicyValidationError
 from c7n.policy import PolicyCollection
 from c7n.resources import load_resources
@@ -20,6 +23,7 @@ except ImportError:
     schema = None
 from c7n.structure import StructureParser
 from c7n.utils import load_file
+from c7n.version import version
 
 
 log = logging.getLogger('custodian.loader')
@@ -78,6 +82,35 @@ class SchemaValidator:
         return schema.JsonSchemaValidator(rt_schema)
 
 
+class ValidationCache:
+    """Persistent record of policy files which passed validation.
+
+    Entries are keyed on the file content digest and the custodian version,
+    so an unchanged file can skip schema and semantic validation on
+    subsequent runs, the policy names of the file are stored as the value
+    for cross file duplicate checks.
+    """
+
+    # minutes, entries are invalidated by content or version changes.
+    cache_period = 60 * 24 * 30
+
+    def __init__(self, path):
+        self.cache = cache.factory(
+            Config.empty(cache=path, cache_period=self.cache_period))
+        self.cache.load()
+
+    def get_key(self, file_path, *params):
+        with open(file_path, 'rb') as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+        return {'validate': digest, 'version': version, 'params': params}
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def save(self, key, policy_names):
+        self.cache.save(key, sorted(policy_names))
+
+
 class PolicyLoader:
 
     default_schema_validate = bool(schema)
@@ -175,6 +208,7 @@ class SourceLocator:
 class DirectoryLoader(PolicyLoader):
     def load_directory(self, directory, validate=True, recurse=True):
         structure = StructureParser()
+        validator = self.validator
 
         def _validate(data):
             errors = []
@@ -187,8 +221,7 @@ class DirectoryLoader(PolicyLoader):
                 return errors
             rtypes = structure.get_resource_types(data)
             load_resources(rtypes)
-            schm = schema.generate(rtypes)
-            errors += schema.validate(data, schm)
+            errors += validator.validate(data, rtypes)
             return errors
 
         def _load(path, raw_policies, errors, do_validate):
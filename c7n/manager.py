@@ -14,7 +14,7 @@ try:
 except ImportError:
     resources = PluginRegistry('resources')
 
-from c7n.utils import dumps
+from c7n.utils import dumps, TagIndex
 
 
 def iter_filters(filters, block_end=False):
@@ -29,6 +29,26 @@ def iter_filters(filters, block_end=False):
         yield f
 
 
+def order_by_cost(filters):
+    """Order filters cheapest first, where evaluation order can't change results.
+
+    Filters which match resources independently of the resource set, and
+    don't read the annotations of other filters, can be freely reordered
+    with each other. Each run of such filters is stably sorted by cost,
+    other filters keep their position.
+    """
+    ordered, run = [], []
+    for f in filters:
+        if getattr(f, 'streamable', False) and not f.reads_annotations():
+            run.append(f)
+            continue
+        ordered.extend(sorted(run, key=lambda f: f.cost))
+        ordered.append(f)
+        run = []
+    ordered.extend(sorted(run, key=lambda f: f.cost))
+    return ordered
+
+
 class ResourceManager:
     """
     A Cloud Custodian resource
@@ -46,7 +66,7 @@ class ResourceManager:
         self.session_factory = ctx.session_factory
         self.config = ctx.options
         self.data = data
-        self._cache = cache.factory(self.ctx.options)
+        self._cache = cache.factory(self.ctx.options, getattr(self, 'type', None))
         self.log = logging.getLogger('custodian.resources.%s' % (
             self.__class__.__name__.lower()))
 
@@ -98,23 +118,34 @@ class ResourceManager:
             return klass(self.ctx, {'source': self.source_type})
         return klass(self.ctx, data or {})
 
-    def filter_resources(self, resources, event=None):
+    def get_streamable_filters(self):
+        """Split filters into those that can be applied to pages of
+        resources and the remainder which need the complete set."""
+        for idx, f in enumerate(self.filters):
+            if not f.streamable:
+                return self.filters[:idx], self.filters[idx:]
+        return self.filters, []
+
+    def filter_resources(self, resources, event=None, filters=None):
         original = len(resources)
+        if filters is None:
+            filters = self.filters
         if event and event.get('debug', False):
             self.log.info(
-                "Filtering resources using %d filters", len(self.filters))
-        for idx, f in enumerate(self.filters, start=1):
-            if not resources:
-                break
-            rcount = len(resources)
-
-            with self.ctx.tracer.subsegment("filter:%s" % f.type):
-                resources = f.process(resources, event)
-
-            if event and event.get('debug', False):
-                self.log.debug(
-                    "Filter #%d applied %d->%d filter: %s",
-                    idx, rcount, len(resources), dumps(f.data, indent=None))
+                "Filtering resources using %d filters", len(filters))
+        with TagIndex():
+            for idx, f in enumerate(order_by_cost(filters), start=1):
+                if not resources:
+                    break
+                rcount = len(resources)
+
+                with self.ctx.tracer.subsegment("filter:%s" % f.type):
+                    resources = f.process(resources, event)
+
+                if event and event.get('debug', False):
+                    self.log.debug(
+                        "Filter #%d applied %d->%d filter: %s",
+                        idx, rcount, len(resources), dumps(f.data, indent=None))
         self.log.debug("Filtered from %d to %d %s" % (
             original, len(resources), self.__class__.__name__.lower()))
         return resources
@@ -6,9 +6,13 @@ Cloud Custodian Lambda Provisioning Support
 docs/lambda.rst
 """
 import abc
+import ast
+import atexit
 import base64
 import hashlib
 import importlib
+import importlib.util
+import inspect
 import io
 import json
 import logging
@@ -16,6 +20,7 @@ import os
 import shutil
 import time
 import tempfile
+import textwrap
 import zipfile
 import platform
 
@@ -163,7 +168,9 @@ class PythonPackageArchive:
             # py3 remove pyc cache dirs.
             if '__pycache__' in dirs:
                 dirs.remove('__pycache__')
-            for f in files:
+            # walk in a stable order so archives are reproducible.
+            dirs.sort()
+            for f in sorted(files):
                 dest_path = os.path.join(arc_prefix, f)
 
                 # ignore specific files
@@ -340,7 +347,7 @@ def _package_deps(package, deps=None, ignore=()):
     return deps
 
 
-def custodian_archive(packages=None):
+def custodian_archive(packages=None, c7n_modules=None):
     """Create a lambda code archive for running custodian.
 
     Lambda archive currently always includes `c7n`.  Add additional
@@ -359,11 +366,161 @@ def custodian_archive(packages=None):
 
     packages: List of additional packages to include in the lambda archive.
 
+    Policies can also opt in to an archive with only the c7n modules
+    needed for their resource, filters and actions, reducing its size
+    and the function's cold start time.
+
+    .. code-block:: yaml
+
+        policy:
+          name: lambda-archive-example
+          resource: s3
+          mode:
+            slim-archive: true
+
+    c7n_modules: Names of the c7n modules to include in place of the whole
+    package, as computed by :py:func:`get_policy_modules`.
+
     """
     modules = {'c7n'}
     if packages:
         modules = filter(None, modules.union(packages))
-    return PythonPackageArchive(sorted(modules))
+    if c7n_modules:
+        c7n_modules = tuple(sorted(c7n_modules))
+    return PythonPackageArchive(
+        cache_file=get_module_archive(tuple(sorted(modules)), c7n_modules))
+
+
+# closed archives of module sets, keyed by module names.
+_module_archives = {}
+atexit.register(_module_archives.clear)
+
+
+def get_module_archive(modules, c7n_modules=None):
+    """Return the path of an archive of the given modules.
+
+    Zipping the modules dominates archive creation, so each module set is
+    archived once per process and copied for each function's archive.
+    """
+    key = (modules, c7n_modules)
+    archive = _module_archives.get(key)
+    if archive is not None:
+        return archive.path
+    if not c7n_modules:
+        archive = PythonPackageArchive(modules)
+    else:
+        archive = PythonPackageArchive([m for m in modules if m != 'c7n'])
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for name in c7n_modules:
+            path = get_module_path(name)
+            archive.add_file(path, os.path.relpath(path, base_dir))
+    _module_archives[key] = archive.close()
+    return archive.path
+
+
+def get_module_path(name):
+    """Return the source path of a c7n module, or None if its not a module."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(base_dir, *name.split('.'))
+    for candidate in (path + '.py', os.path.join(path, '__init__.py')):
+        if os.path.isfile(candidate):
+            return candidate
+
+
+def get_module_closure(modules):
+    """Return the c7n modules imported by the given modules, including them.
+
+    Imports are found statically from module sources, including imports
+    deferred within functions, along with the packages of each module.
+    """
+    closure = set()
+    pending = list(modules)
+    while pending:
+        name = pending.pop()
+        if name in closure:
+            continue
+        path = get_module_path(name)
+        if path is None:
+            continue
+        closure.add(name)
+        package = name if path.endswith('__init__.py') else name.rpartition('.')[0]
+        if package != name:
+            pending.append(package)
+        with open(path, encoding='utf-8') as fh:
+            tree = ast.parse(fh.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ''
+                if node.level:
+                    base = importlib.util.resolve_name('.' * node.level + base, package)
+                # imported names may be either modules or module attributes.
+                names = [base] + ['%s.%s' % (base, alias.name) for alias in node.names]
+            else:
+                continue
+            pending.extend(n for n in names if n == 'c7n' or n.startswith('c7n.'))
+    return closure
+
+
+def get_class_references(klass, resource_map):
+    """Return the c7n classes referenced by string from a class and its bases.
+
+    Resources are loaded by type name at runtime, ie. by related resource
+    filters, so string constants naming a resource type or a c7n class are
+    treated as references.
+    """
+    references = set()
+    for cls in klass.__mro__:
+        if not cls.__module__.startswith('c7n.'):
+            continue
+        try:
+            tree = ast.parse(textwrap.dedent(inspect.getsource(cls)))
+        except (OSError, TypeError):
+            continue
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Constant) or not isinstance(node.value, str):
+                continue
+            value = resource_map.get(node.value) or resource_map.get(
+                'aws.%s' % node.value, node.value)
+            if value.startswith('c7n.') and get_module_path(value.rpartition('.')[0]):
+                references.add(value)
+    return references
+
+
+def get_policy_modules(policy):
+    """Return the c7n modules needed to run a policy in lambda.
+
+    The policy's resource, execution mode, filter and action classes, and
+    the resource classes they reference, are scanned for references to
+    other resources, and the import closure of their modules computed
+    along with that of the lambda handler.
+    """
+    from c7n.resources.aws import AWS
+
+    resource_paths = set(AWS.resource_map.values())
+    classes = [type(policy.resource_manager), type(policy.get_execution_mode())]
+    classes.extend(type(f) for f in policy.resource_manager.iter_filters())
+    classes.extend(type(a) for a in policy.resource_manager.actions)
+
+    modules = {'c7n.handler'}
+    seen = set()
+    while classes:
+        klass = classes.pop()
+        if klass in seen:
+            continue
+        seen.add(klass)
+        modules.add(klass.__module__)
+        # resource specific sources, ie. describe augmentation.
+        classes.extend(
+            s for s in getattr(klass, 'source_mapping', {}).values()
+            if s.__module__ == klass.__module__)
+        for class_path in get_class_references(klass, AWS.resource_map):
+            module_name, class_name = class_path.rsplit('.', 1)
+            modules.add(module_name)
+            if class_path in resource_paths:
+                classes.append(getattr(importlib.import_module(module_name), class_name))
+    return get_module_closure(modules)
 
 
 class LambdaManager:
@@ -459,10 +616,15 @@ class LambdaManager:
         assert role, "Lambda function role must be specified"
         archive = func.get_archive()
         existing = self.get(func.name, qualifier)
+        code_changed = not existing or (
+            archive.get_checksum() != existing['Configuration']['CodeSha256'])
 
         if s3_uri:
             # TODO: support versioned buckets
-            bucket, key = self._upload_func(s3_uri, func, archive)
+            if code_changed:
+                bucket, key = self._upload_func(s3_uri, func, archive)
+            else:
+                bucket, key = self._get_s3_location(s3_uri, func)
             code_ref = {'S3Bucket': bucket, 'S3Key': key}
         else:
             code_ref = {'ZipFile': archive.get_bytes()}
@@ -470,7 +632,7 @@ class LambdaManager:
         changed = False
         if existing:
             result = old_config = existing['Configuration']
-            if archive.get_checksum() != old_config['CodeSha256']:
+            if code_changed:
                 log.debug("Updating function %s code", func.name)
                 params = dict(FunctionName=func.name, Publish=True)
                 params.update(code_ref)
@@ -562,10 +724,13 @@ class LambdaManager:
             changed = True
         return changed
 
+    def _get_s3_location(self, s3_uri, func):
+        _, bucket, key_prefix = parse_s3(s3_uri)
+        return bucket, "%s/%s" % (key_prefix, func.name)
+
     def _upload_func(self, s3_uri, func, archive):
         from boto3.s3.transfer import S3Transfer, TransferConfig
-        _, bucket, key_prefix = parse_s3(s3_uri)
-        key = "%s/%s" % (key_prefix, func.name)
+        bucket, key = self._get_s3_location(s3_uri, func)
         transfer = S3Transfer(
             self.session_factory().client('s3'),
             config=TransferConfig(
@@ -854,7 +1019,10 @@ class PolicyLambda(AbstractLambdaFunction):
 
     def __init__(self, policy):
         self.policy = policy
-        self.archive = custodian_archive(packages=self.packages)
+        c7n_modules = None
+        if self.policy.data['mode'].get('slim-archive'):
+            c7n_modules = get_policy_modules(self.policy)
+        self.archive = custodian_archive(packages=self.packages, c7n_modules=c7n_modules)
 
     @property
     def name(self):
@@ -8,12 +8,14 @@ See docs/usage/outputs.rst
 
 """
 import contextlib
+import contextvars
 import datetime
 import gzip
 import logging
 import os
 import shutil
 import tempfile
+import threading
 import time
 import uuid
 
@@ -21,7 +23,7 @@ from abc import ABC, abstractmethod
 
 from c7n.exceptions import InvalidOutputConfig
 from c7n.registry import PluginRegistry
-from c7n.utils import parse_url_config, join_output_path
+from c7n.utils import dumps, parse_url_config, join_output_path
 
 try:
     import psutil
@@ -36,6 +38,10 @@ log = logging.getLogger('custodian.output')
 # TODO remove
 DEFAULT_NAMESPACE = "CloudMaid"
 
+# the log output of the executing policy, carried into the worker
+# threads it starts, to separate the logs of concurrent policies.
+log_context = contextvars.ContextVar('c7n_log_context', default=None)
+
 
 class OutputRegistry(PluginRegistry):
 
@@ -108,6 +114,112 @@ class NullTracer:
         """Exit main segment for policy execution.
         """
 
+    def write_output(self, output):
+        """Write any trace files to the policy output before it is closed.
+        """
+
+
+@tracer_outputs.register('profile')
+class ProfileTracer(NullTracer):
+    """Record a timing profile of a policy execution.
+
+    Each subsegment (resource fetch, augment, every filter including
+    those nested in boolean blocks, and every action) records its wall
+    time and thread along with the api calls, response bytes and sdk
+    retries made while it was active.
+
+    The profile is written alongside metadata.json as profile.json, and
+    as profile.trace.json in chrome trace event format for viewing with
+    chrome://tracing, perfetto or speedscope.
+
+    Usage: custodian run --trace profile
+
+    Api usage in a subsegment is the process wide delta over its
+    duration, so it includes calls from any concurrently active threads.
+    """
+
+    def __init__(self, ctx, config=None):
+        super().__init__(ctx, config)
+        self.root = None
+        self.local = threading.local()
+
+    def get_usage(self):
+        usage = {}
+        api_stats = self.ctx.api_stats
+        if api_stats is None:
+            return usage
+        if hasattr(api_stats, 'get_snapshot'):
+            usage['api_calls'] = api_stats.get_snapshot()
+        usage.update(getattr(api_stats, 'usage', {}))
+        return usage
+
+    def start_segment(self, name):
+        return {
+            'name': name,
+            'thread': threading.get_ident(),
+            'start': time.time(),
+            'usage': self.get_usage(),
+            'children': []}
+
+    def end_segment(self, segment):
+        segment['duration'] = time.time() - segment['start']
+        before, after = segment['usage'], self.get_usage()
+        usage = {}
+        for k, v in after.items():
+            if k == 'api_calls':
+                calls = {api: count - before.get(k, {}).get(api, 0)
+                         for api, count in v.items()}
+                usage[k] = {api: count for api, count in calls.items() if count}
+            else:
+                usage[k] = v - before.get(k, 0)
+        segment['usage'] = usage
+
+    @contextlib.contextmanager
+    def subsegment(self, name):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        # subsegments in worker threads attach to the policy segment.
+        parent = stack and stack[-1] or self.root
+        segment = self.start_segment(name)
+        stack.append(segment)
+        try:
+            yield self
+        finally:
+            stack.pop()
+            self.end_segment(segment)
+            if parent is not None:
+                parent['children'].append(segment)
+
+    def __enter__(self):
+        self.root = self.start_segment(self.ctx.policy.name)
+        self.local.stack = [self.root]
+
+    def write_output(self, output):
+        if self.root is None or 'duration' in self.root:
+            return
+        self.end_segment(self.root)
+        output.write_file('profile.json', dumps(self.root, indent=2))
+        output.write_file('profile.trace.json', dumps(
+            {'traceEvents': self.get_trace_events(self.root),
+             'displayTimeUnit': 'ms'}))
+
+    def get_trace_events(self, segment, events=None):
+        if events is None:
+            events = []
+        args = dict(segment['usage'])
+        events.append({
+            'name': segment['name'],
+            'ph': 'X',
+            'pid': os.getpid(),
+            'tid': segment['thread'],
+            'ts': int(segment['start'] * 1e6),
+            'dur': int(segment['duration'] * 1e6),
+            'args': args})
+        for child in segment['children']:
+            self.get_trace_events(child, events)
+        return events
+
 
 class DeltaStats:
     """Capture stats (dictionary of string->integer) as a stack.
@@ -322,6 +434,7 @@ class LogOutput:
         self.ctx = ctx
         self.config = config or {}
         self.handler = None
+        self.context_token = None
 
     def get_handler(self):
         raise NotImplementedError()
@@ -342,6 +455,11 @@ class LogOutput:
             return
         self.handler.setLevel(logging.DEBUG)
         self.handler.setFormatter(logging.Formatter(self.log_format))
+        # with concurrent policy execution, only capture this policy's logs.
+        options = getattr(self.ctx, 'options', None)
+        if getattr(options, 'policy_concurrency', 1) > 1:
+            self.context_token = log_context.set(self)
+            self.handler.addFilter(ContextLogFilter(self))
         mlog = logging.getLogger('custodian')
         mlog.addHandler(self.handler)
 
@@ -352,6 +470,24 @@ class LogOutput:
         mlog.removeHandler(self.handler)
         self.handler.flush()
         self.handler.close()
+        if self.context_token is not None:
+            log_context.reset(self.context_token)
+            self.context_token = None
+
+
+class ContextLogFilter(logging.Filter):
+    """Filter log records to those emitted within a log output's context.
+
+    Thread pools from c7n.executor copy the context of the submitting
+    thread, so records from a policy's worker threads are included.
+    """
+
+    def __init__(self, output):
+        super().__init__()
+        self.output = output
+
+    def filter(self, record):
+        return log_context.get() is self.output
 
 
 @log_outputs.register('default')
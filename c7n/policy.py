@@ -348,6 +348,14 @@ class PullMode(PolicyExecutionMode):
                 "ResourceCount", len(resources), "Count", Scope="Policy"
             )
             ctx.metrics.put_metric("ResourceTime", rt, "Seconds", Scope="Policy")
+            cache_stats = getattr(self.policy.get_cache(), 'stats', None)
+            if cache_stats:
+                ctx.metrics.put_metric(
+                    "CacheHits", cache_stats['hits'], "Count", Scope="Policy")
+                ctx.metrics.put_metric(
+                    "CacheMisses", cache_stats['misses'], "Count", Scope="Policy")
+                ctx.metrics.put_metric(
+                    "CacheBytes", cache_stats['bytes'], "Bytes", Scope="Policy")
             ctx.output.write_file('resources.json', utils.dumps(resources, indent=2))
 
             if not resources:
@@ -389,6 +397,7 @@ class LambdaMode(ServerlessExecutionMode):
             'function-prefix': {'type': 'string'},
             'member-role': {'type': 'string'},
             'packages': {'type': 'array', 'items': {'type': 'string'}},
+            'slim-archive': {'type': 'boolean'},
             # Lambda passthrough config
             'layers': {'type': 'array', 'items': {'type': 'string'}},
             'concurrency': {'type': 'integer'},
@@ -6,6 +6,7 @@ Query capability built on skew metamodel
 tags_spec -> s3, elb, rds
 """
 from concurrent.futures import as_completed
+import copy
 import functools
 import itertools
 import json
@@ -15,6 +16,7 @@ import os
 
 from c7n.actions import ActionRegistry
 from c7n.exceptions import ClientError, ResourceLimitExceeded, PolicyExecutionError
+from c7n.executor import service_limits
 from c7n.filters import FilterRegistry, MetricsFilter
 from c7n.manager import ResourceManager
 from c7n.registry import PluginRegistry
@@ -64,8 +66,37 @@ class ResourceQuery:
 
         return data
 
+    def _invoke_client_pages(self, client, enum_op, params, path, retry=None):
+        if client.can_paginate(enum_op):
+            p = client.get_paginator(enum_op)
+            if retry:
+                p.PAGE_ITERATOR_CLS = RetryPageIterator
+            pages = p.paginate(**params)
+        else:
+            pages = [getattr(client, enum_op)(**params)]
+
+        if path:
+            path = jmespath_compile(path)
+        for page in pages:
+            if path:
+                page = path.search(page)
+            yield page or []
+
     def filter(self, resource_manager, **params):
         """Query a set of resources."""
+        client, enum_op, path = self._get_enum_args(resource_manager, params)
+        return self._invoke_client_enum(
+            client, enum_op, params, path,
+            getattr(resource_manager, 'retry', None)) or []
+
+    def filter_pages(self, resource_manager, **params):
+        """Query a set of resources, yielding each page as retrieved."""
+        client, enum_op, path = self._get_enum_args(resource_manager, params)
+        return self._invoke_client_pages(
+            client, enum_op, params, path,
+            getattr(resource_manager, 'retry', None))
+
+    def _get_enum_args(self, resource_manager, params):
         m = self.resolve(resource_manager.resource_type)
         if resource_manager.get_client:
             client = resource_manager.get_client()
@@ -75,9 +106,7 @@ class ResourceQuery:
         enum_op, path, extra_args = m.enum_spec
         if extra_args:
             params.update(extra_args)
-        return self._invoke_client_enum(
-            client, enum_op, params, path,
-            getattr(resource_manager, 'retry', None)) or []
+        return client, enum_op, path
 
     def get(self, resource_manager, identities):
         """Get resources by identities
@@ -121,6 +150,8 @@ class ChildResourceQuery(ResourceQuery):
 
     capture_parent_id = False
     parent_key = 'c7n:parent-id'
+    # number of parents to enumerate children of concurrently
+    max_workers = 8
 
     def __init__(self, session_factory, manager):
         self.session_factory = session_factory
@@ -158,18 +189,23 @@ class ChildResourceQuery(ResourceQuery):
             return self._invoke_client_enum(client, enum_op, params, path)
 
         # Have to query separately for each parent's children.
-        results = []
-        for parent_id in parent_ids:
+        def get_children(parent_id):
             merged_params = self.get_parent_parameters(params, parent_id, parent_key)
-            subset = self._invoke_client_enum(
-                client, enum_op, merged_params, path, retry=self.manager.retry)
-            if annotate_parent:
-                for r in subset:
-                    r[self.parent_key] = parent_id
-            if subset and self.capture_parent_id:
-                results.extend([(parent_id, s) for s in subset])
-            elif subset:
-                results.extend(subset)
+            return parent_id, self._invoke_client_enum(
+                client, enum_op, merged_params, path, retry=self.manager.retry) or []
+
+        results = []
+        with self.manager.executor_factory(
+                max_workers=min(self.max_workers, len(parent_ids))) as w:
+            # map preserves parent ordering in the results
+            for parent_id, subset in w.map(get_children, parent_ids):
+                if annotate_parent:
+                    for r in subset:
+                        r[self.parent_key] = parent_id
+                if subset and self.capture_parent_id:
+                    results.extend([(parent_id, s) for s in subset])
+                elif subset:
+                    results.extend(subset)
         return results
 
     def get_parent_parameters(self, params, parent_id, parent_key):
@@ -231,6 +267,15 @@ class DescribeSource:
     def resources(self, query):
         return self.query.filter(self.manager, **query)
 
+    def pages(self, query):
+        """Yield pages of resources as they are retrieved."""
+        # customized queries only support retrieval of the full set.
+        if (type(self).resources is not DescribeSource.resources or
+                type(self.query).filter is not ResourceQuery.filter):
+            yield self.resources(query)
+            return
+        yield from self.query.filter_pages(self.manager, **query)
+
     def get_query(self):
         return self.resource_query_factory(self.manager.session_factory)
 
@@ -280,7 +325,9 @@ class DescribeSource:
 class DescribeWithResourceTags(DescribeSource):
 
     def augment(self, resources):
-        return universal_augment(self.manager, super().augment(resources))
+        resources = super().augment(resources)
+        with self.manager.ctx.tracer.subsegment('resource-augment:tags'):
+            return universal_augment(self.manager, resources)
 
 
 @sources.register('describe-child')
@@ -523,6 +570,9 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
 
     def resources(self, query=None, augment=True) -> List[dict]:
         query = self.source.get_query_params(query)
+        if augment and getattr(self.config, 'stream', False):
+            return self.stream_resources(query)
+
         cache_key = self.get_cache_key(query)
         resources = None
 
@@ -553,6 +603,36 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
             self.check_resource_limit(len(resources), resource_count)
         return resources
 
+    def stream_resources(self, query):
+        """Retrieve, augment and filter resources a page at a time.
+
+        Per resource (streamable) filters are applied to each page as it
+        is retrieved, so only matching resources are retained. Filters
+        from the first that needs the complete resource set onwards are
+        applied to the retained resources. The population isn't
+        retained, so it is not cached.
+        """
+        streamed, remaining = self.get_streamable_filters()
+        pages = getattr(self.source, 'pages', None)
+        if query is None:
+            query = {}
+
+        resources = []
+        resource_count = 0
+        with self.ctx.tracer.subsegment('resource-stream'):
+            for page in (pages and pages(query) or [self.source.resources(query)]):
+                resource_count += len(page)
+                page = self.augment(page)
+                resources.extend(self.filter_resources(page, filters=streamed))
+
+        if remaining:
+            with self.ctx.tracer.subsegment('filter'):
+                resources = self.filter_resources(resources, filters=remaining)
+
+        if self.data == self.ctx.policy.data:
+            self.check_resource_limit(len(resources), resource_count)
+        return resources
+
     def check_resource_limit(self, selection_count, population_count):
         """Check if policy's execution affects more resources then its limit.
 
@@ -563,32 +643,65 @@ class QueryResourceManager(ResourceManager, metaclass=QueryMeta):
         max_resource_limits = MaxResourceLimit(p, selection_count, population_count)
         return max_resource_limits.check_resource_limits()
 
+    def get_resource_cache_key(self, resource_id):
+        return dict(self.get_cache_key(None), id=resource_id)
+
     def _get_cached_resources(self, ids):
         key = self.get_cache_key(None)
         with self._cache:
-            resources = self._cache.get(key)
+            # peek so a population planned for the policy isn't consumed
+            resources = self._cache.peek(key)
             if resources is not None:
                 self.log.debug("Using cached results for get_resources")
                 m = self.get_model()
                 id_set = set(ids)
-                return [r for r in resources if r[m.id] in id_set]
+                return [copy.deepcopy(r) for r in resources if r[m.id] in id_set]
         return None
 
+    def _get_partial_cached_resources(self, ids):
+        """Get resources by id from the cached population, and for any ids
+        not found there, from individually cached resources.
+
+        Returns the resources found and the ids that were not.
+        """
+        m = self.get_model()
+        resources = self._get_cached_resources(ids) or []
+        found = {r[m.id] for r in resources}
+        with self._cache:
+            for rid in ids:
+                if rid in found:
+                    continue
+                r = self._cache.get(self.get_resource_cache_key(rid))
+                if r is not None:
+                    resources.append(copy.deepcopy(r))
+                    found.add(rid)
+        return resources, [rid for rid in ids if rid not in found]
+
     def get_resources(self, ids, cache=True, augment=True):
         if not ids:
             return []
+        resources = []
         if cache:
-            resources = self._get_cached_resources(ids)
-            if resources is not None:
+            resources, ids = self._get_partial_cached_resources(ids)
+            if not ids:
                 return resources
         try:
-            resources = self.source.get_resources(ids)
+            fetched = self.source.get_resources(ids)
             if augment:
-                resources = self.augment(resources)
-            return resources
+                fetched = self.augment(fetched)
         except ClientError as e:
             self.log.warning("event ids not resolved: %s error:%s" % (ids, e))
-            return []
+            return resources
+        if fetched is None:
+            return resources or None
+        # Don't pollute cache with unaugmented resources.
+        if cache and augment:
+            m = self.get_model()
+            with self._cache:
+                self._cache.save_many([
+                    (self.get_resource_cache_key(r[m.id]), copy.deepcopy(r))
+                    for r in fetched])
+        return resources + fetched
 
     def augment(self, resources):
         """subclasses may want to augment resources with additional information.
@@ -729,7 +842,8 @@ def _batch_augment(manager, model, detail_spec, client, resource_set):
     kw = {param_name: [param_key and r[param_key] or r for r in resource_set]}
     if detail_args:
         kw.update(detail_args)
-    response = op(*args, **kw)
+    with service_limits(model.service):
+        response = op(*args, **kw)
     return response[detail_path]
 
 
@@ -744,7 +858,8 @@ def _scalar_augment(manager, model, detail_spec, client, resource_set):
     results = []
     for r in resource_set:
         kw = {param_name: param_key and r[param_key] or r}
-        response = op(*args, **kw)
+        with service_limits(model.service):
+            response = op(*args, **kw)
         if detail_path:
             response = response[detail_path]
         else:
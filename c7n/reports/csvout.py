@@ -43,7 +43,8 @@ from botocore.compat import OrderedDict
 from dateutil.parser import parse as date_parse
 
 from c7n.executor import ThreadPoolExecutor
-from c7n.utils import local_session, dumps, jmespath_search, jmespath_compile
+from c7n.utils import (
+    local_session, dumps, get_tag_map, jmespath_search, jmespath_compile)
 
 log = logging.getLogger('custodian.reports')
 
@@ -185,7 +186,7 @@ class Formatter:
         return self.fields.keys()
 
     def extract_csv(self, record):
-        tag_map = {t['Key']: t['Value'] for t in record.get('Tags', ())}
+        tag_map = get_tag_map(record)
         return _get_values(record, self.fields.values(), tag_map)
 
     def uniq_by_id(self, records):
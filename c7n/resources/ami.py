@@ -1,5 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import copy
 import re
 import datetime
 from datetime import timedelta
@@ -8,19 +9,17 @@ from dateutil.tz import tzutc
 import itertools
 import logging
 
-from concurrent.futures import as_completed
-
 from c7n.actions import BaseAction
 from c7n.exceptions import ClientError, PolicyValidationError
-from c7n.filters import (
-    AgeFilter, ValueFilter, Filter, CrossAccountAccessFilter)
+from c7n.filters import AgeFilter, ValueFilter
+from c7n.filters.iamaccess import CrossAccountAttributeFilter
+from c7n.filters.usage import UsageFilter
 from c7n.manager import resources
-from c7n.query import QueryResourceManager, DescribeSource, TypeInfo
+from c7n.query import QueryResourceManager, DescribeSource, RetryPageIterator, TypeInfo
 from c7n.resolver import ValuesFrom
 from c7n.utils import (
     local_session,
     type_schema,
-    chunks,
     merge_dict_list,
     parse_date,
     jmespath_compile
@@ -271,8 +270,11 @@ class RemoveLaunchPermissions(BaseAction):
 
     def process(self, images):
         client = local_session(self.manager.session_factory).client('ec2')
-        for i in images:
-            self.process_image(client, i)
+        try:
+            for i in images:
+                self.process_image(client, i)
+        finally:
+            AmiCrossAccountFilter.invalidate_attributes(self.manager, images)
 
     def process_image(self, client, image):
         accounts = self.data.get('accounts')
@@ -419,8 +421,11 @@ class SetPermissions(BaseAction):
 
     def process(self, images):
         client = local_session(self.manager.session_factory).client('ec2')
-        for i in images:
-            self.process_image(client, i)
+        try:
+            for i in images:
+                self.process_image(client, i)
+        finally:
+            AmiCrossAccountFilter.invalidate_attributes(self.manager, images)
 
     def process_image(self, client, image):
         to_add = self.data.get('add')
@@ -565,7 +570,7 @@ class ImageAgeFilter(AgeFilter):
 
 
 @AMI.filter_registry.register('unused')
-class ImageUnusedFilter(Filter):
+class ImageUnusedFilter(UsageFilter):
     """Filters images based on usage
 
     true: image has no instances spawned from it
@@ -612,31 +617,64 @@ class ImageUnusedFilter(Filter):
         return {i['ImageId'] for i in ec2_manager.resources()}
 
     def process(self, resources, event=None):
-        images = self._pull_ec2_images().union(self._pull_asg_images())
+        images = self.get_references('ami:ec2', self._pull_ec2_images).union(
+            self.get_references('ami:asg', self._pull_asg_images))
         if self.data.get('value', True):
             return [r for r in resources if r['ImageId'] not in images]
         return [r for r in resources if r['ImageId'] in images]
 
 
 @AMI.filter_registry.register('cross-account')
-class AmiCrossAccountFilter(CrossAccountAccessFilter):
+class AmiCrossAccountFilter(CrossAccountAttributeFilter):
 
     schema = type_schema(
         'cross-account',
+        # only consider images launchable by everyone
+        everyone_only={'type': 'boolean'},
         # white list accounts
         whitelist_from=ValuesFrom.schema,
         whitelist={'type': 'array', 'items': {'type': 'string'}})
 
-    permissions = ('ec2:DescribeImageAttribute',)
+    permissions = ('ec2:DescribeImageAttribute', 'ec2:DescribeImages')
     annotation_key = 'c7n:CrossAccountViolations'
+    attribute = 'launchPermission'
+
+    def get_resource_attribute(self, client, resource):
+        return self.manager.retry(
+            client.describe_image_attribute,
+            ImageId=resource['ImageId'],
+            Attribute=self.attribute)['LaunchPermissions']
+
+    def get_public_images(self):
+        """Get the ids of owned images launchable by everyone.
+
+        Public images can be listed in bulk, which spares a per image
+        attribute lookup when only checking public access.
+        """
+        client = local_session(self.manager.session_factory).client('ec2')
+        paginator = client.get_paginator('describe_images')
+        paginator.PAGE_ITERATOR_CLS = RetryPageIterator
+        results = paginator.paginate(
+            Owners=['self'], ExecutableUsers=['all']).build_full_result()
+        return {i['ImageId'] for i in results.get('Images', ())}
 
-    def process_resource_set(self, client, accounts, resource_set):
+    def process(self, resources, event=None):
         results = []
-        for r in resource_set:
-            attrs = self.manager.retry(
-                client.describe_image_attribute,
-                ImageId=r['ImageId'],
-                Attribute='launchPermission')['LaunchPermissions']
+        accounts = self.get_accounts()
+        if self.data.get('everyone_only', False):
+            public = self.get_public_images()
+            delta_accounts = {'all'}.difference(accounts)
+            for r in resources:
+                if r['ImageId'] in public and delta_accounts:
+                    r[self.annotation_key] = list(delta_accounts)
+                    results.append(r)
+            return results
+
+        attributes = self.get_attributes(resources)
+        for r in resources:
+            if r['ImageId'] not in attributes:
+                continue
+            attrs = copy.deepcopy(attributes[r['ImageId']])
             r['c7n:LaunchPermissions'] = attrs
             image_accounts = {
                 a.get('Group') or a.get('UserId') or
@@ -649,25 +687,6 @@ class AmiCrossAccountFilter(CrossAccountAccessFilter):
                 results.append(r)
         return results
 
-    def process(self, resources, event=None):
-        results = []
-        client = local_session(self.manager.session_factory).client('ec2')
-        accounts = self.get_accounts()
-        with self.executor_factory(max_workers=2) as w:
-            futures = []
-            for resource_set in chunks(resources, 20):
-                futures.append(
-                    w.submit(
-                        self.process_resource_set, client, accounts, resource_set))
-            for f in as_completed(futures):
-                if f.exception():
-                    self.log.error(
-                        "Exception checking cross account access \n %s" % (
-                            f.exception()))
-                    continue
-                results.extend(f.result())
-        return results
-
 
 @AMI.filter_registry.register('image-attribute')
 class ImageAttribute(ValueFilter):
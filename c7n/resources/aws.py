@@ -7,6 +7,8 @@ from collections import Counter, namedtuple
 import contextlib
 import copy
 import datetime
+import functools
+import importlib.util
 import itertools
 import logging
 import os
@@ -55,13 +57,10 @@ from c7n import credentials, utils
 
 log = logging.getLogger('custodian.aws')
 
-try:
-    from aws_xray_sdk.core import xray_recorder, patch
-    from aws_xray_sdk.core.context import Context
-    HAVE_XRAY = True
-except ImportError:
-    HAVE_XRAY = False
-    class Context: pass  # NOQA
+# importing the xray sdk instantiates its recorder which is a noticeable
+# fraction of cli startup, so we only check for its presence here and
+# import it when the xray tracer is in use.
+HAVE_XRAY = importlib.util.find_spec('aws_xray_sdk') is not None
 
 _profile_session = None
 
@@ -501,7 +500,7 @@ class XrayEmitter:
                 TraceSegmentDocuments=[s.serialize() for s in segment_set])
 
 
-class XrayContext(Context):
+class XrayContextMixin:
     """Specialized XRay Context for Custodian.
 
     A context is used as a segment storage stack for currently in
@@ -521,7 +520,7 @@ class XrayContext(Context):
     """
 
     def __init__(self, *args, **kw):
-        super(XrayContext, self).__init__(*args, **kw)
+        super().__init__(*args, **kw)
         self._local = Bag()
         self._current_subsegment = None
         self._main_tid = threading.get_ident()
@@ -574,6 +573,19 @@ class XrayContext(Context):
         return self.handle_context_missing()
 
 
+@functools.lru_cache(maxsize=None)
+def get_xray_context_class():
+    from aws_xray_sdk.core.context import Context
+    return type('XrayContext', (XrayContextMixin, Context), {
+        '__module__': __name__, '__doc__': XrayContextMixin.__doc__})
+
+
+def __getattr__(name):
+    if name == 'XrayContext' and HAVE_XRAY:
+        return get_xray_context_class()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 @tracer_outputs.register('xray', condition=HAVE_XRAY)
 class XrayTracer:
 
@@ -585,7 +597,8 @@ class XrayTracer:
 
     @classmethod
     def initialize(cls, config):
-        context = XrayContext()
+        from aws_xray_sdk.core import xray_recorder, patch
+        context = get_xray_context_class()()
         sampling = config.get('sample', 'true') == 'true' and True or False
         xray_recorder.configure(
             emitter=cls.use_daemon is False and cls.emitter or None,
@@ -601,17 +614,22 @@ class XrayTracer:
         self.client = None
         self.metadata = {}
 
+    @property
+    def recorder(self):
+        from aws_xray_sdk.core import xray_recorder
+        return xray_recorder
+
     @contextlib.contextmanager
     def subsegment(self, name):
-        segment = xray_recorder.begin_subsegment(name)
+        segment = self.recorder.begin_subsegment(name)
         try:
             yield segment
         except Exception as e:
-            stack = traceback.extract_stack(limit=xray_recorder.max_trace_back)
+            stack = traceback.extract_stack(limit=self.recorder.max_trace_back)
             segment.add_exception(e, stack)
             raise
         finally:
-            xray_recorder.end_subsegment(time.time())
+            self.recorder.end_subsegment(time.time())
 
     def __enter__(self):
         if self.client is None:
@@ -620,25 +638,25 @@ class XrayTracer:
         self.emitter.client = self.client
 
         if self.in_lambda:
-            self.segment = xray_recorder.begin_subsegment(self.service_name)
+            self.segment = self.recorder.begin_subsegment(self.service_name)
         else:
-            self.segment = xray_recorder.begin_segment(
+            self.segment = self.recorder.begin_segment(
                 self.service_name, sampling=True)
 
         p = self.ctx.policy
-        xray_recorder.put_annotation('policy', p.name)
-        xray_recorder.put_annotation('resource', p.resource_type)
+        self.recorder.put_annotation('policy', p.name)
+        self.recorder.put_annotation('resource', p.resource_type)
         if self.ctx.options.account_id:
-            xray_recorder.put_annotation('account', self.ctx.options.account_id)
+            self.recorder.put_annotation('account', self.ctx.options.account_id)
 
     def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
         metadata = self.ctx.get_metadata(('api-stats',))
         metadata.update(self.metadata)
-        xray_recorder.put_metadata('custodian', metadata)
+        self.recorder.put_metadata('custodian', metadata)
         if self.in_lambda:
-            xray_recorder.end_subsegment()
+            self.recorder.end_subsegment()
             return
-        xray_recorder.end_segment()
+        self.recorder.end_segment()
         if not self.use_daemon:
             self.emitter.flush()
             log.info(
@@ -653,6 +671,7 @@ class ApiStats(DeltaStats):
     def __init__(self, ctx, config=None):
         super(ApiStats, self).__init__(ctx, config)
         self.api_calls = Counter()
+        self.usage = Counter(bytes=0, retries=0)
 
     def get_snapshot(self):
         return dict(self.api_calls)
@@ -685,6 +704,10 @@ class ApiStats(DeltaStats):
     def _record(self, http_response, parsed, model, **kwargs):
         self.api_calls["%s.%s" % (
             model.service_model.endpoint_prefix, model.name)] += 1
+        self.usage['bytes'] += int(
+            http_response.headers.get('content-length') or 0)
+        self.usage['retries'] += parsed.get(
+            'ResponseMetadata', {}).get('RetryAttempts', 0)
 
 
 @blob_outputs.register('s3')
@@ -13,15 +13,16 @@ from dateutil.parser import parse as parse_date
 from c7n.actions import BaseAction
 from c7n.exceptions import PolicyValidationError
 from c7n.filters import (
-    CrossAccountAccessFilter, Filter, AgeFilter, ValueFilter,
-    ANNOTATION_KEY)
+    Filter, AgeFilter, ValueFilter, ANNOTATION_KEY)
 from c7n.filters.health import HealthEventFilter
+from c7n.filters.iamaccess import CrossAccountAttributeFilter
 from c7n.filters.related import RelatedResourceFilter
+from c7n.filters.usage import UsageFilter
 
 from c7n.manager import resources
 from c7n.resources.kms import ResourceKmsKeyAlias
 from c7n.resources.securityhub import PostFinding
-from c7n.query import QueryResourceManager, TypeInfo
+from c7n.query import QueryResourceManager, RetryPageIterator, TypeInfo
 from c7n.tags import Tag, coalesce_copy_user_tags
 from c7n.utils import (
     camelResource,
@@ -214,44 +215,49 @@ def _filter_ami_snapshots(self, snapshots):
 
 
 @Snapshot.filter_registry.register('cross-account')
-class SnapshotCrossAccountAccess(CrossAccountAccessFilter):
+class SnapshotCrossAccountAccess(CrossAccountAttributeFilter):
 
     permissions = ('ec2:DescribeSnapshotAttribute',)
+    attribute = 'createVolumePermission'
+
+    def get_resource_attribute(self, client, resource):
+        return self.manager.retry(
+            client.describe_snapshot_attribute,
+            SnapshotId=resource['SnapshotId'],
+            Attribute=self.attribute)['CreateVolumePermissions']
+
+    def get_public_snapshots(self):
+        """Get the ids of owned snapshots restorable by everyone.
+
+        Public snapshots can be listed in bulk, which spares a per
+        snapshot attribute lookup when only checking public access.
+        """
+        client = local_session(self.manager.session_factory).client('ec2')
+        paginator = client.get_paginator('describe_snapshots')
+        paginator.PAGE_ITERATOR_CLS = RetryPageIterator
+        results = paginator.paginate(
+            OwnerIds=['self'], RestorableByUserIds=['all']).build_full_result()
+        return {s['SnapshotId'] for s in results.get('Snapshots', ())}
 
     def process(self, resources, event=None):
         self.accounts = self.get_accounts()
-        results = []
-        client = local_session(self.manager.session_factory).client('ec2')
-        with self.executor_factory(max_workers=3) as w:
-            futures = []
-            for resource_set in chunks(resources, 50):
-                futures.append(w.submit(
-                    self.process_resource_set, client, resource_set))
-            for f in as_completed(futures):
-                if f.exception():
-                    self.log.error(
-                        "Exception checking cross account access \n %s" % (
-                            f.exception()))
-                    continue
-                results.extend(f.result())
-        return results
+        if self.data.get('everyone_only', False):
+            public = self.get_public_snapshots()
+            delta_accounts = {'all'}.difference(self.accounts)
+            results = []
+            for r in resources:
+                if r['SnapshotId'] in public and delta_accounts:
+                    r['c7n:CrossAccountViolations'] = list(delta_accounts)
+                    results.append(r)
+            return results
 
-    def process_resource_set(self, client, resource_set):
         results = []
-        everyone_only = self.data.get('everyone_only', False)
-        for r in resource_set:
-            attrs = self.manager.retry(
-                client.describe_snapshot_attribute,
-                SnapshotId=r['SnapshotId'],
-                Attribute='createVolumePermission')['CreateVolumePermissions']
-            shared_accounts = set()
-            if everyone_only:
-                for g in attrs:
-                    if g.get('Group') == 'all':
-                        shared_accounts = {g.get('Group')}
-            else:
-                shared_accounts = {
-                g.get('Group') or g.get('UserId') for g in attrs}
+        attributes = self.get_attributes(resources)
+        for r in resources:
+            if r['SnapshotId'] not in attributes:
+                continue
+            shared_accounts = {
+                g.get('Group') or g.get('UserId') for g in attributes[r['SnapshotId']]}
             delta_accounts = shared_accounts.difference(self.accounts)
             if delta_accounts:
                 r['c7n:CrossAccountViolations'] = list(delta_accounts)
@@ -260,7 +266,7 @@ class SnapshotCrossAccountAccess(CrossAccountAccessFilter):
 
 
 @Snapshot.filter_registry.register('unused')
-class SnapshotUnusedFilter(Filter):
+class SnapshotUnusedFilter(UsageFilter):
     """Filters snapshots based on usage
 
     true: snapshot is not used by launch-template, launch-config, or ami.
@@ -316,7 +322,8 @@ class SnapshotUnusedFilter(Filter):
         return ami_snaps
 
     def process(self, resources, event=None):
-        snaps = self._pull_asg_snapshots().union(self._pull_ami_snapshots())
+        snaps = self.get_references('ebs-snapshot:asg', self._pull_asg_snapshots).union(
+            self.get_references('ebs-snapshot:ami', self._pull_ami_snapshots))
         if self.data.get('value', True):
             return [r for r in resources if r['SnapshotId'] not in snaps]
         return [r for r in resources if r['SnapshotId'] in snaps]
@@ -606,8 +613,11 @@ class SetPermissions(BaseAction):
 
     def process(self, snapshots):
         client = local_session(self.manager.session_factory).client('ec2')
-        for i in snapshots:
-            self.process_image(client, i)
+        try:
+            for i in snapshots:
+                self.process_image(client, i)
+        finally:
+            SnapshotCrossAccountAccess.invalidate_attributes(self.manager, snapshots)
 
     def process_image(self, client, snapshot):
         add_accounts = self.data.get('add', [])
@@ -24,6 +24,7 @@ from c7n.actions import BaseAction
 from c7n.exceptions import PolicyValidationError
 from c7n.filters import ValueFilter, Filter
 from c7n.filters.multiattr import MultiAttrFilter
+from c7n.filters.usage import UsageFilter
 from c7n.filters.iamaccess import CrossAccountAccessFilter
 from c7n.manager import resources
 from c7n.query import ConfigSource, QueryResourceManager, DescribeSource, TypeInfo
@@ -792,7 +793,7 @@ class CheckPermissions(Filter):
         return vf
 
 
-class IamRoleUsage(Filter):
+class IamRoleUsage(UsageFilter):
 
     def get_permissions(self):
         perms = list(itertools.chain(*[
@@ -803,15 +804,15 @@ class IamRoleUsage(Filter):
 
     def service_role_usage(self):
         results = set()
-        results.update(self.scan_lambda_roles())
-        results.update(self.scan_ecs_roles())
-        results.update(self.collect_profile_roles())
+        results.update(self.get_references('iam-role:lambda', self.scan_lambda_roles))
+        results.update(self.get_references('iam-role:ecs', self.scan_ecs_roles))
+        results.update(self.get_references('iam-role:iam-profile', self.collect_profile_roles))
         return results
 
     def instance_profile_usage(self):
         results = set()
-        results.update(self.scan_asg_roles())
-        results.update(self.scan_ec2_roles())
+        results.update(self.get_references('iam-profile:launch-config', self.scan_asg_roles))
+        results.update(self.get_references('iam-profile:ec2', self.scan_ec2_roles))
         return results
 
     def scan_lambda_roles(self):
@@ -834,9 +835,7 @@ class IamRoleUsage(Filter):
 
     def collect_profile_roles(self):
         # Collect iam roles attached to instance profiles of EC2/ASG resources
-        profiles = set()
-        profiles.update(self.scan_asg_roles())
-        profiles.update(self.scan_ec2_roles())
+        profiles = self.instance_profile_usage()
 
         manager = self.manager.get_resource_manager('iam-profile')
         iprofiles = manager.resources()
@@ -35,6 +35,7 @@ import math
 import os
 import time
 import ssl
+import threading
 
 from botocore.client import Config
 from botocore.exceptions import ClientError
@@ -51,6 +52,7 @@ except ImportError:
 from c7n.actions import (
     ActionRegistry, BaseAction, PutMetric, RemovePolicyBase)
 from c7n.exceptions import PolicyValidationError, PolicyExecutionError
+from c7n.executor import service_limits
 from c7n.filters import (
     FilterRegistry, Filter, CrossAccountAccessFilter, MetricsFilter,
     ValueFilter, ListItemFilter)
@@ -81,7 +83,7 @@ class DescribeS3(query.DescribeSource):
 
     def augment(self, buckets):
         with self.manager.executor_factory(
-                max_workers=min((10, len(buckets) + 1))) as w:
+                max_workers=min((self.manager.augment_workers, len(buckets) + 1))) as w:
             results = w.map(
                 assemble_bucket,
                 zip(itertools.repeat(self.manager.session_factory), buckets))
@@ -373,6 +375,9 @@ class S3(query.QueryResourceManager):
 
     filter_registry = filters
     action_registry = actions
+    # bucket augmentation is dominated by network wait, with in-flight
+    # requests bounded by the process wide s3 service limit.
+    augment_workers = 32
     source_mapping = {
         'describe': DescribeS3,
         'config': ConfigS3
@@ -425,8 +430,8 @@ def assemble_bucket(item):
     TODO: Refactor this, the logic here feels quite muddled.
     """
     factory, b = item
-    s = factory()
-    c = s.client('s3')
+    s = local_session(factory)
+    c = get_assemble_client(s)
     # Bucket Location, Current Client Location, Default Location
     b_location = c_location = location = "us-east-1"
     methods = list(S3_AUGMENT_TABLE)
@@ -434,7 +439,8 @@ def assemble_bucket(item):
         m, k, default, select = minfo[:4]
         try:
             method = getattr(c, m)
-            v = method(Bucket=b['Name'])
+            with service_limits('s3'):
+                v = method(Bucket=b['Name'])
             v.pop('ResponseMetadata')
             if select is not None and select in v:
                 v = v[select]
@@ -483,13 +489,31 @@ def assemble_bucket(item):
                 b_location = "eu-west-1"
                 v['LocationConstraint'] = 'eu-west-1'
             if v and v != c_location:
-                c = s.client('s3', region_name=b_location)
+                c = get_assemble_client(s, b_location)
             elif c_location != location:
-                c = s.client('s3', region_name=location)
+                c = get_assemble_client(s, location)
         b[k] = v
     return b
 
 
+_assemble_clients = threading.local()
+
+
+def get_assemble_client(session, region=None):
+    """Reuse s3 clients per thread and region across bucket assembly."""
+    cache = getattr(_assemble_clients, 'cache', None)
+    if cache is None or cache[0] is not session:
+        cache = _assemble_clients.cache = (session, {})
+    client = cache[1].get(region)
+    if client is None:
+        if region:
+            client = session.client('s3', region_name=region)
+        else:
+            client = session.client('s3')
+        cache[1][region] = client
+    return client
+
+
 def bucket_client(session, b, kms=False):
     region = get_region(b)
 
@@ -11,6 +11,7 @@ import c7n.filters.vpc as net_filters
 from c7n.filters.iamaccess import CrossAccountAccessFilter
 from c7n.filters.related import RelatedResourceFilter, RelatedResourceByIdFilter
 from c7n.filters.revisions import Diff
+from c7n.filters.usage import UsageFilter
 from c7n import query, resolver
 from c7n.manager import resources
 from c7n.resources.securityhub import OtherResourcePostFinding, PostFinding
@@ -939,9 +940,9 @@ class SecurityGroupPatch:
                        IpPermissions=[r for r in delta['added']])
 
 
-class SGUsage(Filter):
+class SGUsage(UsageFilter):
 
-    nics = ()
+    nics = None
 
     def get_permissions(self):
         return list(itertools.chain(
@@ -979,7 +980,7 @@ class SGUsage(Filter):
     def scan_groups(self):
         used = set()
         for kind, scanner in self.get_scanners():
-            sg_ids = scanner()
+            sg_ids = self.get_references('security-group:%s' % kind, scanner)
             new_refs = sg_ids.difference(used)
             used = used.union(sg_ids)
             self.log.debug(
@@ -1144,7 +1145,14 @@ class UsedSecurityGroup(SGUsage):
 
     def _get_eni_attributes(self):
         group_enis = {}
-        for nic in self.nics:
+        nics = self.nics
+        if nics is None:
+            # eni references were indexed by a prior scan, fetch the
+            # enis for their attributes.
+            nics = ()
+            if 'nics' in dict(self.get_scanners()):
+                nics = self.manager.get_resource_manager('eni').resources()
+        for nic in nics:
             instance_owner_id, interface_resource_type = '', ''
             if nic['Status'] == 'in-use':
                 if nic.get('Attachment') and 'InstanceOwnerId' in nic['Attachment']:
@@ -1456,8 +1464,34 @@ class SGPermission(Filter):
             vf = ValueFilter(fv, self.manager)
             vf.annotate = False
             self.vfilters.append(vf)
+        # the cidr, description and group reference value filters are
+        # built once, with their matches memoized by rule cidr and group
+        # id as these are commonly shared across many groups.
+        self.cidr_filters = {}
+        for cidr_key, cidr_type in (('Cidr', 'CidrIp'), ('CidrV6', 'CidrIpv6')):
+            if cidr_key in self.data:
+                self.cidr_filters[cidr_key] = (
+                    self.get_value_filter(self.data[cidr_key], cidr_type), {})
+        self.description_filter = None
+        if 'Description' in self.data:
+            self.description_filter = self.get_value_filter(
+                dict(self.data['Description']), 'Description')
+        self.sg_ref_filter = None
+        self.sg_ref_matches = {}
+        if self.data.get('SGReferences'):
+            self.sg_ref_filter = ValueFilter(self.data['SGReferences'], self.manager)
+            self.sg_ref_filter.annotate = False
         return super(SGPermission, self).process(resources, event)
 
+    def get_value_filter(self, data, key):
+        if isinstance(data, dict):
+            data = dict(data, key=key)
+        else:
+            data = {key: data}
+        vf = ValueFilter(data, self.manager)
+        vf.annotate = False
+        return vf
+
     def process_ports(self, perm):
         found = None
         if 'FromPort' in perm and 'ToPort' in perm:
@@ -1477,29 +1511,18 @@ class SGPermission(Filter):
         return found
 
     def _process_cidr(self, cidr_key, cidr_type, range_type, perm):
-
-        found = None
         ip_perms = perm.get(range_type, [])
         if not ip_perms:
             return False
 
-        match_range = self.data[cidr_key]
-
-        if isinstance(match_range, dict):
-            match_range['key'] = cidr_type
-        else:
-            match_range = {cidr_type: match_range}
-
-        vf = ValueFilter(match_range, self.manager)
-        vf.annotate = False
-
+        vf, matches = self.cidr_filters[cidr_key]
         for ip_range in ip_perms:
-            found = vf(ip_range)
-            if found:
-                break
-            else:
-                found = False
-        return found
+            cidr = ip_range.get(cidr_type)
+            if cidr not in matches:
+                matches[cidr] = vf(ip_range)
+            if matches[cidr]:
+                return True
+        return False
 
     def process_cidrs(self, perm):
         found_v6 = found_v4 = None
@@ -1514,19 +1537,13 @@ class SGPermission(Filter):
         return match_op(cidr_match)
 
     def process_description(self, perm):
-        if 'Description' not in self.data:
+        if self.description_filter is None:
             return None
 
-        d = dict(self.data['Description'])
-        d['key'] = 'Description'
-
-        vf = ValueFilter(d, self.manager)
-        vf.annotate = False
-
         for k in ('Ipv6Ranges', 'IpRanges', 'UserIdGroupPairs', 'PrefixListIds'):
             if k not in perm or not perm[k]:
                 continue
-            return vf(perm[k][0])
+            return self.description_filter(perm[k][0])
         return False
 
     def process_self_reference(self, perm, sg_id):
@@ -1544,8 +1561,7 @@ class SGPermission(Filter):
         return found
 
     def process_sg_references(self, perm, owner_id):
-        sg_refs = self.data.get('SGReferences')
-        if not sg_refs:
+        if self.sg_ref_filter is None:
             return None
 
         sg_perm = perm.get('UserIdGroupPairs', [])
@@ -1553,14 +1569,13 @@ class SGPermission(Filter):
             return False
 
         sg_group_ids = [p['GroupId'] for p in sg_perm if p.get('UserId', '') == owner_id]
-        sg_resources = self.manager.get_resources(sg_group_ids)
-        vf = ValueFilter(sg_refs, self.manager)
-        vf.annotate = False
-
-        for sg in sg_resources:
-            if vf(sg):
-                return True
-        return False
+        unknown = [gid for gid in sg_group_ids if gid not in self.sg_ref_matches]
+        if unknown:
+            for sg in self.manager.get_resources(unknown):
+                self.sg_ref_matches[sg['GroupId']] = self.sg_ref_filter(sg)
+            for gid in unknown:
+                self.sg_ref_matches.setdefault(gid, False)
+        return any(self.sg_ref_matches[gid] for gid in sg_group_ids)
 
     def expand_permissions(self, permissions):
         """Expand each list of cidr, prefix list, user id group pair
@@ -2792,7 +2807,7 @@ class KeyPair(query.QueryResourceManager):
 
 
 @KeyPair.filter_registry.register('unused')
-class UnusedKeyPairs(Filter):
+class UnusedKeyPairs(UsageFilter):
     """Filter for used or unused keys.
 
     The default is unused but can be changed by using the state property.
@@ -2842,7 +2857,8 @@ class UnusedKeyPairs(Filter):
         return {i.get('KeyName',None) for i in ec2_manager.resources()}
 
     def process(self, resources, event=None):
-        keynames = self._pull_ec2_keynames().union(self._pull_asg_keynames())
+        keynames = self.get_references('key-pair:ec2', self._pull_ec2_keynames).union(
+            self.get_references('key-pair:asg', self._pull_asg_keynames))
         if self.data.get('state', True):
             return [r for r in resources if r['KeyName'] not in keynames]
         return [r for r in resources if r['KeyName'] in keynames]
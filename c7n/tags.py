@@ -22,6 +22,7 @@ from c7n.actions import BaseAction as Action, AutoTagUser
 from c7n.exceptions import PolicyValidationError, PolicyExecutionError
 from c7n.resources import load_resources
 from c7n.filters import Filter, OPERATORS
+from c7n.filters.core import COST_MEMORY
 from c7n.filters.offhours import Time
 from c7n import deprecated, utils
 
@@ -117,6 +118,7 @@ def _common_tag_processer(executor_factory, batch_size, concurrency, client,
                 log.error(
                     "Exception with tags: %s  %s", tags, f.exception())
 
+    utils.TagIndex.invalidate(resources)
     if error:
         raise error
 
@@ -186,14 +188,15 @@ class TagTrim(Action):
                     self.log.warning(
                         "Error processing tag-trim on resource:%s",
                         futures[f][mid])
+        utils.TagIndex.invalidate(resources)
 
     def process_resource(self, client, i):
         # Can't really go in batch parallel without some heuristics
         # without some more complex matching wrt to grouping resources
         # by common tags populations.
         tag_map = {
-            t['Key']: t['Value'] for t in i.get('Tags', [])
-            if not t['Key'].startswith('aws:')}
+            k: v for k, v in utils.get_tag_map(i).items()
+            if not k.startswith('aws:')}
 
         # Space == 0 means remove all but specified
         if self.space and len(tag_map) + self.space <= self.max_tag_count:
@@ -270,6 +273,8 @@ class TagActionFilter(Filter):
         skew_hours={'type': 'number', 'minimum': 0},
         op={'type': 'string'})
     schema_alias = True
+    streamable = True
+    cost = COST_MEMORY
 
     def validate(self):
         op = self.data.get('op')
@@ -291,12 +296,7 @@ class TagActionFilter(Filter):
         skew_hours = self.data.get('skew_hours', 0)
         tz = tzutil.gettz(Time.TZ_ALIASES.get(self.data.get('tz', 'utc')))
 
-        v = None
-        for n in i.get('Tags', ()):
-            if n['Key'] == tag:
-                v = n['Value']
-                break
-
+        v = utils.get_tag_map(i).get(tag)
         if v is None:
             return False
         if ':' not in v or '@' not in v:
@@ -347,14 +347,16 @@ class TagCountFilter(Filter):
         count={'type': 'integer', 'minimum': 0},
         op={'enum': list(OPERATORS.keys())})
     schema_alias = True
+    streamable = True
+    cost = COST_MEMORY
 
     def __call__(self, i):
         count = self.data.get('count', 10)
         op_name = self.data.get('op', 'gte')
         op = OPERATORS.get(op_name)
         tag_count = len([
-            t['Key'] for t in i.get('Tags', [])
-            if not t['Key'].startswith('aws:')])
+            k for k in utils.get_tag_map(i)
+            if not k.startswith('aws:')])
         return op(tag_count, count)
 
 
@@ -539,7 +541,7 @@ class RenameTag(Action):
         old_key = self.data.get('old_key', None)
         resource_set = {}
         for r in instances:
-            tags = {t['Key']: t['Value'] for t in r.get('Tags', [])}
+            tags = utils.get_tag_map(r)
             if tags[old_key] not in resource_set:
                 resource_set[tags[old_key]] = []
             resource_set[tags[old_key]].append(r)
@@ -549,7 +551,7 @@ class RenameTag(Action):
         old_key = self.data.get('old_key', None)
         filtered_resources = [
             r for r in resources
-            if old_key in (t['Key'] for t in r.get('Tags', []))
+            if old_key in utils.get_tag_map(r)
         ]
         return filtered_resources
 
@@ -572,6 +574,7 @@ class RenameTag(Action):
                     self.log.error(
                         "Exception renaming tag set \n %s" % (
                             f.exception()))
+        utils.TagIndex.invalidate(resources)
         return resources
 
     def get_client(self):
@@ -776,7 +779,7 @@ class NormalizeTag(Action):
         key = self.data.get('key', None)
         resource_set = {}
         for r in instances:
-            tags = {t['Key']: t['Value'] for t in r.get('Tags', [])}
+            tags = utils.get_tag_map(r)
             if tags[key] not in resource_set:
                 resource_set[tags[key]] = []
             resource_set[tags[key]].append(r)
@@ -786,7 +789,7 @@ class NormalizeTag(Action):
         key = self.data.get('key', None)
         filtered_resources = [
             r for r in resources
-            if key in (t['Key'] for t in r.get('Tags', []))
+            if key in utils.get_tag_map(r)
         ]
         return filtered_resources
 
@@ -819,6 +822,7 @@ class NormalizeTag(Action):
                     self.log.error(
                         "Exception renaming tag set \n %s" % (
                             f.exception()))
+        utils.TagIndex.invalidate(resources)
         return resources
 
 
@@ -1272,12 +1276,17 @@ def universal_retry(method, ResourceARNList, **kw):
     a retry is performed.
     """
     max_attempts = 6
+    limit = utils.rate_limits.get(method)
 
     for idx, delay in enumerate(
             utils.backoff_delays(1.5, 2 ** 8, jitter=True)):
+        if limit is not None:
+            limit.acquire()
         response = method(ResourceARNList=ResourceARNList, **kw)
         failures = response.get('FailedResourcesMap', {})
         if not failures:
+            if limit is not None:
+                limit.succeeded()
             return response
 
         errors = {}
@@ -1295,6 +1304,9 @@ def universal_retry(method, ResourceARNList, **kw):
         if errors:
             raise Exception("Resource Tag Errors %s" % (errors))
 
+        if throttles and limit is not None:
+            limit.throttled()
+
         if idx == max_attempts - 1:
             raise Exception("Resource Tag Throttled %s" % (", ".join(throttles)))
 
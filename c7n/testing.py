@@ -20,9 +20,11 @@ from c7n.vendored.distutils.util import strtobool
 
 from c7n import deprecated, policy
 from c7n.exceptions import DeprecationError
+from c7n.cache import SqlKvCache
+from c7n.credentials import assumed_credentials
 from c7n.loader import PolicyLoader
 from c7n.ctx import ExecutionContext
-from c7n.utils import reset_session_cache, jmespath_search
+from c7n.utils import rate_limits, reset_session_cache, jmespath_search
 from c7n.config import Bag, Config
 
 
@@ -246,6 +248,9 @@ class TestUtils(unittest.TestCase, CustodianTestCore):
     def cleanUp(self):
         # Clear out thread local session cache
         reset_session_cache()
+        rate_limits.reset()
+        assumed_credentials.reset()
+        SqlKvCache.close_all()
 
 
 class TextTestIO(io.StringIO):
@@ -1,5 +1,6 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
+import contextvars
 import copy
 from collections import UserString
 from datetime import datetime, timedelta
@@ -367,6 +368,82 @@ def set_annotation(i, k, v):
         i[k] = v
 
 
+class TagIndex:
+    """Lazily built tag key to value maps for resources.
+
+    Active for the duration of a policy execution and of a filter pass,
+    so the many tag lookups across a policy's filters and actions don't
+    each scan a resource's tag list. Maps are keyed on the identity of
+    the resource's tag list, so replacing the list, ie. by tag
+    augmentation, rebuilds them. Code modifying a tag list in place must
+    invalidate its resources, as the tag actions do.
+    """
+
+    _active = threading.local()
+
+    def __init__(self):
+        self.maps = {}
+
+    @classmethod
+    def current(cls):
+        return getattr(cls._active, 'index', None)
+
+    @classmethod
+    def invalidate(cls, resources):
+        """Drop the maps of resources whose tags were modified."""
+        index = cls.current()
+        if index is None:
+            return
+        for r in resources:
+            tags = r.get('Tags') or ()
+            for lower in (False, True):
+                index.maps.pop((id(tags), lower), None)
+
+    def __enter__(self):
+        # nested scopes (ie. related resources) share the outer index
+        if self.current() is None:
+            self._active.index = self
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, exc_traceback=None):
+        if self.current() is self:
+            self._active.index = None
+        self.maps = {}
+
+    def get(self, tags, lower=False):
+        key = (id(tags), lower)
+        entry = self.maps.get(key)
+        # the map holds its tag list, so the id isn't reused while cached.
+        if entry is None or entry[0] is not tags:
+            entry = self.maps[key] = (tags, build_tag_map(tags, lower))
+        return entry[1]
+
+
+def build_tag_map(tags, lower=False):
+    tag_map = {}
+    for t in tags:
+        k = t.get('Key')
+        if lower:
+            # keys differing only in case, the first wins as per a
+            # case insensitive linear scan.
+            tag_map.setdefault(k.lower(), t.get('Value'))
+        else:
+            tag_map[k] = t.get('Value')
+    return tag_map
+
+
+def get_tag_map(resource, lower=False):
+    """Return a resource's tags as a key to value mapping.
+
+    With `lower` tag keys are lower cased.
+    """
+    tags = resource.get('Tags') or ()
+    index = TagIndex.current()
+    if index is None:
+        return build_tag_map(tags, lower)
+    return index.get(tags, lower)
+
+
 def parse_s3(s3_path):
     if not s3_path.startswith('s3://'):
         raise ValueError("invalid s3 path")
@@ -448,11 +525,19 @@ def get_retry(retry_codes=(), max_attempts=8, min_delay=1, log_retries=False):
     max_delay = max(min_delay, 2) ** max_attempts
 
     def _retry(func, *args, ignore_err_codes=(), **kw):
+        limit = rate_limits.get(func)
         for idx, delay in enumerate(
                 backoff_delays(min_delay, max_delay, jitter=True)):
             try:
-                return func(*args, **kw)
+                if limit is None:
+                    return func(*args, **kw)
+                limit.acquire()
+                result = func(*args, **kw)
+                limit.succeeded()
+                return result
             except ClientError as e:
+                if limit is not None and e.response['Error']['Code'] in THROTTLE_CODES:
+                    limit.throttled()
                 if e.response['Error']['Code'] in ignore_err_codes:
                     return
                 elif e.response['Error']['Code'] not in retry_codes:
@@ -468,6 +553,133 @@ def get_retry(retry_codes=(), max_attempts=8, min_delay=1, log_retries=False):
     return _retry
 
 
+THROTTLE_CODES = frozenset((
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'RequestLimitExceeded',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'SlowDown',
+))
+
+
+class RateLimit:
+    """Adaptive token bucket for a single api operation.
+
+    Requests are unbounded until a throttle is observed, at which point
+    the rate is set to half the recently observed request rate. Each
+    further throttle halves the rate again (at most once a second, so
+    concurrent failures count once), and successful requests increase
+    it by roughly `increase` requests per second each second.
+    """
+
+    min_rate = 0.5
+    increase = 1.0
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.tokens = 0.0
+        self.last_refill = self.last_throttle = 0.0
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.observed = 0.0
+
+    def acquire(self):
+        """Take a token, returning the time slept waiting for it."""
+        with self.lock:
+            now = time.monotonic()
+            self._measure(now)
+            if self.rate is None:
+                return 0
+            self.tokens = min(
+                max(self.rate, 1.0),
+                self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            # tokens may go negative, reserving a slot for waiting callers
+            self.tokens -= 1
+            delay = self.tokens < 0 and -self.tokens / self.rate or 0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def _measure(self, now):
+        self.window_count += 1
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.observed = (self.observed + self.window_count / elapsed) / 2
+            self.window_start = now
+            self.window_count = 0
+
+    def throttled(self):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_throttle < 1.0:
+                return
+            self.last_throttle = now
+            if self.rate is None:
+                self.rate = self.observed or self.window_count / max(
+                    now - self.window_start, 1.0)
+                self.tokens = 0.0
+                self.last_refill = now
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self):
+        with self.lock:
+            if self.rate is not None:
+                self.rate += self.increase / max(self.rate, 1.0)
+
+
+# the account of the executing policy, set by its execution context.
+api_account = contextvars.ContextVar('c7n_api_account', default=None)
+
+
+class RateLimiter:
+    """Process wide adaptive rate limits shared by all threads.
+
+    Limits are keyed by the (service, operation, region) of the client
+    method invoked and the account of the executing policy, so concurrent
+    policies and worker pools calling the same api back off together
+    rather than each retrying on its own, while the rate learned for one
+    account doesn't carry over to the next one run in the process.
+    """
+
+    def __init__(self):
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(method):
+        meta = getattr(getattr(method, '__self__', None), 'meta', None)
+        if meta is None or not hasattr(meta, 'service_model'):
+            return None
+        return (meta.service_model.service_name,
+                getattr(method, '__name__', None),
+                meta.region_name,
+                api_account.get())
+
+    def get(self, method):
+        """Get the limit for a client method, or None for other callables."""
+        key = self.get_key(method)
+        if key is None:
+            return None
+        with self.lock:
+            limit = self.limits.get(key)
+            if limit is None:
+                limit = self.limits[key] = RateLimit()
+            return limit
+
+    def reset(self):
+        with self.lock:
+            self.limits = {}
+
+
+rate_limits = RateLimiter()
+
+
 def backoff_delays(start, stop, factor=2.0, jitter=False):
     """Geometric backoff sequence w/ jitter
     """
@@ -10,7 +10,8 @@ from vcr import stubs
 
 try:
     from .zpill import PillTest, ACCOUNT_ID, ORG_ID
-    from c7n.testing import PyTestUtils, reset_session_cache
+    from c7n.testing import (
+        PyTestUtils, SqlKvCache, assumed_credentials, rate_limits, reset_session_cache)
     from pytest_terraform.tf import LazyPluginCacheDir, LazyReplay
 except ImportError: # noqa
     # docker tests run with minimial deps
@@ -70,4 +71,7 @@ def pytest_configure(config):
 def test(request):
     test_utils = CustodianAWSTesting(request)
     test_utils.addCleanup(reset_session_cache)
+    test_utils.addCleanup(rate_limits.reset)
+    test_utils.addCleanup(assumed_credentials.reset)
+    test_utils.addCleanup(SqlKvCache.close_all)
     return test_utils
@@ -1,7 +1,7 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 from c7n.exceptions import ClientError, PolicyValidationError
-from c7n.resources.ami import ErrorHandler
+from c7n.resources.ami import AmiCrossAccountFilter, ErrorHandler
 from c7n.query import DescribeSource
 from c7n.utils import jmespath_search
 from .common import BaseTest
@@ -72,6 +72,45 @@ class TestAMI(BaseTest):
             Attribute='launchPermission')['LaunchPermissions']
         assert perms == []
 
+    def test_ami_cross_account_everyone_only(self):
+        # public images are listed in bulk, without per image attribute lookups
+        factory = self.replay_flight_data('test_ami_cross_account_everyone_only')
+        p = self.load_policy({
+            'name': 'ami-public',
+            'resource': 'aws.ami',
+            'filters': [{'type': 'cross-account', 'everyone_only': True}]},
+            session_factory=factory)
+        resources = p.run()
+        self.assertEqual(
+            {r['ImageId']: r['c7n:CrossAccountViolations'] for r in resources},
+            {'ami-0a1b2c3d4e5f60718': ['all']})
+
+    def test_ami_remove_launch_permissions_invalidates_attributes(self):
+        factory = self.replay_flight_data('test_ami_remove_perms')
+        p = self.load_policy({
+            'name': 'ami-check',
+            'resource': 'aws.ami',
+            'filters': ['cross-account'],
+            'actions': [{
+                'type': 'remove-launch-permissions',
+                'accounts': 'matched'}]},
+            session_factory=factory, cache=True)
+        index = AmiCrossAccountFilter.get_attribute_index(p.resource_manager)
+        saved = []
+        save_many = index.cache.save_many
+
+        def record_save(items, timestamp=None):
+            saved.extend(k['q'] for k, v in items)
+            save_many(items, timestamp)
+
+        self.patch(index.cache, 'save_many', record_save)
+        resources = p.run()
+        self.assertEqual(len(resources), 1)
+        name = AmiCrossAccountFilter.get_attribute_name(
+            p.resource_manager, resources[0]['ImageId'])
+        self.assertIn(name, saved)
+        self.assertIsNone(index.get(name))
+
     def test_ami_set_permissions_remove_matched(self):
         factory = self.replay_flight_data('test_ami_set_perms')
         p = self.load_policy({
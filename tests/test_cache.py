@@ -6,11 +6,15 @@ import os
 import pickle
 import sqlite3
 import sys
+import zlib
 from unittest import TestCase
 
 import pytest
 
 from c7n import cache, config
+from c7n.query import DescribeSource
+
+from .common import BaseTest
 
 
 class TestCache(TestCase):
@@ -55,6 +59,62 @@ def test_sqlkv(tmp_path):
     kv.close()
 
 
+def test_sqlkv_save_many(tmp_path):
+    kv = cache.SqlKvCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+    items = [({'id': str(i)}, {'value': i}) for i in range(10)]
+    statements = []
+    with kv:
+        kv.conn.set_trace_callback(statements.append)
+        kv.save_many(items)
+        kv.conn.set_trace_callback(None)
+        cache.SqlKvCache.memory.clear()
+        assert [kv.get(k) for k, _ in items] == [v for _, v in items]
+    # all rows are written in a single transaction
+    assert len([s for s in statements if s.startswith('COMMIT')]) == 1
+
+
+def test_sqlkv_close_all(tmp_path):
+    kv = cache.SqlKvCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+    with kv:
+        kv.save({'a': 'b'}, [1])
+        conn = kv.conn
+    cache.SqlKvCache.close_all()
+    assert cache.SqlKvCache.connections == {}
+    assert cache.SqlKvCache.memory == {}
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('select 1')
+
+    # a later use reconnects
+    with kv:
+        assert kv.get({'a': 'b'}) == [1]
+
+
+def test_cache_index(tmp_path):
+    kv = cache.SqlKvCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
+
+    def get_index(region):
+        return cache.CacheIndex(Namespace(
+            _cache=kv, config=config.Bag(account_id='123456789012', region=region)),
+            'attributes')
+
+    east, west = get_index('us-east-1'), get_index('us-west-2')
+    assert east.get('ami-1') is None
+    # the cache isn't held between operations, so they may nest.
+    east.save('ami-1', west.get('ami-1') or ['all'])
+    east.save_many({'ami-2': [], 'ami-3': ['112233445566']})
+    assert east.get_many(['ami-1', 'ami-2', 'ami-4']) == {'ami-1': ['all'], 'ami-2': []}
+    assert west.get_many(['ami-1', 'ami-2']) == {}
+
+    # entries expire on their own
+    with kv:
+        kv.save(east.get_key('ami-2'), [], datetime.utcnow() - timedelta(minutes=90))
+    assert east.get_many(['ami-1', 'ami-2']) == {'ami-1': ['all']}
+
+    east.delete_many(['ami-1', 'ami-4'])
+    cache.SqlKvCache.memory.clear()
+    assert east.get_many(['ami-1', 'ami-3']) == {'ami-3': ['112233445566']}
+
+
 def test_sqlkv_get_expired(tmp_path):
     kv = cache.SqlKvCache(config.Bag(cache=tmp_path / "cache.db", cache_period=60))
     kv.load()
@@ -99,3 +159,134 @@ def test_sqlkv_convert(tmp_path):
     kv.close()
     with open(cache_path, 'rb') as fh:
         assert fh.read(15) == b"SQLite format 3"
+
+
+def test_sqlkv_shared_memory(tmp_path):
+    cache_config = config.Bag(cache=tmp_path / "cache.db", cache_period=60)
+    kv1 = cache.SqlKvCache(cache_config)
+    kv2 = cache.SqlKvCache(cache_config)
+    kv1.load()
+    kv2.load()
+    assert kv1.conn is kv2.conn
+
+    k1 = {"account": "12345678901234", "region": "us-west-2", "resource": "ec2"}
+    v1 = [{'id': 'a'}, {'id': 'b'}]
+    kv1.save(k1, v1)
+    assert kv2.get(k1) == v1
+    assert kv2.stats == {'memory_hits': 1, 'hits': 1, 'bytes': len(pickle.dumps(
+        v1, protocol=pickle.HIGHEST_PROTOCOL))}
+
+    # values are stored compressed
+    value = kv1.conn.execute('select value from c7n_cache').fetchone()[0]
+    assert pickle.loads(zlib.decompress(value)) == v1
+    kv1.close()
+    kv2.close()
+
+
+def test_sqlkv_resource_ttl(tmp_path):
+    cache_config = config.Bag(
+        cache=tmp_path / "cache.db", cache_period=5, cache_ttl=["aws.iam-role=60"])
+    role_kv = cache.SqlKvCache(cache_config, 'iam-role')
+    ec2_kv = cache.SqlKvCache(cache_config, 'ec2')
+    assert role_kv.cache_period == 60
+    assert ec2_kv.cache_period == 5
+    role_kv.load()
+    ec2_kv.load()
+
+    key = {'resource': 'any'}
+    role_kv.save(key, [1], datetime.utcnow() - timedelta(minutes=30))
+    assert role_kv.get(key) == [1]
+    assert ec2_kv.get(key) is None
+    assert ec2_kv.stats == {'memory_hits': 1, 'misses': 1}
+
+    with pytest.raises(ValueError):
+        cache.get_cache_ttls(config.Bag(cache_ttl=["ec2"]))
+
+
+def test_memory_lru():
+    lru = cache.MemoryLRU(10)
+    lru.put('a', None, b'1234')
+    lru.put('b', None, b'1234')
+    assert lru.get('a') == (None, b'1234')
+    lru.put('c', None, b'1234')
+    assert lru.get('b') is None
+    assert lru.get('a') is not None
+    assert lru.size == 8
+    lru.put('d', None, b'12345678901')
+    assert lru.get('d') is None
+
+
+class FetchPlannerTest(BaseTest):
+
+    def test_shared_fetch(self):
+        factory = self.replay_flight_data("test_ec2_state_transition_age_filter")
+        fetches = []
+        original = DescribeSource.resources
+
+        def resources(source, query):
+            fetches.append(source.manager.type)
+            return original(source, query)
+
+        self.patch(DescribeSource, "resources", resources)
+        p1 = self.load_policy(
+            {"name": "ec2-running", "resource": "ec2",
+             "filters": [{"State.Name": "running"}]},
+            session_factory=factory)
+        p2 = self.load_policy(
+            {"name": "ec2-age", "resource": "ec2",
+             "filters": [{"type": "state-age", "days": 30}]},
+            session_factory=factory)
+        p3 = self.load_policy(
+            {"name": "ebs", "resource": "ebs"}, session_factory=factory)
+
+        planner = cache.ResourceFetchPlanner().plan([p1, p2, p3])
+        self.assertEqual(len(planner.consumers), 1)
+        self.assertIsInstance(p1.resource_manager._cache, cache.PlannedCache)
+        self.assertNotIsInstance(p3.resource_manager._cache, cache.PlannedCache)
+
+        r1 = p1.run()
+        self.assertEqual(planner.size(), 1)
+        r2 = p2.run()
+        self.assertEqual(fetches, ["ec2"])
+        self.assertEqual(planner.size(), 0)
+        self.assertEqual(len(r1), 2)
+        self.assertEqual(len(r2), 2)
+        self.assertFalse(any(a is b for a in r1 for b in r2))
+
+    def test_skipped_policy_released(self):
+        factory = self.replay_flight_data("test_ebs_aws_managed_kms_keys")
+        p1 = self.load_policy(
+            {"name": "ebs-all", "resource": "ebs"}, session_factory=factory)
+        p2 = self.load_policy(
+            {"name": "ebs-skipped", "resource": "ebs",
+             "conditions": [{"type": "value", "key": "region", "value": "eu-west-1"}]},
+            session_factory=factory)
+        planner = cache.ResourceFetchPlanner().plan([p1, p2])
+
+        resources = p1.run()
+        self.assertEqual(planner.size(), 1)
+        # looking up resources by id doesn't consume the retained copy
+        self.patch(p1.resource_manager.source, "get_resources", None)
+        found = p1.resource_manager.get_resources([resources[0]["VolumeId"]])
+        self.assertEqual(found, [resources[0]])
+        self.assertEqual(planner.consumers, {p2.resource_manager._cache.key: 1})
+
+        self.assertEqual(p2.run(), [])
+        planner.release(p1)
+        planner.release(p2)
+        self.assertEqual(planner.size(), 0)
+        self.assertEqual(planner.consumers, {})
+
+    def test_planner_release(self):
+        planner = cache.ResourceFetchPlanner()
+        planner.consumers["k"] = 3
+        resources = [{"id": "a"}]
+        planner.save("k", resources)
+        resources[0]["c7n:annotation"] = True
+
+        first = planner.get("k")
+        self.assertEqual(first, [{"id": "a"}])
+        first[0]["c7n:other"] = True
+        self.assertEqual(planner.get("k"), [{"id": "a"}])
+        self.assertEqual(planner.consumers, {})
+        self.assertIsNone(planner.get("k"))
@@ -1,8 +1,10 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import json
+import logging
 import os
 import sys
+import threading
 
 from argparse import ArgumentTypeError
 from datetime import datetime, timedelta
@@ -154,6 +156,52 @@ class ValidateTest(CliTest):
         # duplicate policy names
         self.run_and_expect_failure(["custodian", "validate", yaml_file, yaml_file], 1)
 
+    def test_validate_cache(self):
+        valid_policies = {
+            "policies": [{"name": "foo", "resource": "s3"}]}
+        invalid_policies = {
+            "policies": [{"name": "bar", "resource": "s3",
+                          "filters": [{"type": "xyz"}]}]}
+        valid_file = self.write_policy_file(valid_policies)
+        invalid_file = self.write_policy_file(invalid_policies)
+        cache_file = os.path.join(self.get_temp_dir(), "validate.cache")
+
+        self.run_and_expect_success(
+            ["custodian", "validate", "-f", cache_file, valid_file])
+        self.run_and_expect_failure(
+            ["custodian", "validate", "-f", cache_file, invalid_file], 1)
+
+        validated = []
+
+        def validate_file(config_file, check_deprecations, validator):
+            validated.append(config_file)
+            return validate_original(config_file, check_deprecations, validator)
+
+        validate_original = commands._validate_file
+        self.patch(commands, "_validate_file", validate_file)
+
+        self.run_and_expect_success(
+            ["custodian", "validate", "-f", cache_file, valid_file])
+        self.assertEqual(validated, [])
+        self.run_and_expect_failure(
+            ["custodian", "validate", "-f", cache_file, invalid_file], 1)
+        self.assertEqual(validated, [invalid_file])
+
+        # cached files still participate in duplicate name checks
+        self.run_and_expect_failure(
+            ["custodian", "validate", "-f", cache_file, valid_file,
+             self.write_policy_file(valid_policies)], 1)
+
+    def test_validate_jobs(self):
+        files = [
+            self.write_policy_file(
+                {"policies": [{"name": "foo-%d" % i, "resource": "s3"}]})
+            for i in range(3)]
+        self.run_and_expect_success(["custodian", "validate", "-j", "2"] + files)
+        files.append(self.write_policy_file(
+            {"policies": [{"name": "foo-1", "resource": "ec2"}]}))
+        self.run_and_expect_failure(["custodian", "validate", "-j", "2"] + files, 1)
+
     def test_deprecated(self):
 
         deprecated = {
@@ -513,6 +561,66 @@ class RunTest(CliTest):
             ]
         )
 
+    def test_policy_concurrency(self):
+        session_factory = self.replay_flight_data("test_ec2_attached_ebs_filter")
+
+        from c7n.executor import ThreadPoolExecutor
+        from c7n.policy import PolicyCollection
+        from c7n.query import QueryResourceManager
+
+        self.patch(
+            PolicyCollection,
+            "session_factory",
+            staticmethod(lambda x=None: session_factory),
+        )
+
+        # both policies must be filtering at the same time to pass the barrier,
+        # and log from a worker thread of their own.
+        barrier = threading.Barrier(2, timeout=30)
+        filter_resources = QueryResourceManager.filter_resources
+        worker_log = logging.getLogger("custodian.test")
+
+        def concurrent_filter(manager, resources, event=None, **kw):
+            barrier.wait()
+            with ThreadPoolExecutor(max_workers=1) as w:
+                w.submit(worker_log.info, "worker of %s", manager.ctx.policy.name).result()
+            return filter_resources(manager, resources, event, **kw)
+
+        self.patch(QueryResourceManager, "filter_resources", concurrent_filter)
+
+        temp_dir = self.get_temp_dir()
+        yaml_file = self.write_policy_file(
+            {
+                "policies": [
+                    {"name": "ec2-all", "resource": "ec2"},
+                    {"name": "ebs-all", "resource": "ebs"},
+                ]
+            }
+        )
+        log_output = self.capture_logging("custodian")
+        self.run_and_expect_success(
+            [
+                "custodian",
+                "run",
+                "--policy-concurrency",
+                "2",
+                "-s",
+                temp_dir,
+                yaml_file,
+            ]
+        )
+        for name, other in (("ec2-all", "ebs-all"), ("ebs-all", "ec2-all")):
+            with open(os.path.join(temp_dir, name, "resources.json")) as fh:
+                self.assertTrue(json.load(fh))
+            with open(os.path.join(temp_dir, name, "custodian-run.log")) as fh:
+                logs = fh.read()
+            self.assertIn("worker of %s" % name, logs)
+            self.assertNotIn("worker of %s" % other, logs)
+            self.assertNotIn("policy:%s " % other, logs)
+        self.assertIn(
+            "policy:ec2-all region:us-east-1 status:ok",
+            log_output.getvalue())
+
     def test_error(self):
         from c7n.policy import Policy
 
@@ -1,6 +1,8 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import os
+from boto3 import Session
+from botocore.credentials import Credentials
 from botocore.exceptions import ClientError
 import placebo
 
@@ -86,3 +88,28 @@ class Credential(BaseTest):
         client = local_session(factory).client('ec2')
         self.assertTrue(
             'check-ec2' in client._client_config.user_agent)
+
+    def test_assumed_credentials_shared(self):
+        assumes = []
+
+        def get_assumed_credentials(role_arn, session_name, session, region, external_id):
+            assumes.append((role_arn, region))
+            return Credentials('AKID', 'SECRET', 'TOKEN')
+
+        self.patch(credentials, 'get_assumed_credentials', get_assumed_credentials)
+        self.patch(Session, 'get_credentials', lambda self: Credentials('BASE', 'SECRET'))
+        role = 'arn:aws:iam::644160558196:role/custodian'
+
+        east = SessionFactory('us-east-1', assume_role=role)()
+        west = SessionFactory('us-east-1', assume_role=role)(region='us-west-2')
+        self.assertEqual(assumes, [(role, 'us-east-1')])
+        self.assertEqual(east.region_name, 'us-east-1')
+        self.assertEqual(west.region_name, 'us-west-2')
+        self.assertEqual(west._session.get_credentials().access_key, 'AKID')
+
+        SessionFactory('us-east-1', assume_role=role, external_id='xyz')()
+        self.assertEqual(len(assumes), 2)
+
+        self.patch(credentials, 'USE_STS_REGIONAL', True)
+        SessionFactory('us-east-1', assume_role=role)(region='us-west-2')
+        self.assertEqual(assumes[-1], (role, 'us-west-2'))
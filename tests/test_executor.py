@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: Apache-2.0
 from c7n import executor
 
+import threading
+import time
 import unittest
 
 
@@ -42,5 +44,33 @@ class MainExecutorTest(ExecutorBase, unittest.TestCase):
     executor_factory = executor.MainThreadExecutor
 
 
+class ServiceLimiterTest(unittest.TestCase):
+
+    def test_service_limit(self):
+        limiter = executor.ServiceLimiter({'s3': 2})
+        inflight = []
+        peak = []
+        lock = threading.Lock()
+
+        def request(i):
+            with limiter('s3'):
+                with lock:
+                    inflight.append(i)
+                    peak.append(len(inflight))
+                time.sleep(0.01)
+                with lock:
+                    inflight.remove(i)
+
+        with executor.ThreadPoolExecutor(max_workers=8) as w:
+            list(w.map(request, range(16)))
+        self.assertEqual(max(peak), 2)
+        self.assertIs(limiter('s3'), limiter('s3'))
+
+        limiter.set_limit('s3', 4)
+        self.assertEqual(limiter('s3')._initial_value, 4)
+        self.assertEqual(
+            limiter('ec2')._initial_value, executor.ServiceLimiter.default_limit)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -114,6 +114,144 @@ class TestAndFilter(unittest.TestCase):
         self.assertEqual(f.process([instance(Architecture="x86_64")]), [])
 
 
+class TestFilterCostOrder(BaseTest):
+
+    def get_manager(self, filters):
+        return self.load_policy({
+            "name": "cost-order",
+            "resource": "ec2",
+            "filters": filters}).resource_manager
+
+    def test_order_by_cost(self):
+        manager = self.get_manager([
+            {"type": "metrics", "name": "CPUUtilization", "value": 5, "op": "lt"},
+            {"State.Name": "running"},
+            {"type": "value", "value_type": "resource_count", "op": "gt", "value": 1},
+            {"type": "metrics", "name": "NetworkIn", "value": 5, "op": "lt"},
+            {"type": "value", "key": "\"c7n.metrics\"", "value": "present"},
+            {"InstanceType": "t2.micro"}])
+        f = manager.filters
+        self.assertEqual(
+            base_filters.core.order_by_cost(f),
+            [f[1], f[0], f[2], f[3], f[4], f[5]])
+
+    def test_cost_overridden_matching(self):
+        asg_filters = self.load_policy({
+            "name": "asg-image-age",
+            "resource": "asg",
+            "filters": [{"type": "image-age", "days": 5}]}).resource_manager.filters
+        ec2_filters = self.get_manager([
+            {"type": "instance-age", "days": 5},
+            {"type": "image-age", "days": 5}]).filters
+        # overriding the resource date is still evaluated in memory
+        self.assertEqual(ec2_filters[0].cost, base_filters.core.COST_MEMORY)
+        self.assertTrue(ec2_filters[0].streamable)
+        for f in (asg_filters[0], ec2_filters[1]):
+            self.assertEqual(f.cost, base_filters.core.COST_API)
+            self.assertFalse(f.streamable)
+
+        class CallValueFilter(base_filters.ValueFilter):
+            def __call__(self, r):
+                return True
+
+        f = CallValueFilter({"key": "State.Name", "value": "running"})
+        self.assertEqual(f.cost, base_filters.core.COST_API)
+        self.assertTrue(f.streamable)
+
+    def test_metrics_streamable(self):
+        metrics = self.get_manager([
+            {"type": "metrics", "name": "CPUUtilization", "value": 5}]).filters[0]
+        usage = self.load_policy({
+            "name": "quota-usage",
+            "resource": "service-quota",
+            "filters": [{"type": "usage-metric", "limit": 20}]}).resource_manager.filters[0]
+        self.assertTrue(metrics.streamable)
+        # usage metrics override process with their own evaluation
+        self.assertFalse(usage.streamable)
+
+    def test_metrics_batch_unsupported(self):
+        manager = self.load_policy({
+            "name": "quota-usage",
+            "resource": "service-quota"}).resource_manager
+        usage = manager.filter_registry.factory(
+            {"type": "usage-metric", "batch": True}, manager)
+        self.assertRaises(PolicyValidationError, usage.validate)
+
+    def test_reads_annotations(self):
+        def reads(key):
+            return base_filters.ValueFilter({"key": key, "value": "x"}).reads_annotations()
+
+        self.assertTrue(reads("c7n:MatchedFilters"))
+        self.assertTrue(reads('"c7n:MatchedFilters"[0]'))
+        self.assertTrue(reads('"c7n.metrics".Average'))
+        self.assertFalse(reads("tag:c7n-owner"))
+        self.assertFalse(reads("Tags[?Key=='c7n'].Value"))
+        self.assertFalse(reads("Description"))
+
+    def test_and_cheapest_first(self):
+        manager = self.get_manager([{"and": [
+            {"type": "metrics", "name": "CPUUtilization", "value": 5, "op": "lt"},
+            {"State.Name": "running"}]}])
+        evaluated = []
+        self.patch(
+            base_filters.MetricsFilter, "process",
+            lambda self, resources, event=None: evaluated.extend(resources) or resources)
+        resources = [
+            instance(InstanceId="i-1", State={"Name": "running"}),
+            instance(InstanceId="i-2", State={"Name": "stopped"})]
+        self.assertEqual(
+            [r["InstanceId"] for r in manager.filter_resources(resources)], ["i-1"])
+        self.assertEqual([r["InstanceId"] for r in evaluated], ["i-1"])
+
+    def test_or_residual(self):
+        manager = self.get_manager([{"or": [
+            {"type": "metrics", "name": "CPUUtilization", "value": 5, "op": "lt"},
+            {"State.Name": "stopped"}]}])
+        evaluated = []
+        self.patch(
+            base_filters.MetricsFilter, "process",
+            lambda self, resources, event=None: evaluated.extend(resources) or resources)
+        resources = [
+            instance(InstanceId="i-1", State={"Name": "running"}),
+            instance(InstanceId="i-2", State={"Name": "stopped"})]
+        self.assertEqual(
+            sorted(r["InstanceId"] for r in manager.filter_resources(resources)),
+            ["i-1", "i-2"])
+        self.assertEqual([r["InstanceId"] for r in evaluated], ["i-1"])
+
+
+class TestRelatedResourceFilter(BaseTest):
+
+    def test_related_match_memoized(self):
+        p = self.load_policy({
+            "name": "ec2-sg",
+            "resource": "ec2",
+            "filters": [{"type": "security-group", "key": "GroupName", "value": "web"}]})
+        f = p.resource_manager.filters[0]
+        related = {
+            "sg-1": {"GroupId": "sg-1", "GroupName": "web"},
+            "sg-2": {"GroupId": "sg-2", "GroupName": "db"}}
+        self.patch(f, "get_related", lambda resources: related)
+        matched = []
+        match = f.match
+        self.patch(f, "match", lambda r: matched.append(r["GroupId"]) or match(r))
+
+        resources = [
+            instance(
+                InstanceId="i-%d" % i,
+                NetworkInterfaces=[{"Groups": [{"GroupId": "sg-%d" % (i % 2 + 1)}]}])
+            for i in range(10)]
+        self.assertEqual(
+            [r["InstanceId"] for r in f.process(resources)],
+            ["i-0", "i-2", "i-4", "i-6", "i-8"])
+        self.assertEqual(sorted(matched), ["sg-1", "sg-2"])
+
+        # related resources are matched again on each invocation
+        related["sg-1"] = {"GroupId": "sg-1", "GroupName": "app"}
+        self.assertEqual(f.process(resources), [])
+        self.assertEqual(len(matched), 4)
+
+
 class TestNotFilter(unittest.TestCase):
 
     def test_not(self):
@@ -304,6 +442,56 @@ class TestValueFilter(unittest.TestCase):
         self.assertEqual(res,False)
 
 
+class TestValueFilterPlan(unittest.TestCase):
+
+    def test_plan_compiled_once(self):
+        vf = filters.factory(
+            {"type": "value", "key": "tag:Env", "value": "prod", "op": "eq"})
+        self.assertTrue(vf({"Tags": [{"Key": "Env", "Value": "prod"}]}))
+        plan = vf.plan
+        self.assertIsNotNone(plan)
+        self.assertFalse(vf({"Tags": [{"Key": "Env", "Value": "dev"}]}))
+        self.assertFalse(vf({"Tags": []}))
+        self.assertIs(vf.plan, plan)
+
+    def test_plan_key_accessors(self):
+        vf = filters.factory({"type": "value", "key": "State.Name", "value": "running"})
+        self.assertTrue(vf({"State": {"Name": "running"}}))
+        self.assertTrue(vf({"State.Name": "running"}))
+        self.assertFalse(vf({"State": {"Name": "stopped"}}))
+
+        vf = filters.factory({
+            "type": "value", "key": "tag:Owner", "value": "alice",
+            "value_regex": "^user=(.*)$"})
+        self.assertTrue(vf({"Tags": [{"Key": "Owner", "Value": "user=alice"}]}))
+        self.assertFalse(vf({"Tags": [{"Key": "Owner", "Value": "alice"}]}))
+
+    def test_plan_preparsed_values(self):
+        vf = filters.factory({
+            "type": "value", "key": "Cidr", "value_type": "cidr",
+            "op": "in", "value": "10.0.0.0/16"})
+        self.assertTrue(vf({"Cidr": "10.0.1.1"}))
+        self.assertFalse(vf({"Cidr": "10.1.1.1"}))
+
+        vf = filters.factory({
+            "type": "value", "key": "Version", "value_type": "version",
+            "op": "gte", "value": "5.7.10"})
+        self.assertTrue(vf({"Version": "5.7.22"}))
+        self.assertFalse(vf({"Version": "5.6.40"}))
+
+        vf = filters.factory({
+            "type": "value", "key": "Created", "value_type": "date",
+            "op": "lt", "value": "2020-01-01"})
+        self.assertTrue(vf({"Created": "2019-06-01T00:00:00"}))
+        self.assertFalse(vf({"Created": "2021-06-01T00:00:00"}))
+
+        vf = filters.factory({
+            "type": "value", "key": "Name", "value_type": "normalize",
+            "value": "web"})
+        self.assertTrue(vf({"Name": " Web "}))
+        self.assertFalse(vf({"Name": None}))
+
+
 class TestAgeFilter(unittest.TestCase):
 
     def test_age_filter(self):
@@ -1149,6 +1337,53 @@ class TestMetricsFilter(BaseTest):
                 for res in resources)
         )
 
+    def test_metrics_batch(self):
+        self.patch(ELB, "executor_factory", MainThreadExecutor)
+        session_factory = self.replay_flight_data("test_metrics_batch")
+        calls = []
+        self.patch(
+            base_filters.MetricsFilter, "process_query_set",
+            lambda f, query_set, original=base_filters.MetricsFilter.process_query_set: (
+                calls.append(len(query_set)) or original(f, query_set)))
+
+        p = self.load_policy(
+            {
+                "name": "elb-metrics-batch",
+                "resource": "elb",
+                "filters": [
+                    {
+                        "type": "metrics",
+                        "value": 0,
+                        "name": "RequestCount",
+                        "op": "eq",
+                        "statistics": "Sum",
+                        "missing-value": 0.0,
+                        "batch": True,
+                    },
+                    {
+                        "type": "metrics",
+                        "value": 1,
+                        "name": "RequestCount",
+                        "op": "less-than",
+                        "statistics": "Sum",
+                        "batch": True,
+                    },
+                ],
+            },
+            config={"account_id": "644160558196"},
+            session_factory=session_factory,
+        )
+        self.assertEqual(
+            p.resource_manager.filters[0].get_permissions(),
+            ("cloudwatch:GetMetricData",))
+        resources = p.run()
+        self.assertEqual(calls, [3])
+        self.assertEqual(
+            [r["LoadBalancerName"] for r in resources], ["test-elb-zero-metrics"])
+        self.assertEqual(len(resources[0]["c7n.metrics"]), 1)
+        self.assertEqual(
+            list(resources[0]["c7n.metrics"].values())[0][0]["Sum"], 0.0)
+
     def test_metric_period_rounding(self):
         """Round metrics start and end times to align with CloudWatch retention periods"""
 
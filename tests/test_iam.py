@@ -14,6 +14,7 @@ import pytest
 from pytest_terraform import terraform
 from dateutil import parser
 
+from c7n.config import Config
 from c7n.exceptions import PolicyValidationError
 from c7n.executor import MainThreadExecutor
 from c7n.filters.iamaccess import CrossAccountAccessFilter, PolicyChecker
@@ -549,6 +550,25 @@ class IamRoleTest(BaseTest):
         resources = p.run()
         self.assertEqual(len(resources), 1)
 
+    def test_iam_role_inuse_file_cache(self):
+        session_factory = self.replay_flight_data("test_iam_role_inuse")
+        self.patch(UsedIamRole, "executor_factory", MainThreadExecutor)
+        # role usage nests instance profile usage scans on the same cache
+        temp_dir = self.get_temp_dir()
+        cache = os.path.join(temp_dir, "c7n.cache")
+        for i in range(2):
+            p = self.load_policy(
+                {
+                    "name": "iam-inuse-role",
+                    "resource": "iam-role",
+                    "filters": [{"type": "used", "state": True}],
+                },
+                config=Config.empty(cache=cache, cache_period=15, output_dir=temp_dir),
+                session_factory=session_factory,
+            )
+            resources = p.run()
+            self.assertEqual(len(resources), 1)
+
     def test_iam_role_unused(self):
         session_factory = self.replay_flight_data("test_iam_role_unused")
         self.patch(UnusedIamRole, "executor_factory", MainThreadExecutor)
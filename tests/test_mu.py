@@ -22,6 +22,7 @@ from c7n.mu import (
     custodian_archive,
     generate_requirements,
     get_exec_options,
+    get_policy_modules,
     BucketLambdaNotification,
     LambdaFunction,
     LambdaManager,
@@ -63,6 +64,41 @@ def test_generate_requirements():
     assert set(packages) == {'botocore', 'jmespath', 'python-dateutil'}
 
 
+def test_lambda_manager_skips_unchanged_upload():
+    archive = mock.MagicMock()
+    archive.get_checksum.return_value = 'abc'
+    func = mock.MagicMock(role=ROLE, concurrency=None)
+    func.name = 'custodian-xyz'
+    func.get_archive.return_value = archive
+    func.get_config.return_value = {}
+
+    mgr = LambdaManager(mock.MagicMock())
+    with patch.multiple(
+            mgr,
+            get=mock.DEFAULT,
+            _upload_func=mock.DEFAULT,
+            _update_tags=mock.DEFAULT,
+            _update_architecture=mock.DEFAULT,
+            _update_concurrency=mock.DEFAULT,
+            delta_function=mock.DEFAULT) as mocks:
+        for m in mocks.values():
+            m.return_value = False
+        mocks['get'].return_value = {'Configuration': {'CodeSha256': 'abc'}}
+        result, changed = mgr._create_or_update(func, s3_uri='s3://assets/lambda')
+        assert changed is False
+        mocks['_upload_func'].assert_not_called()
+        mgr.client.update_function_code.assert_not_called()
+        assert mocks['_update_architecture'].call_args[0][-1] == {
+            'S3Bucket': 'assets', 'S3Key': '/lambda/custodian-xyz'}
+
+        mocks['_upload_func'].return_value = ('assets', '/lambda/custodian-xyz')
+        archive.get_checksum.return_value = 'def'
+        result, changed = mgr._create_or_update(func, s3_uri='s3://assets/lambda')
+        assert changed is True
+        mocks['_upload_func'].assert_called_once()
+        mgr.client.update_function_code.assert_called_once()
+
+
 class Publish(BaseTest):
 
     def make_func(self, **kw):
@@ -125,6 +161,31 @@ class PolicyLambdaProvision(Publish):
             result = mgr.publish(pl)
             self.assertEqual(result["Architectures"], ["arm64"])
 
+    def test_slim_archive(self):
+        p = self.load_policy({
+            'name': 'ec2-sg-default',
+            'resource': 'aws.ec2',
+            'mode': {
+                'type': 'cloudtrail',
+                'role': 'arn:aws:iam::644160558196:role/custodian-mu',
+                'events': ['RunInstances'],
+                'slim-archive': True},
+            'filters': [{'type': 'security-group', 'key': 'GroupName', 'value': 'default'}],
+            'actions': ['stop']})
+        modules = get_policy_modules(p)
+        self.assertTrue({
+            'c7n', 'c7n.handler', 'c7n.policy', 'c7n.resources', 'c7n.resources.ec2',
+            'c7n.resources.vpc', 'c7n.filters.related', 'c7n.resources.securityhub'}.issubset(
+                modules))
+        self.assertNotIn('c7n.resources.rds', modules)
+
+        filenames = PolicyLambda(p).get_archive().get_filenames()
+        self.assertIn('c7n/resources/vpc.py', filenames)
+        self.assertIn('c7n/handler.py', filenames)
+        self.assertNotIn('c7n/resources/rds.py', filenames)
+        self.assertEqual(
+            len([f for f in filenames if f.startswith('c7n/')]), len(modules))
+
     def test_deferred_interpolation(self):
         p = self.load_policy({
             'name': 'ec2-foo-bar',
@@ -1284,6 +1345,25 @@ class PythonArchiveTest(unittest.TestCase):
         filenames = archive.get_filenames()
         self.assertTrue("c7n/__init__.py" in filenames)
 
+    @patch("c7n.mu._module_archives", {})
+    def test_custodian_archive_module_cache(self):
+        from c7n import mu
+        archives = [custodian_archive().close(), custodian_archive().close()]
+        self.assertEqual(list(mu._module_archives), [(("c7n",), None)])
+        self.assertEqual(archives[0].get_checksum(), archives[1].get_checksum())
+        self.assertNotEqual(archives[0].path, archives[1].path)
+
+        archive = custodian_archive()
+        archive.add_contents("config.json", "{}")
+        archive.close()
+        filenames = archive.get_filenames()
+        self.assertEqual(filenames[-1], "config.json")
+        self.assertEqual(archives[0].get_filenames(), filenames[:-1])
+
+        custodian_archive(packages=["botocore"])
+        self.assertEqual(
+            [k[0] for k in sorted(mu._module_archives)], [("botocore", "c7n"), ("c7n",)])
+
     def make_file(self):
         bench = tempfile.mkdtemp()
         path = os.path.join(bench, "foo.txt")
@@ -3,13 +3,14 @@
 import datetime
 import json
 import os
+import threading
 
-from dateutil import tz as tzutil
+from dateutil import tz as tzutil, zoneinfo
 
 from .common import BaseTest, instance
 
 from c7n.exceptions import PolicyValidationError
-from c7n.filters.offhours import OffHour, OnHour, ScheduleParser, Time
+from c7n.filters.offhours import OffHour, OnHour, ScheduleParser, Time, TimezoneAliases
 from c7n.testing import mock_datetime_now
 
 
@@ -105,6 +106,30 @@ class OffHoursFilterTest(BaseTest):
                 f.process(instances), [instances[0], instances[1], instances[2]]
             )
 
+    def test_process_schedule_once(self):
+        f = OffHour({"skip-days": ["2015-12-25"]})
+        evaluated = []
+        match_schedule = f.match_schedule
+        self.patch(
+            f, "match_schedule",
+            lambda value, time_type: evaluated.append(value) or match_schedule(
+                value, time_type))
+        instances = [
+            instance(InstanceId="i-%d" % n, Tags=[{"Key": "maid_offhours", "Value": value}])
+            for n, value in enumerate(
+                ["", "", "tz=pt", "off=(m-f,19);", "off=(m-f,19)", "off=(m-f,25)", "off=(m-f,25)"])]
+        t = datetime.datetime(
+            year=2015, month=12, day=1, hour=19, minute=5,
+            tzinfo=tzutil.gettz("America/New_York"))
+        with mock_datetime_now(t, datetime):
+            self.assertEqual(
+                [i["InstanceId"] for i in f.process(instances)],
+                ["i-0", "i-1", "i-2", "i-3", "i-4"])
+        self.assertEqual(evaluated, ["", "tz=pt", "off=(m-f,19)", "off=(m-f,25)"])
+        self.assertEqual(
+            f.parse_errors, [("i-5", "off=(m-f,25)"), ("i-6", "off=(m-f,25)")])
+        self.assertEqual(f.skip_days, ["2015-12-25"])
+
     def test_opt_out_behavior(self):
         # Some users want to match based on policy filters to
         # a resource subset with default opt out behavior
@@ -362,6 +387,46 @@ class OffHoursFilterTest(BaseTest):
         i = instance(Tags=[{"Key": "maid_offhours", "Value": "tz=evt"}])
         self.assertEqual(OffHour({})(i), False)
 
+    def test_tz_aliases_lazy_zones(self):
+        aliases = TimezoneAliases({'pt': 'America/Los_Angeles'})
+        self.assertEqual(aliases.get('pt'), 'America/Los_Angeles')
+        self.assertFalse(aliases.loaded)
+        self.assertEqual(aliases.get('america/port-au-prince'), 'America/Port-au-Prince')
+        self.assertTrue(aliases.loaded)
+        self.assertIn('america/port-au-prince', aliases)
+        self.assertEqual(aliases.get('evt'), None)
+        self.assertRaises(KeyError, aliases.__getitem__, 'evt')
+        self.assertEqual(
+            Time.get_tz('america/port-au-prince'),
+            tzutil.gettz('America/Port-au-Prince'))
+
+    def test_tz_aliases_concurrent_load(self):
+        aliases = TimezoneAliases()
+        zones = zoneinfo.get_zonefile_instance().zones
+        loading, done = threading.Event(), threading.Event()
+
+        class SlowZones:
+            @property
+            def zones(self):
+                loading.set()
+                done.wait(5)
+                return zones
+
+        self.patch(zoneinfo, "get_zonefile_instance", SlowZones)
+        loader = threading.Thread(target=aliases.load)
+        loader.start()
+        loading.wait(5)
+        # lookups wait for the load in progress rather than miss
+        results = []
+        lookup = threading.Thread(
+            target=lambda: results.append(aliases.get('america/port-au-prince')))
+        lookup.start()
+        self.assertFalse(aliases.loaded)
+        done.set()
+        loader.join()
+        lookup.join()
+        self.assertEqual(results, ['America/Port-au-Prince'])
+
     def test_custom_offhours(self):
         t = datetime.datetime.now(tzutil.gettz("America/New_York"))
         t = t.replace(year=2016, month=5, day=26, hour=19, minute=00)
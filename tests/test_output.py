@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 import datetime
 import gzip
+import json
 import logging
 import shutil
 from unittest import mock
@@ -28,6 +29,44 @@ class MetricsTest(BaseTest):
             isinstance(metrics_outputs.select(True, {}), MetricsOutput))
 
 
+class ProfileTracerTest(BaseTest):
+
+    def test_profile(self):
+        session_factory = self.replay_flight_data("test_query_stream")
+        output_dir = self.get_temp_dir()
+        p = self.load_policy(
+            {"name": "igw-profile",
+             "resource": "internet-gateway",
+             "filters": [
+                 {"or": [
+                     {"InternetGatewayId": "igw-2e65104a"},
+                     {"InternetGatewayId": "igw-5bce113f"}]}]},
+            config={"tracer": "profile"},
+            output_dir=output_dir,
+            session_factory=session_factory)
+        resources = p.run()
+        self.assertEqual(len(resources), 2)
+
+        policy_dir = os.path.join(output_dir, "igw-profile")
+        with open(os.path.join(policy_dir, "profile.json")) as fh:
+            profile = json.load(fh)
+        self.assertEqual(profile["name"], "igw-profile")
+        segments = {s["name"]: s for s in profile["children"]}
+        self.assertEqual(
+            set(segments["resource-fetch"]["usage"]), {"api_calls", "bytes", "retries"})
+        self.assertEqual(
+            [s["name"] for s in segments["filter"]["children"]], ["filter:or"])
+        self.assertEqual(
+            [s["name"] for s in segments["filter"]["children"][0]["children"]],
+            ["filter:value", "filter:value"])
+
+        with open(os.path.join(policy_dir, "profile.trace.json")) as fh:
+            events = json.load(fh)["traceEvents"]
+        self.assertEqual(events[0]["name"], "igw-profile")
+        self.assertEqual(len(events), 7)
+        self.assertTrue(all(e["ph"] == "X" for e in events))
+
+
 class DirOutputTest(BaseTest):
 
     def get_dir_output(self, location):
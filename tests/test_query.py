@@ -5,7 +5,8 @@ import logging
 import os
 
 
-from c7n.query import ResourceQuery, RetryPageIterator, TypeInfo
+from c7n.executor import MainThreadExecutor
+from c7n.query import ChildResourceQuery, ResourceQuery, RetryPageIterator, TypeInfo
 from c7n.resources.vpc import InternetGateway
 
 from botocore.config import Config
@@ -99,6 +100,25 @@ class ResourceQueryTest(BaseTest):
         assert repr(TypeInfo) == "<TypeInfo TypeInfo>"
 
 
+class ChildResourceQueryTest(BaseTest):
+
+    def test_child_query_parents(self):
+        session_factory = self.replay_flight_data("test_query_child_parents")
+        p = self.load_policy(
+            {"name": "mount-targets", "resource": "efs-mount-target"},
+            session_factory=session_factory)
+        manager = p.resource_manager
+        self.patch(manager, "executor_factory", MainThreadExecutor)
+        q = ChildResourceQuery(session_factory, manager)
+        q.capture_parent_id = True
+        resources = q.filter(manager)
+        self.assertEqual(
+            [(parent_id, r["MountTargetId"]) for parent_id, r in resources],
+            [("fs-e6268aaf", "fsmt-4268de0b"),
+             ("fs-e6268aaf", "fsmt-4568de0c"),
+             ("fs-1a2b3c4d", "fsmt-1b2c3d4e")])
+
+
 class ConfigSourceTest(BaseTest):
 
     def test_config_select(self):
@@ -154,6 +174,53 @@ class QueryResourceManagerTest(BaseTest):
         p.run()
         self.assertTrue("Using cached internet-gateway: 3", output.getvalue())
 
+    def test_stream_resources(self):
+        session_factory = self.replay_flight_data("test_query_stream")
+        p = self.load_policy(
+            {
+                "name": "igw-check",
+                "resource": "internet-gateway",
+                "filters": [
+                    {"InternetGatewayId": "igw-2e65104a"},
+                    {"type": "value", "value_type": "resource_count",
+                     "op": "eq", "value": 1}],
+            },
+            config={"stream": True},
+            session_factory=session_factory,
+        )
+        head, tail = p.resource_manager.get_streamable_filters()
+        self.assertEqual(len(head), 1)
+        self.assertEqual(len(tail), 1)
+
+        pages = []
+        self.patch(
+            p.resource_manager, 'augment',
+            lambda resources: pages.append(len(resources)) or resources)
+        resources = p.run()
+        self.assertEqual(len(resources), 1)
+        self.assertEqual(resources[0]["InternetGatewayId"], "igw-2e65104a")
+        self.assertEqual(pages, [2, 1])
+
+    def test_get_resources_cached(self):
+        session_factory = self.replay_flight_data("test_query_manager_get")
+        p = self.load_policy(
+            {"name": "igw-check", "resource": "internet-gateway"},
+            session_factory=session_factory, cache=True)
+        manager = p.resource_manager
+        resources = manager.get_resources(["igw-2e65104a"])
+        self.assertEqual(len(resources), 1)
+        resources[0]["c7n:annotation"] = True
+
+        fetched = []
+        self.patch(
+            manager.source, "get_resources",
+            lambda ids: fetched.append(ids) or [])
+        resources = manager.get_resources(["igw-2e65104a", "igw-5bce113f"])
+        self.assertEqual(
+            [r["InternetGatewayId"] for r in resources], ["igw-2e65104a"])
+        self.assertNotIn("c7n:annotation", resources[0])
+        self.assertEqual(fetched, [["igw-5bce113f"]])
+
     def test_get_resources(self):
         session_factory = self.replay_flight_data("test_query_manager_get")
         p = self.load_policy(
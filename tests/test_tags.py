@@ -9,7 +9,7 @@ from mock import MagicMock, call
 
 from c7n.tags import universal_retry, coalesce_copy_user_tags
 from c7n.exceptions import PolicyExecutionError, PolicyValidationError
-from c7n.utils import yaml_load
+from c7n.utils import TagIndex, get_tag_map, yaml_load
 
 from .common import BaseTest
 
@@ -131,6 +131,27 @@ class TagInterpolationTest(BaseTest):
         )
 
 
+class TagIndexTest(BaseTest):
+
+    def test_tag_action_invalidates_index(self):
+        factory = MagicMock()
+        factory.region = 'us-east-1'
+        p = self.load_policy(
+            {'name': 'ec2-tag', 'resource': 'ec2',
+             'actions': [{'type': 'tag', 'key': 'Owner', 'value': 'ops'}]},
+            session_factory=factory)
+        resource = {'InstanceId': 'i-1', 'Tags': [{'Key': 'Env', 'Value': 'dev'}]}
+        with p.ctx:
+            # the policy execution shares an index across filters and actions
+            index = TagIndex.current()
+            self.assertIsNotNone(index)
+            self.assertEqual(get_tag_map(resource), {'Env': 'dev'})
+            resource['Tags'].append({'Key': 'Owner', 'Value': 'ops'})
+            p.resource_manager.actions[0].process([resource])
+            self.assertEqual(get_tag_map(resource), {'Env': 'dev', 'Owner': 'ops'})
+        self.assertIsNone(TagIndex.current())
+
+
 class UniversalTagTest(BaseTest):
 
     def test_auto_tag_registration(self):
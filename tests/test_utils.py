@@ -7,6 +7,7 @@ import tempfile
 import time
 from unittest import mock
 
+import boto3
 from botocore.exceptions import ClientError
 from dateutil.parser import parse as parse_date
 
@@ -51,6 +52,54 @@ class Backoff(BaseTest):
         else:
             self.fail("should have raised")
 
+    def test_retry_rate_limit(self):
+        self.patch(time, "sleep", lambda x: x)
+        client = boto3.Session().client('ec2', region_name='us-east-1')
+        attempts = []
+
+        def describe_instances():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ClientError({"Error": {"Code": "RequestLimitExceeded"}}, "throttled")
+            return 42
+        describe_instances.__self__ = client
+
+        retry = utils.get_retry(("RequestLimitExceeded",), 5)
+        token = utils.api_account.set('123456789012')
+        self.addCleanup(utils.api_account.reset, token)
+        self.assertEqual(retry(describe_instances), 42)
+        limit = utils.rate_limits.get(describe_instances)
+        self.assertIs(limit, utils.rate_limits.limits[
+            ('ec2', 'describe_instances', 'us-east-1', '123456789012')])
+        self.assertEqual(limit.rate, utils.RateLimit.min_rate + 1.0)
+        self.assertIsNone(utils.rate_limits.get(lambda: 42))
+
+        # rates learned for one account aren't applied to another
+        utils.api_account.set('210987654321')
+        self.assertIsNot(utils.rate_limits.get(describe_instances), limit)
+
+    def test_rate_limit(self):
+        sleeps = []
+        self.patch(time, "sleep", sleeps.append)
+        limit = utils.RateLimit()
+        self.assertEqual(limit.acquire(), 0)
+        self.assertIsNone(limit.rate)
+
+        limit.observed = 8
+        limit.throttled()
+        self.assertEqual(limit.rate, 4)
+        # concurrent throttles within a second only count once
+        limit.throttled()
+        self.assertEqual(limit.rate, 4)
+
+        for i in range(3):
+            limit.acquire()
+        self.assertEqual(len(sleeps), 3)
+        self.assertAlmostEqual(sleeps[-1], 0.75, places=2)
+
+        limit.succeeded()
+        self.assertEqual(limit.rate, 4.25)
+
     def test_delays(self):
         self.assertEqual(
             list(utils.backoff_delays(1, 256)),
@@ -711,3 +760,38 @@ def test_jmespath_parse_split():
         {'foo': {'bar': 'abc.xyz'}}
     )
     assert result == ['abc', 'xyz']
+
+
+def test_tag_index():
+    resource = {'Tags': [
+        {'Key': 'Env', 'Value': 'prod'},
+        {'Key': 'Owner', 'Value': 'alice'},
+        {'Key': 'env', 'Value': 'dev'},
+        {'Key': 'Owner', 'Value': 'bob'}]}
+    assert utils.get_tag_map(resource) == {
+        'Env': 'prod', 'Owner': 'bob', 'env': 'dev'}
+    assert utils.get_tag_map(resource, lower=True) == {
+        'env': 'prod', 'owner': 'alice'}
+    assert utils.get_tag_map({}) == {}
+
+    with utils.TagIndex() as index:
+        tag_map = utils.get_tag_map(resource)
+        assert utils.get_tag_map(resource) is tag_map
+
+        # nested passes share the outer index
+        with utils.TagIndex():
+            assert utils.TagIndex.current() is index
+            assert utils.get_tag_map(resource) is tag_map
+
+        # in place modifications are seen once invalidated
+        resource['Tags'][0]['Value'] = 'stage'
+        assert utils.get_tag_map(resource)['Env'] == 'prod'
+        utils.TagIndex.invalidate([resource])
+        assert utils.get_tag_map(resource)['Env'] == 'stage'
+
+        # replacing the tag list rebuilds
+        resource['Tags'] = [{'Key': 'Env', 'Value': 'qa'}]
+        assert utils.get_tag_map(resource) == {'Env': 'qa'}
+
+    assert utils.TagIndex.current() is None
+    assert index.maps == {}
@@ -3253,6 +3253,34 @@ class SecurityGroupTest(BaseTest):
         self.assertEqual(len(resources), 1)
         self.assertEqual(len(resources[0].get("MatchedIpPermissions", [])), 1)
 
+    def test_cidr_ingress_matches_shared(self):
+        p = self.load_policy({
+            "name": "ingress-cidr",
+            "resource": "security-group",
+            "filters": [{
+                "type": "ingress",
+                "Description": {"value": "absent"},
+                "Cidr": {"value": "10.42.1.239", "op": "in", "value_type": "cidr"}}]})
+        f = p.resource_manager.filters[0]
+        parsed = []
+        from c7n.filters import core
+        parse_cidr = core.parse_cidr
+        self.patch(core, "parse_cidr", lambda v: parsed.append(v) or parse_cidr(v))
+        groups = [{
+            "GroupId": "sg-%d" % i,
+            "OwnerId": "123456789012",
+            "IpPermissions": [{
+                "IpProtocol": "tcp", "FromPort": 443, "ToPort": 443,
+                "IpRanges": [{"CidrIp": "10.42.1.0/24"}, {"CidrIp": "10.%d.0.0/16" % i}]}]}
+            for i in range(3)]
+        self.assertEqual(
+            [g["GroupId"] for g in f.process(groups)], ["sg-0", "sg-1", "sg-2"])
+        self.assertEqual(
+            [len(g["MatchedIpPermissions"]) for g in groups], [1, 1, 1])
+        self.assertEqual(
+            [v for v in parsed if v != "10.42.1.239"],
+            ["10.42.1.0/24", "10.0.0.0/16", "10.1.0.0/16", "10.2.0.0/16"])
+
     def test_cidr_ingress_list(self):
         factory = self.replay_flight_data("test_security_group_cidr_ingress_list")
         p = self.load_policy(
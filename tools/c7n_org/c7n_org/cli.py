@@ -22,8 +22,10 @@ from botocore.compat import OrderedDict
 from botocore.exceptions import ClientError
 import click
 import jsonschema
+from tabulate import tabulate
 
-from c7n.credentials import assumed_session, SessionFactory
+from c7n.credentials import (
+    assumed_credentials, assumed_session, credential_session, SessionFactory)
 from c7n.executor import MainThreadExecutor
 from c7n.exceptions import InvalidOutputConfig
 from c7n.config import Config
@@ -32,9 +34,10 @@ from c7n.provider import get_resource_class, clouds as cloud_providers
 from c7n.reports.csvout import Formatter, fs_record_set, record_set, strip_output_path
 from c7n.resources import load_available
 from c7n.utils import (
-    CONN_CACHE, dumps, filter_empty, format_string_values, get_policy_provider, join_output_path)
+    dumps, filter_empty, format_string_values, get_policy_provider, join_output_path)
 
-from c7n_org.utils import environ, account_tags
+from c7n_org.history import RunHistory
+from c7n_org.utils import environ, account_tags, use_account_sessions
 
 log = logging.getLogger('c7n_org')
 
@@ -49,6 +52,9 @@ if sys.platform == 'darwin' and (
 WORKER_COUNT = int(
     os.environ.get('C7N_ORG_PARALLEL', multiprocessing.cpu_count() * 4))
 
+# providers are loaded once per worker process
+PROVIDERS_LOADED = False
+
 
 CONFIG_SCHEMA = {
     '$schema': 'http://json-schema.org/draft-07/schema',
@@ -256,19 +262,29 @@ def get_session(account, session_name, region):
         roles = account['role']
         if isinstance(roles, str):
             roles = [roles]
-        s = None
-        for r in roles:
-            try:
-                s = assumed_session(
-                    r, session_name, region=region,
-                    external_id=account.get('external_id'),
-                    session=s)
-            except ClientError as e:
-                log.error(
-                    "unable to obtain credentials for account:%s role:%s error:%s",
-                    account['name'], r, e)
-                raise
-        return s
+
+        def assume():
+            s = None
+            for r in roles:
+                try:
+                    s = assumed_session(
+                        r, session_name, region=region,
+                        external_id=account.get('external_id'),
+                        session=s)
+                except ClientError as e:
+                    log.error(
+                        "unable to obtain credentials for account:%s role:%s error:%s",
+                        account['name'], r, e)
+                    raise
+            return s._session.get_credentials()
+
+        # the role chain is assumed once per worker process, the refreshable
+        # credentials are then shared across the account's regions.
+        return credential_session(
+            assumed_credentials.get(
+                (tuple(roles), session_name, account.get('external_id')),
+                region, assume),
+            region)
     elif account.get('profile'):
         return SessionFactory(region, account['profile'])()
     else:
@@ -606,16 +622,24 @@ def _update(old, new):
 
 
 def run_account(account, region, policies_config, output_path,
-                cache_period, cache_path, metrics, dryrun, debug):
+                cache_period, cache_path, metrics, dryrun, debug, records=None):
     """Execute a set of policies on an account.
+
+    If a records list is given, a run history record is appended to it
+    for each executed policy.
     """
+    global PROVIDERS_LOADED
     logging.getLogger('custodian.output').setLevel(logging.ERROR + 1)
-    CONN_CACHE.session = None
-    CONN_CACHE.time = None
-    load_available()
+    if not PROVIDERS_LOADED:
+        load_available()
+        PROVIDERS_LOADED = True
+    # the units of an account share the worker's sessions
+    use_account_sessions(account['account_id'])
 
     output_path = join_output_path(output_path, account['name'], region)
 
+    # the units of an account and region share a cache file, concurrent
+    # units in other workers write to it through wal.
     cache_path = os.path.join(cache_path, "%s-%s.cache" % (account['account_id'], region))
 
     config = Config.empty(
@@ -645,7 +669,7 @@ def run_account(account, region, policies_config, output_path,
     success = True
     st = time.time()
 
-    with environ(**env_vars):
+    with environ(reset_sessions=False, **env_vars):
         for p in policies:
             # Extend policy execution conditions with account information
             p.conditions.env_vars['account'] = account
@@ -655,6 +679,7 @@ def run_account(account, region, policies_config, output_path,
             log.debug(
                 "Running policy:%s account:%s region:%s",
                 p.name, account['name'], region)
+            pst, status = time.time(), RunHistory.STATUS_OK
             try:
                 resources = p.run()
                 policy_counts[p.name] = resources and len(resources) or 0
@@ -670,6 +695,7 @@ def run_account(account, region, policies_config, output_path,
                     time.time() - st)
             except ClientError as e:
                 success = False
+                status = RunHistory.STATUS_ERROR
                 if e.response['Error']['Code'] == 'AccessDenied':
                     log.warning('Access denied api:%s policy:%s account:%s region:%s',
                                 e.operation_name, p.name, account['name'], region)
@@ -680,6 +706,7 @@ def run_account(account, region, policies_config, output_path,
                 continue
             except Exception as e:
                 success = False
+                status = RunHistory.STATUS_ERROR
                 log.error(
                     "Exception running policy:%s account:%s region:%s error:%s",
                     p.name, account['name'], region, e)
@@ -689,10 +716,73 @@ def run_account(account, region, policies_config, output_path,
                 traceback.print_exc()
                 pdb.post_mortem(sys.exc_info()[-1])
                 raise
+            finally:
+                if records is not None:
+                    # only some providers collect api stats
+                    get_snapshot = getattr(p.ctx.api_stats, 'get_snapshot', None)
+                    records.append({
+                        'policy': p.name,
+                        'status': status,
+                        'duration': time.time() - pst,
+                        'api_calls': get_snapshot and sum(get_snapshot().values()) or 0,
+                        'resources': policy_counts.get(p.name, 0)})
 
     return policy_counts, success
 
 
+def run_unit(account, region, policies_config, *args):
+    """Execute a work unit.
+
+    Returns its policy counts, success and run history records.
+    """
+    records = []
+    policy_counts, success = run_account(
+        account, region, policies_config, *args, records)
+    return policy_counts, success, records
+
+
+def get_resource_type(policy):
+    """Get a policy's resource type qualified by its provider, ie. aws.ec2"""
+    rtype = policy['resource']
+    if '.' not in rtype:
+        rtype = "%s.%s" % (get_policy_provider(policy), rtype)
+    return rtype
+
+
+def group_policies(policies_config):
+    """Split a policy config into per resource type policy configs.
+
+    Policies of the same resource type are kept together so they can share
+    resource fetches within a unit.
+    """
+    groups = {}
+    for p in policies_config.get('policies', ()):
+        groups.setdefault(get_resource_type(p), []).append(p)
+    return [(rtype, dict(policies_config, policies=policies))
+            for rtype, policies in groups.items()]
+
+
+def get_work_units(accounts_config, policies_config, regions, completed=()):
+    """Split a run into (account, region, resource type, policies config) units.
+
+    Policies in the completed set of (account id, region, policy name) are
+    excluded.
+    """
+    policy_groups = group_policies(policies_config)
+    units = []
+    for a in accounts_config['accounts']:
+        for r in resolve_regions(regions or a.get('regions', ()), a):
+            for rtype, unit_config in policy_groups:
+                if completed:
+                    unit_config = dict(unit_config, policies=[
+                        p for p in unit_config['policies']
+                        if (a['account_id'], r, p['name']) not in completed])
+                    if not unit_config['policies']:
+                        continue
+                units.append((a, r, rtype, unit_config))
+    return units
+
+
 def initialize_provider_output(policies_config, output_dir, regions):
     """allow the provider an opportunity to initialize the output config.
     """
@@ -733,11 +823,13 @@ def initialize_provider_output(policies_config, output_dir, regions):
 @click.option("--metrics", default=False, is_flag=True)
 @click.option("--metrics-uri", default=None, help="Configure provider metrics target")
 @click.option("--dryrun", default=False, is_flag=True)
+@click.option("--resume", default=False, is_flag=True,
+              help="Resume an interrupted run, skipping completed policy executions")
 @click.option('--debug', default=False, is_flag=True)
 @click.option('-v', '--verbose', default=False, help="Verbose", is_flag=True)
 def run(config, use, output_dir, accounts, not_accounts, tags, region,
         policy, policy_tags, cache_period, cache_path, metrics,
-        dryrun, debug, verbose, metrics_uri):
+        dryrun, resume, debug, verbose, metrics_uri):
     """run a custodian policy across accounts"""
     accounts_config, custodian_config, executor = init(
         config, use, debug, verbose, accounts, tags, policy, policy_tags=policy_tags,
@@ -762,23 +854,38 @@ def run(config, use, output_dir, accounts, not_accounts, tags, region,
 
     output_dir = initialize_provider_output(custodian_config, output_dir, region)
 
+    history = RunHistory(cache_path)
+    run_id = resume and history.get_unfinished_run() or None
+    completed = ()
+    if run_id:
+        completed = history.get_completed(run_id)
+        log.info("Resuming run:%d completed policy executions:%d", run_id, len(completed))
+    else:
+        if resume:
+            log.info("No interrupted run to resume, starting a new run")
+        run_id = history.start_run()
+
+    # units are submitted longest first, idle workers pick up the next
+    # pending unit from the pool's shared queue as they finish.
+    units = history.order(
+        get_work_units(accounts_config, custodian_config, region, completed))
+
     with executor(max_workers=WORKER_COUNT) as w:
         futures = {}
-        for a in accounts_config['accounts']:
-            for r in resolve_regions(region or a.get('regions', ()), a):
-                futures[w.submit(
-                    run_account,
-                    a, r,
-                    custodian_config,
-                    output_dir,
-                    cache_period,
-                    cache_path,
-                    metrics,
-                    dryrun,
-                    debug)] = (a, r)
+        for a, r, rtype, unit_config in units:
+            futures[w.submit(
+                run_unit,
+                a, r,
+                unit_config,
+                output_dir,
+                cache_period,
+                cache_path,
+                metrics,
+                dryrun,
+                debug)] = (a, r, rtype)
 
         for f in as_completed(futures):
-            a, r = futures[f]
+            a, r, rtype = futures[f]
             if f.exception():
                 if debug:
                     raise
@@ -787,14 +894,36 @@ def run(config, use, output_dir, accounts, not_accounts, tags, region,
                     a['name'], r, f.exception())
                 continue
 
-            account_region_pcounts, account_region_success = f.result()
+            account_region_pcounts, account_region_success, records = f.result()
+            history.record(run_id, a, r, rtype, records)
             for p in account_region_pcounts:
                 policy_counts[p] += account_region_pcounts[p]
 
             if not account_region_success:
                 success = False
 
+    history.finish_run(run_id)
+    history.close()
     log.info("Policy resource counts %s" % policy_counts)
 
     if not success:
         sys.exit(1)
+
+
+@cli.command(name='stats')
+@click.option('--cache-path', required=False, type=click.Path(), default="~/.cache/c7n-org")
+@click.option('--days', default=30, type=int, help="Period of run history to report on")
+@click.option('--limit', default=20, type=int, help="Number of policy executions to show")
+def stats(cache_path, days, limit):
+    """report the slowest policy executions from run history"""
+    history = RunHistory(os.path.expanduser(cache_path))
+    rows = history.get_slowest(days=days, limit=limit)
+    history.close()
+    click.echo(tabulate(
+        [(account, region, policy, runs, avg_duration, max_duration,
+          int(avg_api_calls or 0), errors)
+         for account, region, policy, runs, avg_duration, max_duration,
+         avg_api_calls, errors in rows],
+        headers=('Account', 'Region', 'Policy', 'Runs', 'Avg Time',
+                 'Max Time', 'Avg Api Calls', 'Errors'),
+        floatfmt=".2f"))
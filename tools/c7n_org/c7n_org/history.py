@@ -0,0 +1,138 @@
+# Copyright The Cloud Custodian Authors.
+# SPDX-License-Identifier: Apache-2.0
+"""Run history of c7n-org policy executions.
+
+Each (account, region, policy) execution is recorded with its status,
+duration, api calls and resource count, supporting resumption of an
+interrupted run, scheduling of work units by their prior durations and
+reporting on the slowest units over time.
+"""
+from datetime import datetime, timedelta
+import os
+import sqlite3
+
+
+class RunHistory:
+
+    file_name = 'run-history.db'
+
+    create_tables = (
+        """
+        create table if not exists runs (
+            id integer primary key autoincrement,
+            start_time timestamp,
+            end_time timestamp
+        )
+        """,
+        """
+        create table if not exists units (
+            run_id integer,
+            account_id text,
+            account text,
+            region text,
+            resource text,
+            policy text,
+            status text,
+            duration real,
+            api_calls integer,
+            resources integer,
+            end_time timestamp
+        )
+        """,
+        "create index if not exists units_run on units (run_id)",
+    )
+
+    STATUS_OK = 'ok'
+    STATUS_ERROR = 'error'
+
+    def __init__(self, cache_path):
+        # ie. reporting stats on a machine without prior runs
+        if not os.path.exists(cache_path):
+            os.makedirs(cache_path)
+        self.path = os.path.join(cache_path, self.file_name)
+        self.conn = sqlite3.connect(
+            self.path, detect_types=sqlite3.PARSE_DECLTYPES)
+        with self.conn as cursor:
+            for statement in self.create_tables:
+                cursor.execute(statement)
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self):
+        with self.conn as cursor:
+            return cursor.execute(
+                'insert into runs (start_time) values (?)',
+                (datetime.utcnow(),)).lastrowid
+
+    def finish_run(self, run_id):
+        with self.conn as cursor:
+            cursor.execute(
+                'update runs set end_time = ? where id = ?',
+                (datetime.utcnow(), run_id))
+
+    def get_unfinished_run(self):
+        """Return the id of the latest run if it didn't complete."""
+        row = self.conn.execute(
+            'select id, end_time from runs order by id desc limit 1').fetchone()
+        if row and row[1] is None:
+            return row[0]
+
+    def record(self, run_id, account, region, resource, records):
+        end_time = datetime.utcnow()
+        with self.conn as cursor:
+            cursor.executemany(
+                'insert into units values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, account['account_id'], account['name'], region, resource,
+                  r['policy'], r['status'], r['duration'], r['api_calls'],
+                  r['resources'], end_time) for r in records])
+
+    def get_completed(self, run_id):
+        """Return the (account id, region, policy) units completed in a run."""
+        return set(self.conn.execute(
+            'select account_id, region, policy from units '
+            'where run_id = ? and status = ?', (run_id, self.STATUS_OK)))
+
+    def get_duration(self, account, region, resource):
+        return self.durations.get((account['account_id'], region, resource))
+
+    @property
+    def durations(self):
+        """Durations of (account id, region, resource type) units in their latest run."""
+        if getattr(self, '_durations', None) is None:
+            self._durations = {
+                (account_id, region, resource): duration for
+                account_id, region, resource, duration in self.conn.execute(
+                    """
+                    select u.account_id, u.region, u.resource, sum(u.duration)
+                    from units u join (
+                        select account_id, region, resource, max(run_id) as run_id
+                        from units group by account_id, region, resource) l
+                    on u.account_id = l.account_id and u.region = l.region
+                       and u.resource = l.resource and u.run_id = l.run_id
+                    group by u.account_id, u.region, u.resource
+                    """)}
+        return self._durations
+
+    def order(self, units):
+        """Order (account, region, resource type, ...) units longest first.
+
+        Units without a recorded duration are scheduled ahead of known ones.
+        """
+        def sort_key(unit):
+            duration = self.get_duration(*unit[:3])
+            return duration is None and float('-inf') or -duration
+        return sorted(units, key=sort_key)
+
+    def get_slowest(self, days=30, limit=20):
+        """Return the slowest (account, region, policy) units over a period."""
+        return self.conn.execute(
+            """
+            select account, region, policy, count(*) as runs,
+                   avg(duration) as avg_duration, max(duration) as max_duration,
+                   avg(api_calls) as avg_api_calls, sum(status != ?) as errors
+            from units where end_time >= ?
+            group by account_id, region, policy
+            order by avg_duration desc limit ?
+            """, (self.STATUS_OK, datetime.utcnow() - timedelta(days=days), limit)
+        ).fetchall()
@@ -1,9 +1,14 @@
 # Copyright The Cloud Custodian Authors.
 # SPDX-License-Identifier: Apache-2.0
 import os
-from c7n.utils import reset_session_cache
+import threading
+from collections import OrderedDict
+from c7n.utils import CONN_CACHE, reset_session_cache
 from contextlib import contextmanager
 
+# per worker thread, the cached sessions of recently run accounts
+WORKER_SESSIONS = threading.local()
+
 
 def account_tags(account):
     tags = {'AccountName': account['name'], 'AccountId': account['account_id']}
@@ -17,7 +22,7 @@ def account_tags(account):
 
 
 @contextmanager
-def environ(**kw):
+def environ(reset_sessions=True, **kw):
     current_env = dict(os.environ)
     for k, v in kw.items():
         os.environ[k] = v
@@ -28,4 +33,30 @@ def environ(**kw):
         for k in kw.keys():
             del os.environ[k]
         os.environ.update(current_env)
-        reset_session_cache()
+        if reset_sessions:
+            reset_session_cache()
+
+
+def use_account_sessions(account_id, max_accounts=8):
+    """Switch the thread's session cache to an account's.
+
+    Workers run many units, interleaved across accounts. Rather than
+    discarding the cached sessions when switching accounts, those of the
+    most recent accounts are set aside, so later units of an account in
+    the same worker reuse them.
+    """
+    accounts = getattr(WORKER_SESSIONS, 'accounts', None)
+    if accounts is None:
+        accounts = WORKER_SESSIONS.accounts = OrderedDict()
+        WORKER_SESSIONS.current = None
+    current = WORKER_SESSIONS.current
+    if current == account_id:
+        return
+    if current is not None:
+        accounts[current] = dict(vars(CONN_CACHE))
+        accounts.move_to_end(current)
+        while len(accounts) > max_accounts:
+            accounts.popitem(last=False)
+    reset_session_cache()
+    vars(CONN_CACHE).update(accounts.pop(account_id, {}))
+    WORKER_SESSIONS.current = account_id
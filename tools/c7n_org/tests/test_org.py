@@ -7,6 +7,10 @@ import os
 import pytest
 import yaml
 
+from botocore.credentials import Credentials
+from c7n.credentials import assumed_credentials
+from c7n.policy import Policy
+from c7n.utils import local_session, reset_session_cache
 from c7n.testing import TestUtils
 from click.testing import CliRunner
 
@@ -164,9 +168,10 @@ class OrgTest(TestUtils):
     def test_cli_run_aws(self):
         run_dir = self.setup_run_dir()
         logger = mock.MagicMock()
+        counts = {'compute': 24, 'serverless': 12}
         run_account = mock.MagicMock()
-        run_account.return_value = (
-            {'compute': 24, 'serverless': 12}, True)
+        run_account.side_effect = lambda a, r, policies_config, *args: (
+            {p['name']: counts[p['name']] for p in policies_config['policies']}, True)
         self.patch(org, 'logging', logger)
         self.patch(org, 'run_account', run_account)
         self.change_cwd(run_dir)
@@ -184,6 +189,164 @@ class OrgTest(TestUtils):
             log_output.getvalue().strip(),
             "Policy resource counts Counter({'compute': 96, 'serverless': 48})")
 
+    def test_cli_run_unit_order(self):
+        run_dir = self.setup_run_dir()
+        logger = mock.MagicMock()
+        units = []
+        durations = {('dev', 'aws.ec2'): 10, ('qa', 'aws.lambda'): 300,
+                     ('qa', 'aws.ec2'): 20, ('dev', 'aws.lambda'): 5}
+
+        def run_account(a, r, policies_config, *args):
+            rtype = policies_config['policies'][0]['resource']
+            units.append((a['name'], r, rtype))
+            args[-1].extend([{
+                'policy': p['name'], 'status': 'ok', 'api_calls': 3, 'resources': 1,
+                'duration': durations[(a['name'], rtype)]}
+                for p in policies_config['policies']])
+            return {}, True
+
+        self.patch(org, 'logging', logger)
+        self.patch(org, 'run_account', run_account)
+        self.change_cwd(run_dir)
+        args = ['run', '-c', 'accounts.yml', '-u', 'policies.yml',
+                '--debug', '-s', 'output', '--cache-path', 'cache',
+                '-r', 'us-east-1']
+        result = CliRunner().invoke(org.cli, args, catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(units, [
+            ('dev', 'us-east-1', 'aws.ec2'),
+            ('dev', 'us-east-1', 'aws.lambda'),
+            ('qa', 'us-east-1', 'aws.ec2'),
+            ('qa', 'us-east-1', 'aws.lambda')])
+
+        units.clear()
+        result = CliRunner().invoke(org.cli, args, catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(units, [
+            ('qa', 'us-east-1', 'aws.lambda'),
+            ('qa', 'us-east-1', 'aws.ec2'),
+            ('dev', 'us-east-1', 'aws.ec2'),
+            ('dev', 'us-east-1', 'aws.lambda')])
+
+        result = CliRunner().invoke(
+            org.cli, ['stats', '--cache-path', 'cache', '--limit', '2'],
+            catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        lines = result.output.strip().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(
+            lines[2].split()[:6],
+            ['qa', 'us-east-1', 'serverless', '2', '300.00', '300.00'])
+        self.assertEqual(lines[3].split()[:3], ['qa', 'us-east-1', 'compute'])
+
+    def test_group_policies_provider_prefix(self):
+        groups = org.group_policies({'policies': [
+            {'name': 'compute', 'resource': 'ec2'},
+            {'name': 'serverless', 'resource': 'aws.lambda'},
+            {'name': 'compute-tagged', 'resource': 'aws.ec2'}]})
+        self.assertEqual(
+            [(rtype, [p['name'] for p in config['policies']]) for rtype, config in groups],
+            [('aws.ec2', ['compute', 'compute-tagged']), ('aws.lambda', ['serverless'])])
+
+    def test_run_account_shared_cache_and_sessions(self):
+        run_dir = self.setup_run_dir()
+        runs = []
+
+        def run(policy):
+            runs.append((policy.options.cache, local_session(policy.session_factory)))
+            return []
+
+        self.patch(Policy, 'run', run)
+        self.addCleanup(reset_session_cache)
+        cache_path = os.path.join(run_dir, 'cache')
+        dev = {'name': 'dev', 'account_id': '112233445566'}
+        qa = {'name': 'qa', 'account_id': '002244668899'}
+        for account, rtype in ((dev, 'ec2'), (qa, 'ec2'), (dev, 'aws.lambda')):
+            org.run_account(
+                account, 'us-east-1', {'policies': [{'name': rtype, 'resource': rtype}]},
+                os.path.join(run_dir, 'output'), 0, cache_path, False, True, False)
+
+        # the units of an account share its cache file and sessions
+        self.assertEqual([cache for cache, _ in runs], [
+            os.path.join(cache_path, '112233445566-us-east-1.cache'),
+            os.path.join(cache_path, '002244668899-us-east-1.cache'),
+            os.path.join(cache_path, '112233445566-us-east-1.cache')])
+        self.assertIs(runs[0][1], runs[2][1])
+        self.assertIsNot(runs[0][1], runs[1][1])
+
+    def test_run_account_records_gcp(self):
+        run_dir = self.setup_run_dir()
+
+        def run(policy):
+            policy.ctx.initialize()
+            return [{'name': 'instance-1'}]
+
+        self.patch(Policy, 'run', run)
+        records = []
+        org.run_account(
+            {'name': 'devy', 'account_id': 'custodian-1291', 'provider': 'gcp'},
+            'global', {'policies': [{'name': 'instances', 'resource': 'gcp.instance'}]},
+            os.path.join(run_dir, 'output'), 0, os.path.join(run_dir, 'cache'),
+            False, True, False, records)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['policy'], 'instances')
+        self.assertEqual(records[0]['status'], org.RunHistory.STATUS_OK)
+        self.assertEqual(records[0]['api_calls'], 0)
+        self.assertEqual(records[0]['resources'], 1)
+
+    def test_cli_run_resume(self):
+        run_dir = self.setup_run_dir()
+        logger = mock.MagicMock()
+        units = []
+
+        def run_account(a, r, policies_config, *args):
+            units.append((a['name'], r, policies_config['policies'][0]['name']))
+            args[-1].extend([{
+                'policy': p['name'], 'status': 'ok', 'api_calls': 1, 'resources': 1,
+                'duration': 1} for p in policies_config['policies']])
+            return {}, True
+
+        self.patch(org, 'logging', logger)
+        self.patch(org, 'run_account', run_account)
+        self.change_cwd(run_dir)
+
+        # an interrupted run which completed the dev account and a qa policy
+        history = org.RunHistory('cache')
+        run_id = history.start_run()
+        dev = {'account_id': '112233445566', 'name': 'dev'}
+        qa = {'account_id': '002244668899', 'name': 'qa'}
+        history.record(run_id, dev, 'us-east-1', 'aws.ec2', [
+            {'policy': 'compute', 'status': 'ok', 'duration': 1, 'api_calls': 1,
+             'resources': 1}])
+        history.record(run_id, dev, 'us-east-1', 'aws.lambda', [
+            {'policy': 'serverless', 'status': 'ok', 'duration': 1, 'api_calls': 1,
+             'resources': 1}])
+        history.record(run_id, qa, 'us-east-1', 'aws.lambda', [
+            {'policy': 'serverless', 'status': 'error', 'duration': 1, 'api_calls': 1,
+             'resources': 0}])
+        history.close()
+
+        args = ['run', '-c', 'accounts.yml', '-u', 'policies.yml',
+                '--debug', '-s', 'output', '--cache-path', 'cache',
+                '-r', 'us-east-1']
+        result = CliRunner().invoke(org.cli, args + ['--resume'], catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(sorted(units), [
+            ('qa', 'us-east-1', 'compute'), ('qa', 'us-east-1', 'serverless')])
+
+        # the resumed run completed, a further resume starts a new run.
+        units.clear()
+        result = CliRunner().invoke(org.cli, args + ['--resume'], catch_exceptions=False)
+        self.assertEqual(len(units), 4)
+
+    def test_cli_stats_no_history(self):
+        cache_path = os.path.join(self.get_temp_dir(), 'c7n-org')
+        result = CliRunner().invoke(
+            org.cli, ['stats', '--cache-path', cache_path], catch_exceptions=False)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(result.output.strip().splitlines()), 2)
+        self.assertTrue(os.path.isdir(cache_path))
+
     def test_filter_policies(self):
         d = {'policies': [
             {'name': 'find-ml',
@@ -233,6 +396,29 @@ class OrgTest(TestUtils):
             org.resolve_regions([], account),
             ('us-east-1', 'us-west-2'))
 
+    def test_get_session_role_chain_reuse(self):
+        account = {"name": "dev",
+                   "provider": "aws",
+                   "account_id": "112233445566",
+                   "role": ["arn:aws:iam::112233445566:role/hub",
+                            "arn:aws:iam::112233445566:role/spoke"]}
+        assumes = []
+
+        def assumed_session(role, session_name, region=None, external_id=None, session=None):
+            assumes.append(role)
+            s = mock.MagicMock()
+            s._session.get_credentials.return_value = Credentials('AKID', 'SECRET', 'TOKEN')
+            return s
+
+        self.patch(org, 'assumed_session', assumed_session)
+        self.addCleanup(assumed_credentials.reset)
+        east = org.get_session(account, 'custodian', 'us-east-1')
+        west = org.get_session(account, 'custodian', 'us-west-2')
+        self.assertEqual(assumes, account['role'])
+        self.assertEqual(east.region_name, 'us-east-1')
+        self.assertEqual(west.region_name, 'us-west-2')
+        self.assertEqual(west._session.get_credentials().access_key, 'AKID')
+
     def test_filter_accounts(self):
 
         d = {'accounts': [